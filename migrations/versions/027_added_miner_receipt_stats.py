@@ -0,0 +1,50 @@
+"""added_miner_receipt_stats
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '027'
+down_revision: Union[str, None] = '026'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('miner_receipt_stats',
+    sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('network', sa.String(), nullable=False),
+    sa.Column('miner_key', sa.String(), nullable=False),
+    sa.Column('validator_key', sa.String(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('sum_response_time', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('hour', 'network', 'miner_key', 'validator_key', name=op.f('pk__miner_receipt_stats'))
+    )
+    op.create_index('idx_miner_receipt_stats_miner_key', 'miner_receipt_stats', ['miner_key'], unique=False, postgresql_using='btree')
+
+    # backfill the rollup from the receipts stored so far, undated receipts go to the epoch hour like new ones do
+    op.execute("""
+        INSERT INTO miner_receipt_stats (hour, network, miner_key, validator_key, count, sum_response_time)
+        SELECT
+            COALESCE(DATE_TRUNC('hour', timestamp, 'UTC'), TIMESTAMPTZ '1970-01-01 00:00:00+00'),
+            network,
+            miner_key,
+            validator_key,
+            COUNT(*),
+            COALESCE(SUM(response_time), 0)
+        FROM miner_receipts
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_miner_receipt_stats_miner_key', table_name='miner_receipt_stats', postgresql_using='btree')
+    op.drop_table('miner_receipt_stats')
@@ -0,0 +1,28 @@
+"""added_receipts_sync_cursor_index
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-10-18 11:02:17.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '028'
+down_revision: Union[str, None] = '027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_miner_receipts_validator_key_timestamp_id', 'miner_receipts', ['validator_key', 'timestamp', 'id'], unique=False, postgresql_using='btree')
+    op.drop_index('idx_miner_receipts_validator_key_timestamp', table_name='miner_receipts', postgresql_using='btree')
+
+
+def downgrade() -> None:
+    op.create_index('idx_miner_receipts_validator_key_timestamp', 'miner_receipts', ['validator_key', 'timestamp'], unique=False, postgresql_using='btree')
+    op.drop_index('idx_miner_receipts_validator_key_timestamp_id', table_name='miner_receipts', postgresql_using='btree')
@@ -0,0 +1,28 @@
+"""added_challenges_network_created_at_index
+
+Revision ID: 029
+Revises: 028
+Create Date: 2026-10-18 14:21:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '029'
+down_revision: Union[str, None] = '028'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_challenges_money_flow_network_created_at', 'challenges_money_flow', ['network', 'created_at'], unique=False, postgresql_using='btree')
+    op.create_index('idx_challenges_balance_tracking_network_created_at', 'challenges_balance_tracking', ['network', 'created_at'], unique=False, postgresql_using='btree')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_challenges_balance_tracking_network_created_at', table_name='challenges_balance_tracking', postgresql_using='btree')
+    op.drop_index('idx_challenges_money_flow_network_created_at', table_name='challenges_money_flow', postgresql_using='btree')
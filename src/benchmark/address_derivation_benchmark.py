@@ -0,0 +1,116 @@
+"""
+Benchmarks address derivation per script type: the previous PyCryptodome + base58 implementation vs. the hashlib
+based one in nodes/bitcoin/address.py, uncached and through the bounded memo cache, with a share of repeated scripts
+as in real blocks:
+
+    python -m src.benchmark.address_derivation_benchmark --scripts 20000 --repeat-ratio 0.3
+"""
+import argparse
+import os
+import random
+import time
+
+import base58
+from Crypto.Hash import SHA256, RIPEMD160
+
+from src.subnet.validator.nodes.bitcoin import address
+
+
+def legacy_b58check(payload: bytes) -> str:
+    checksum = SHA256.new(SHA256.new(payload).digest()).digest()[:4]
+    return base58.b58encode(payload + checksum).decode("utf-8")
+
+
+def legacy_hash160(data: bytes) -> bytes:
+    ripemd160 = RIPEMD160.new()
+    ripemd160.update(SHA256.new(data).digest())
+    return ripemd160.digest()
+
+
+def legacy_pubkey_to_address(pubkey: str) -> str:
+    if not all(c in '0123456789abcdefABCDEF' for c in pubkey):
+        raise ValueError(f"Invalid pubkey: {pubkey}. Contains non-hexadecimal characters.")
+    return legacy_b58check(b"\x00" + legacy_hash160(bytes.fromhex(pubkey)))
+
+
+def legacy_derive(script_type: str, hex_script: str, asm: str) -> str:
+    """The branches of the previous derive_address exercised by this benchmark."""
+    try:
+        if script_type == "nulldata":
+            return f"OP_RETURN_{' '.join(asm.split()[1:])[:20]}..."
+        if script_type == "pubkey":
+            return legacy_pubkey_to_address(asm.split()[0])
+        if script_type == "pubkeyhash":
+            return legacy_b58check(b"\x00" + bytes.fromhex(hex_script[6:46]))
+        if script_type in ("scripthash", "multisig"):
+            return legacy_b58check(b"\x05" + legacy_hash160(bytes.fromhex(hex_script)))
+        if asm.count("OP_CHECKSIG") > 100:
+            return f"UNKNOWN_{asm[:30]}"
+        if script_type == "nonstandard":
+            return f"NONSTANDARD_{hex_script[:20]}..."
+        raise ValueError(f"Unable to derive address for script type: {script_type}")
+    except Exception as e:
+        print(f"Error in derive_address: {e}")
+        return f"UNKNOWN_{asm[:30]}"
+
+
+def random_hex(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+def make_script(script_type: str) -> dict:
+    if script_type == "pubkey":
+        pubkey = "04" + random_hex(64)
+        return {"type": "pubkey", "hex": f"41{pubkey}ac", "asm": f"{pubkey} OP_CHECKSIG"}
+    if script_type == "pubkeyhash":
+        pubkey_hash = random_hex(20)
+        return {"type": "pubkeyhash", "hex": f"76a914{pubkey_hash}88ac",
+                "asm": f"OP_DUP OP_HASH160 {pubkey_hash} OP_EQUALVERIFY OP_CHECKSIG"}
+    if script_type == "scripthash":
+        script_hash = random_hex(20)
+        return {"type": "scripthash", "hex": f"a914{script_hash}87", "asm": f"OP_HASH160 {script_hash} OP_EQUAL"}
+    if script_type == "multisig":
+        pubkeys = ["02" + random_hex(32) for _ in range(3)]
+        return {"type": "multisig", "hex": "52" + "".join(f"21{p}" for p in pubkeys) + "53ae",
+                "asm": f"2 {' '.join(pubkeys)} 3 OP_CHECKMULTISIG"}
+    if script_type == "nulldata":
+        data = random_hex(40)
+        return {"type": "nulldata", "hex": f"6a28{data}", "asm": f"OP_RETURN {data}"}
+    return {"type": "nonstandard", "hex": random_hex(30), "asm": "OP_NOP"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scripts", type=int, default=20000, help="scripts per type")
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="share of scripts that repeat an earlier one")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'script type':<12} {'previous':>12} {'hashlib':>12} {'memoised':>12}   (us per script)")
+    for script_type in ("pubkey", "pubkeyhash", "scripthash", "multisig", "nulldata", "nonstandard"):
+        distinct = [make_script(script_type) for _ in range(int(args.scripts * (1 - args.repeat_ratio)) or 1)]
+        scripts = distinct + [rng.choice(distinct) for _ in range(args.scripts - len(distinct))]
+        rng.shuffle(scripts)
+
+        start = time.perf_counter()
+        expected = [legacy_derive(s["type"], s["hex"], s["asm"]) for s in scripts]
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        derived = [address._derive(s["type"], s["hex"], s["asm"]) for s in scripts]
+        hashlib_elapsed = time.perf_counter() - start
+
+        address._derive_cached.cache_clear()
+        start = time.perf_counter()
+        memoised = address.derive_addresses(scripts)
+        memoised_elapsed = time.perf_counter() - start
+
+        assert derived == expected and memoised == expected, script_type
+        per_script = [elapsed / len(scripts) * 1e6 for elapsed in (legacy_elapsed, hashlib_elapsed, memoised_elapsed)]
+        print(f"{script_type:<12} {per_script[0]:>12.2f} {per_script[1]:>12.2f} {per_script[2]:>12.2f}")
+
+    print(f"counters: {address.address_stats.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmarks the pooled bitcoind JSON-RPC client against a fresh HTTP connection per call.
+
+A fake bitcoind is started on localhost, so no node is required:
+
+    python -m src.benchmark.bitcoin_rpc_benchmark --calls 2000 --threads 4
+"""
+import argparse
+import base64
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.subnet.validator.nodes.bitcoin.rpc import BitcoinRpcClient
+
+
+class FakeBitcoindHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 65536
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if isinstance(payload, list):
+            body = [{"result": 850000, "error": None, "id": r["id"]} for r in payload]
+        else:
+            body = {"result": 850000, "error": None, "id": payload["id"]}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def call_with_new_connection(host, port, auth):
+    # Mirrors the previous ExtendedProxy.batch_request behaviour: one TCP connection per call
+    conn = http.client.HTTPConnection(host, port)
+    body = json.dumps({"method": "getblockcount", "params": [], "jsonrpc": "2.0", "id": 0})
+    conn.request("POST", "/", body, {"Authorization": f"Basic {auth}", "Content-Type": "application/json"})
+    result = json.loads(conn.getresponse().read())
+    conn.close()
+    return result["result"]
+
+
+def run(name, fn, calls, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: fn(), range(calls)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {calls} calls in {elapsed:.3f}s ({calls / elapsed:,.0f} calls/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBitcoindHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    auth = base64.b64encode(b"user:pass").decode()
+
+    client = BitcoinRpcClient(f"http://user:pass@{host}:{port}", pool_size=args.threads)
+    try:
+        run("new connection per call", lambda: call_with_new_connection(host, port, auth), args.calls, args.threads)
+        run("pooled keep-alive", lambda: client.call("getblockcount"), args.calls, args.threads)
+
+        start = time.perf_counter()
+        client.batch_request([["getblockcount"] for _ in range(args.batch)])
+        elapsed = time.perf_counter() - start
+        print(f"{'chunked batch':<24} {args.batch} commands in {elapsed:.3f}s (batch size {client.batch_size})")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
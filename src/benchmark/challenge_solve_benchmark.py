@@ -0,0 +1,160 @@
+"""
+Benchmarks money flow challenge solve latency of UtxoGraphSearch on a synthetic transaction graph, served by the
+graph database stand-in with a model of the neo4j access paths: an index seek when an index covers equality
+predicates of the query, a label scan otherwise. Compares the previous query, without index and with an operator
+created out_total_amount index, against the bootstrapped challenge indexes before and after the tx_id_suffix backfill:
+
+    python -m src.benchmark.challenge_solve_benchmark --transactions 200000 --challenges 500
+
+The graph has a share of coinbase-like transactions with the same amounts, like the 50 BTC coinbase outputs of early
+blocks, for which (out_total_amount, in_total_amount) alone matches many transactions.
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from unittest import mock
+
+from loguru import logger
+
+from src.benchmark.graph_db_stand_in import StandInGraphDatabase, StandInGraphServer
+from src.subnet.miner._config import MinerSettings
+from src.subnet.miner.blockchain.search.utxo_graph_search import UtxoGraphSearch
+from src.subnet.miner.blockchain.search.utxo_indexes import backfill_tx_id_suffix, ensure_challenge_indexes
+
+LEGACY_QUERY = """
+MATCH (t:Transaction {out_total_amount: $out_total_amount})
+WHERE t.in_total_amount = $in_total_amount AND t.tx_id ENDS WITH $tx_id_last_6_chars
+RETURN t.tx_id
+LIMIT 1;
+"""
+
+
+class SyntheticGraph:
+    """:Transaction nodes with single or composite property indexes, answering the challenge queries."""
+
+    def __init__(self, transactions: int, coinbase_share: float, seed: int = 7):
+        rng = random.Random(seed)
+        self.nodes = []
+        for _ in range(transactions):
+            if rng.random() < coinbase_share:
+                in_total_amount, out_total_amount = 0, rng.choice((5_000_000_000, 5_000_000_000, 2_500_000_000))
+            else:
+                in_total_amount = rng.randint(10_000, 10 ** 10)
+                out_total_amount = in_total_amount - rng.choice((1_000, 2_260, 5_000, 10_000))
+            self.nodes.append({"tx_id": f"{rng.getrandbits(256):064x}", "in_total_amount": in_total_amount,
+                               "out_total_amount": out_total_amount})
+        self.indexes = {}
+
+    def create_index(self, properties):
+        index = {}
+        for node in self.nodes:
+            if all(prop in node for prop in properties):
+                index.setdefault(tuple(node[prop] for prop in properties), []).append(node)
+        self.indexes[properties] = index
+
+    def backfill_suffix(self):
+        for node in self.nodes:
+            node.setdefault("tx_id_suffix", node["tx_id"][-6:])
+        for properties in list(self.indexes):
+            self.create_index(properties)
+
+    def match(self, query: str, params: dict):
+        out_total_amount, in_total_amount, suffix = (params["out_total_amount"], params["in_total_amount"],
+                                                     params["tx_id_last_6_chars"])
+        equality = {"out_total_amount": out_total_amount}
+        if "in_total_amount: $in_total_amount" in query:
+            equality["in_total_amount"] = in_total_amount
+        if "tx_id_suffix: $tx_id_last_6_chars" in query:
+            equality["tx_id_suffix"] = suffix
+
+        # seek on the index covering most equality predicates, like the planner, or scan the label
+        usable = [properties for properties in self.indexes if set(properties) <= set(equality)]
+        if usable:
+            properties = max(usable, key=len)
+            candidates = self.indexes[properties].get(tuple(equality[prop] for prop in properties), [])
+        else:
+            candidates = self.nodes
+
+        suffix_is_null = "tx_id_suffix IS NULL" in query
+        for node in candidates:
+            if node["out_total_amount"] == out_total_amount and node["in_total_amount"] == in_total_amount \
+                    and node["tx_id"].endswith(suffix) and not (suffix_is_null and "tx_id_suffix" in node) \
+                    and node.get("tx_id_suffix", suffix) == suffix:
+                return [{"t.tx_id": node["tx_id"]}]
+        return []
+
+    def respond(self, query: str, params: dict):
+        if query.startswith("SHOW INDEXES"):
+            return [{"name": "_".join(properties), "state": "ONLINE", "populationPercent": 100.0,
+                     "properties": list(properties)} for properties in self.indexes]
+        if query.startswith("CREATE INDEX"):
+            self.create_index(tuple(re.findall(r"t\.(\w+)", query.split(" ON ")[1])))
+            return []
+        if "SET t.tx_id_suffix" in query:
+            self.backfill_suffix()
+            return []
+        if "RETURN 1" in query:
+            return [{"1": 1}]
+        return self.match(query, params)
+
+
+async def measure(search: UtxoGraphSearch, challenges, legacy: bool):
+    latencies = []
+    for node in challenges:
+        start = time.perf_counter()
+        if legacy:
+            tx_id = await search.fetch_value(LEGACY_QUERY, 60, out_total_amount=node["out_total_amount"],
+                                             in_total_amount=node["in_total_amount"], tx_id_last_6_chars=node["tx_id"][-6:])
+        else:
+            tx_id = await search.solve_challenge(node["in_total_amount"], node["out_total_amount"], node["tx_id"][-6:])
+        latencies.append(time.perf_counter() - start)
+        assert tx_id == node["tx_id"]
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--challenges", type=int, default=500)
+    parser.add_argument("--coinbase-share", type=float, default=0.05)
+    args = parser.parse_args()
+    logger.remove()
+
+    graph = SyntheticGraph(args.transactions, args.coinbase_share)
+    challenges = random.Random(11).sample(graph.nodes, args.challenges)
+    server = StandInGraphServer(graph.respond, handshake_delay=0.0, query_delay=0.0)
+    url = await server.start()
+    settings = MinerSettings(
+        NET_UID=20, MINER_KEY="benchmark", MINER_NAME="benchmark", NETWORK="bitcoin",
+        DATABASE_URL="postgresql+asyncpg://unused", GRAPH_DATABASE_URL=url,
+        GRAPH_DATABASE_USER="neo4j", GRAPH_DATABASE_PASSWORD="neo4j", GRAPH_DATABASE_HEALTH_CHECK_INTERVAL=0,
+        GRAPH_INDEX_BOOTSTRAP=False,
+    )
+
+    def report(name, mean, p50, p99):
+        print(f"{name:<42} mean {mean * 1000:8.3f}ms  p50 {p50 * 1000:8.3f}ms  p99 {p99 * 1000:8.3f}ms")
+
+    print(f"{args.transactions} transactions, {args.challenges} challenges")
+    try:
+        with mock.patch("src.subnet.miner.blockchain.AsyncGraphDatabase", StandInGraphDatabase):
+            search = UtxoGraphSearch(settings)
+            await search.start()
+
+            report("previous query, label scan", *await measure(search, challenges, legacy=True))
+            graph.create_index(("out_total_amount",))
+            report("previous query, out_total_amount index", *await measure(search, challenges, legacy=True))
+
+            await ensure_challenge_indexes(search.driver)
+            report("challenge indexes, before suffix backfill", *await measure(search, challenges, legacy=False))
+            await backfill_tx_id_suffix(search.driver)
+            report("challenge indexes, tx_id_suffix", *await measure(search, challenges, legacy=False))
+            await search.close()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
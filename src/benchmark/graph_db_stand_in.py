@@ -0,0 +1,163 @@
+"""
+A local stand-in for the Neo4j server and async driver used by the miner benchmarks.
+
+The server speaks newline delimited JSON over TCP. Every new connection pays `handshake_delay` before it is usable,
+like the bolt handshake and authentication, and every query pays `query_delay` before `responder(query, params)`
+rows are returned. `StandInGraphDatabase.driver` mimics the parts of `neo4j.AsyncGraphDatabase.driver` the miner
+uses, with a bounded pool of reused connections, so it can be patched in for `AsyncGraphDatabase`.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+
+class StandInRecord(dict):
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self.values())[key]
+        return super().__getitem__(key)
+
+
+class StandInGraphServer:
+
+    def __init__(self, responder: Callable[[str, dict], List[dict]], handshake_delay: float = 0.005,
+                 query_delay: float = 0.001):
+        self.responder = responder
+        self.handshake_delay = handshake_delay
+        self.query_delay = query_delay
+        self.connections = 0
+        self.queries = 0
+        self.handlers = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self.server = await asyncio.start_server(self._handle, host, port)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"bolt://{host}:{port}"
+
+    async def stop(self):
+        self.server.close()
+        for handler in self.handlers:
+            handler.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        try:
+            await asyncio.sleep(self.handshake_delay)
+            writer.write(b'{"ready": true}\n')
+            await writer.drain()
+            while line := await reader.readline():
+                request = json.loads(line)
+                self.queries += 1
+                await asyncio.sleep(self.query_delay)
+                rows = self.responder(request["query"], request["params"])
+                writer.write(json.dumps({"rows": rows}).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            self.handlers.discard(handler)
+
+
+class StandInResult:
+
+    def __init__(self, rows: List[dict]):
+        self.records = [StandInRecord(row) for row in rows]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self.records:
+            yield record
+
+    async def single(self):
+        return self.records[0] if self.records else None
+
+    async def consume(self):
+        self.records = []
+        return SimpleNamespace(counters=SimpleNamespace(properties_set=0))
+
+
+class StandInSession:
+
+    def __init__(self, driver: "StandInDriver"):
+        self.driver = driver
+        self.connection = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.connection is not None:
+            self.driver._release(self.connection)
+            self.connection = None
+
+    async def run(self, query, parameters: Optional[dict] = None, **kwargs) -> StandInResult:
+        if self.connection is None:
+            self.connection = await self.driver._acquire()
+        reader, writer = self.connection
+        text = getattr(query, "text", query)  # neo4j.Query or a plain string
+        writer.write(json.dumps({"query": text, "params": {**(parameters or {}), **kwargs}}).encode() + b"\n")
+        await writer.drain()
+        return StandInResult(json.loads(await reader.readline())["rows"])
+
+
+class StandInDriver:
+
+    def __init__(self, uri: str, max_connection_pool_size: int = 100):
+        address = urlparse(uri)
+        self.host, self.port = address.hostname, address.port
+        self.pool_slots = asyncio.Semaphore(max_connection_pool_size)
+        self.idle = []
+        self.connections = set()
+
+    def session(self, **kwargs) -> StandInSession:
+        return StandInSession(self)
+
+    async def _acquire(self):
+        await self.pool_slots.acquire()
+        if self.idle:
+            return self.idle.pop()
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            await reader.readline()  # handshake
+        except Exception:
+            self.pool_slots.release()
+            raise
+        self.connections.add(writer)
+        return reader, writer
+
+    def _release(self, connection):
+        self.idle.append(connection)
+        self.pool_slots.release()
+
+    async def verify_connectivity(self):
+        async with self.session() as session:
+            await session.run("RETURN 1")
+
+    async def close(self):
+        for writer in self.connections:
+            writer.close()
+        for writer in self.connections:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.connections.clear()
+        self.idle.clear()
+
+
+class StandInGraphDatabase:
+
+    @staticmethod
+    def driver(uri: str, auth=None, max_connection_pool_size: int = 100, **config) -> StandInDriver:
+        return StandInDriver(uri, max_connection_pool_size=max_connection_pool_size)
@@ -0,0 +1,79 @@
+"""
+Benchmarks miner calls: a new ModuleClient, and so a new HTTP session and connection, per call (previous behaviour)
+vs. the pooled clients of MinerClientRegistry, against a local stub module server:
+
+    python -m src.benchmark.miner_client_benchmark --calls 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+from communex.module.client import ModuleClient
+from substrateinterface import Keypair
+
+from src.subnet.validator.miner_client import MinerClientRegistry
+
+
+async def start_stub_miner(host, port):
+    connections = set()
+
+    async def query(request):
+        connections.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"response": "ok"})
+
+    app = web.Application()
+    app.router.add_post("/method/query", query)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner, connections
+
+
+async def run(get_client, key, calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_call():
+        async with semaphore:
+            start = time.perf_counter()
+            await get_client().call("query", key.ss58_address, {"network": "bitcoin"})
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_call() for _ in range(calls)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--port", type=int, default=19901)
+    args = parser.parse_args()
+
+    host = "127.0.0.1"
+    key = Keypair.create_from_uri("//validator")
+    runner, connections = await start_stub_miner(host, args.port)
+
+    def report(name, elapsed, p50, p99):
+        print(f"{name:<22} {args.calls} calls in {elapsed:.3f}s ({args.calls / elapsed:,.0f} calls/s), "
+              f"p50 {p50 * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms, {len(connections)} connections")
+
+    try:
+        report("new client per call", *await run(lambda: ModuleClient(host, args.port, key), key, args.calls, args.concurrency))
+
+        connections.clear()
+        registry = MinerClientRegistry(key, max_in_flight_per_miner=args.max_in_flight)
+        report("pooled registry", *await run(lambda: registry.get(host, args.port), key, args.calls, args.concurrency))
+        await registry.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Benchmarks miner request throughput on money flow challenges and queries: a new graph driver, and so new
+connections, per request (previous behaviour) vs. the GraphSearch shared by the miner process, against the local
+graph database stand-in:
+
+    python -m src.benchmark.miner_graph_search_benchmark --requests 2000 --concurrency 32 --handshake-delay 0.005
+
+The previous behaviour also never closed its drivers, here they are closed after each request to keep the number
+of open sockets bounded.
+"""
+import argparse
+import asyncio
+import contextvars
+import time
+from unittest import mock
+
+from loguru import logger
+from substrateinterface import Keypair
+
+from src.benchmark.graph_db_stand_in import StandInGraphDatabase, StandInGraphServer
+from src.subnet.miner._config import MinerSettings
+from src.subnet.miner.miner import Miner
+from src.subnet.protocol import MODEL_KIND_MONEY_FLOW
+
+TX_ID = "f4184fc596403b9d638783cf57adfe4c75c605f6356fbc91338530e9831e9e16"
+
+per_request_search = contextvars.ContextVar("per_request_search", default=None)
+
+
+def respond(query: str, params: dict):
+    if "RETURN 1" in query:
+        return [{"1": 1}]
+    if "$out_total_amount" in query:
+        return [{"t.tx_id": TX_ID}]
+    return [{"address": f"bc1q{i:038d}", "balance": i * 1000} for i in range(20)]
+
+
+async def run(miner: Miner, requests: int, concurrency: int, per_request: bool):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    challenge = {"model_kind": MODEL_KIND_MONEY_FLOW, "in_total_amount": 5000000000, "out_total_amount": 5000000000,
+                 "tx_id_last_6_chars": TX_ID[-6:]}
+
+    async def one_request(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if i % 4:
+                    result = await miner.challenge(challenge=dict(challenge), validator_key="validator")
+                    assert result.output["tx_id"] == TX_ID
+                else:
+                    result = await miner.query(MODEL_KIND_MONEY_FLOW, "MATCH (a:Address) RETURN a LIMIT 20", "validator")
+                    assert len(result["result"]) == 20
+            finally:
+                if per_request:
+                    await per_request_search.get().close()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_request(i) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--handshake-delay", type=float, default=0.005, help="connection setup time of the stand-in")
+    parser.add_argument("--query-delay", type=float, default=0.001, help="query time of the stand-in")
+    args = parser.parse_args()
+    logger.remove()
+
+    server = StandInGraphServer(respond, handshake_delay=args.handshake_delay, query_delay=args.query_delay)
+    url = await server.start()
+    settings = MinerSettings(
+        NET_UID=20, MINER_KEY="benchmark", MINER_NAME="benchmark", NETWORK="bitcoin",
+        DATABASE_URL="postgresql+asyncpg://unused", GRAPH_DATABASE_URL=url,
+        GRAPH_DATABASE_USER="neo4j", GRAPH_DATABASE_PASSWORD="neo4j", GRAPH_DATABASE_HEALTH_CHECK_INTERVAL=0,
+    )
+    keypair = Keypair.create_from_uri("//miner")
+
+    def report(name, elapsed, p50, p99, connections):
+        print(f"{name:<22} {args.requests} requests in {elapsed:.3f}s ({args.requests / elapsed:,.0f} req/s), "
+              f"p50 {p50 * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms, {connections} connections")
+
+    try:
+        with mock.patch("src.subnet.miner.blockchain.AsyncGraphDatabase", StandInGraphDatabase):
+            miner = Miner(keypair=keypair, settings=settings)
+
+            async def new_graph_search():
+                search = miner.graph_search_factory.create_graph_search(settings)
+                per_request_search.set(search)
+                return search
+
+            with mock.patch.object(miner, "get_graph_search", new_graph_search):
+                report("driver per request", *await run(miner, args.requests, args.concurrency, True), server.connections)
+
+            server.connections = 0
+            await miner.startup()
+            report("shared GraphSearch", *await run(miner, args.requests, args.concurrency, False), server.connections)
+            await miner.shutdown()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Benchmarks the batched receipt consumer against storing one receipt per transaction.
+
+Redis and Postgres are replaced by fakeredis and an on-disk SQLite database:
+
+    pip install fakeredis aiosqlite
+    python -m src.benchmark.receipt_consumer_benchmark --receipts 5000 --batch-size 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from fakeredis.aioredis import FakeRedis
+
+from src.subnet.validator.database import OrmBase
+from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
+from src.subnet.validator.database.session_manager import DatabaseSessionManager
+from src.subnet.validator.receipt_worker import ReceiptBatchConsumer, RECEIPTS_QUEUE
+
+
+def make_receipt():
+    return {
+        "validator_key": "validator",
+        "request_id": str(uuid.uuid4()),
+        "miner_key": f"miner-{uuid.uuid4().int % 64}",
+        "model_kind": "money_flow",
+        "network": "bitcoin",
+        "query": "MATCH (t:Transaction {tx_id: $tx_id}) RETURN t",
+        "query_hash": uuid.uuid4().hex,
+        "response_time": 0.25,
+        "timestamp": datetime.utcnow().isoformat(),
+        "result_hash": uuid.uuid4().hex,
+        "result_hash_signature": uuid.uuid4().hex,
+    }
+
+
+async def setup(db_path):
+    session_manager = DatabaseSessionManager()
+    session_manager.init(f"sqlite+aiosqlite:///{db_path}")
+    async with session_manager.connect() as connection:
+        await connection.run_sync(OrmBase.metadata.drop_all)
+        await connection.run_sync(OrmBase.metadata.create_all)
+    return session_manager
+
+
+async def fill_queue(redis_client, count):
+    await redis_client.delete(RECEIPTS_QUEUE)
+    for start in range(0, count, 1000):
+        await redis_client.lpush(RECEIPTS_QUEUE, *[json.dumps(make_receipt()) for _ in range(min(1000, count - start))])
+
+
+async def one_by_one(redis_client, miner_receipt_manager):
+    # previous ReceiptConsumerThread behaviour: one brpop and one INSERT transaction per receipt
+    while True:
+        message = await redis_client.brpop(RECEIPTS_QUEUE, timeout=1)
+        if not message:
+            return
+        await miner_receipt_manager.store_miner_receipt(**json.loads(message[1]))
+
+
+async def batched(redis_client, miner_receipt_manager, batch_size):
+    consumer = ReceiptBatchConsumer(redis_client, miner_receipt_manager, batch_size=batch_size, flush_interval=0.1)
+    while await redis_client.llen(RECEIPTS_QUEUE) or consumer.buffer:
+        await consumer.poll(timeout=1)
+        if consumer.should_flush():
+            await consumer.flush()
+    return consumer.metrics()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--receipts", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    redis_client = FakeRedis()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "receipts.db")
+
+        session_manager = await setup(db_path)
+        await fill_queue(redis_client, args.receipts)
+        start = time.perf_counter()
+        await one_by_one(redis_client, MinerReceiptManager(session_manager))
+        elapsed = time.perf_counter() - start
+        print(f"{'one receipt per insert':<24} {args.receipts} receipts in {elapsed:.3f}s ({args.receipts / elapsed:,.0f} receipts/s)")
+        await session_manager.close()
+
+        session_manager = await setup(db_path)
+        await fill_queue(redis_client, args.receipts)
+        start = time.perf_counter()
+        metrics = await batched(redis_client, MinerReceiptManager(session_manager), args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{'batched consumer':<24} {args.receipts} receipts in {elapsed:.3f}s ({args.receipts / elapsed:,.0f} receipts/s)")
+        print(f"consumer metrics: {metrics}")
+        await session_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
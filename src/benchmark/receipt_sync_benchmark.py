@@ -0,0 +1,141 @@
+"""
+Benchmarks receipt sync throughput: paged JSON (/v1/miner/receipts/sync) vs. the compressed NDJSON stream (/v1/miner/receipts/stream).
+
+A gateway serving both endpoints from a SQLite database runs in-process, a ReceiptSyncWorker syncs every receipt into a second one:
+
+    pip install aiosqlite
+    python -m src.benchmark.receipt_sync_benchmark --receipts 20000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from aiohttp import web
+from fastapi.encoders import jsonable_encoder
+from substrateinterface import Keypair
+
+from src.subnet.validator.database import OrmBase
+from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
+from src.subnet.validator.database.session_manager import DatabaseSessionManager
+from src.subnet.validator.receipt_stream import encode_receipt_stream, supported_encodings
+from src.subnet.validator.receipt_sync import ReceiptSyncWorker
+
+GATEWAY_VALIDATOR_KEY = "gateway-validator"
+QUERY = "MATCH (t:Transaction {tx_id: $tx_id})-[:SENT]->(a:Address) WITH t, a MATCH (a)-[:SENT]->(t2:Transaction) RETURN t, a, t2 LIMIT 100"
+
+
+async def open_db(path, drop=True):
+    session_manager = DatabaseSessionManager()
+    session_manager.init(f"sqlite+aiosqlite:///{path}")
+    async with session_manager.connect() as connection:
+        if drop:
+            await connection.run_sync(OrmBase.metadata.drop_all)
+        await connection.run_sync(OrmBase.metadata.create_all)
+    return session_manager
+
+
+async def fill_gateway(manager, count):
+    miners = [Keypair.create_from_uri(f"//miner{i}") for i in range(8)]
+    signatures = {m.ss58_address: m.sign(b"result-hash").hex() for m in miners}
+    start = datetime(2024, 11, 2)
+    for offset in range(0, count, 1000):
+        await manager.sync_miner_receipts([
+            {
+                "validator_key": GATEWAY_VALIDATOR_KEY,
+                "request_id": str(uuid.uuid4()),
+                "miner_key": miners[i % len(miners)].ss58_address,
+                "model_kind": "funds_flow",
+                "network": "bitcoin",
+                "query": QUERY,
+                "query_hash": uuid.uuid4().hex,
+                "response_time": 0.25,
+                "timestamp": start + timedelta(milliseconds=i),
+                "result_hash": "result-hash",
+                "result_hash_signature": signatures[miners[i % len(miners)].ss58_address],
+            }
+            for i in range(offset, min(offset + 1000, count))
+        ])
+
+
+def gateway_app(manager, transferred):
+    async def sync(request):
+        query = request.query
+        result = await manager.get_receipts_after_cursor(GATEWAY_VALIDATOR_KEY, query["timestamp"], int(query["after_id"]), int(query["page_size"]))
+        response = web.json_response(jsonable_encoder(result))
+        transferred["bytes"] += len(response.body)
+        return response
+
+    async def stream(request):
+        query = request.query
+        encoding = query["encoding"]
+        response = web.StreamResponse(headers={"Content-Encoding": encoding} if encoding != "identity" else {})
+        await response.prepare(request)
+        chunks = manager.stream_receipts_after_cursor(GATEWAY_VALIDATOR_KEY, query["timestamp"], int(query["after_id"]), int(query["chunk_size"]))
+        async for part in encode_receipt_stream(chunks, encoding):
+            transferred["bytes"] += len(part)
+            await response.write(part)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v1/miner/receipts/sync", sync)
+    app.router.add_get("/v1/miner/receipts/stream", stream)
+    return app
+
+
+async def run_sync(gateway_url, db_path, mode, verify):
+    session_manager = await open_db(db_path)
+    worker = ReceiptSyncWorker(Keypair.create_from_uri("//validator"), 20, None, MinerReceiptManager(session_manager))
+    if not verify:
+        async def skip_verification(receipts):
+            return True
+        worker.validate_receipt_signatures = skip_verification
+
+    cursor = (worker.DEFAULT_TIMESTAMP, 0)
+    start = time.perf_counter()
+    if mode == "paged json":
+        await worker.sync_gateway_pages(GATEWAY_VALIDATOR_KEY, gateway_url, cursor)
+    else:
+        worker.STREAM_ENCODINGS = [mode.split()[0]]
+        await worker.stream_gateway(GATEWAY_VALIDATOR_KEY, gateway_url, cursor)
+    elapsed = time.perf_counter() - start
+
+    await worker.cleanup()
+    await session_manager.close()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--receipts", type=int, default=20000)
+    parser.add_argument("--no-verify", action="store_true", help="skip sr25519 signature verification on the syncing side")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gateway_session_manager = await open_db(os.path.join(tmp, "gateway.db"))
+        gateway_manager = MinerReceiptManager(gateway_session_manager)
+        await fill_gateway(gateway_manager, args.receipts)
+
+        transferred = {"bytes": 0}
+        runner = web.AppRunner(gateway_app(gateway_manager, transferred))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        gateway_url = f"http://127.0.0.1:{port}"
+
+        for mode in ["paged json"] + [f"{encoding} ndjson stream" for encoding in supported_encodings()]:
+            transferred["bytes"] = 0
+            elapsed = await run_sync(gateway_url, os.path.join(tmp, "validator.db"), mode, not args.no_verify)
+            print(f"{mode:<24} {args.receipts} receipts in {elapsed:.3f}s "
+                  f"({args.receipts / elapsed:,.0f} receipts/s, {transferred['bytes'] / 2 ** 20:.2f} MiB transferred)")
+
+        await runner.cleanup()
+        await gateway_session_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Benchmarks sr25519 receipt signature verification: one Keypair per receipt on the event loop (previous behaviour)
+vs. the batched SignatureVerifier, and how long the event loop is blocked meanwhile:
+
+    python -m src.benchmark.signature_verification_benchmark --signatures 5000 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from substrateinterface import Keypair
+
+from src.subnet.validator.signature_verifier import SignatureVerifier
+
+
+def make_items(count):
+    miners = [Keypair.create_from_uri(f"//miner{i}") for i in range(16)]
+    signatures = {miner.ss58_address: miner.sign(b"result-hash").hex() for miner in miners}
+    return [(miners[i % len(miners)].ss58_address, "result-hash", signatures[miners[i % len(miners)].ss58_address]) for i in range(count)]
+
+
+async def verify_on_loop(items):
+    for ss58_address, message, signature in items:
+        Keypair(ss58_address=ss58_address).verify(message.encode('utf-8'), bytes.fromhex(signature))
+
+
+async def measure(coro_factory):
+    """Runs the verification next to a 1ms ticker and returns (elapsed, worst ticker delay)."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+    return elapsed, max_lag
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signatures", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    items = make_items(args.signatures)
+
+    def report(name, elapsed, max_lag):
+        print(f"{name:<28} {args.signatures} signatures in {elapsed:.3f}s "
+              f"({args.signatures / elapsed:,.0f} verifications/s, event loop blocked up to {max_lag * 1000:.1f}ms)")
+
+    report("keypair per receipt on loop", *await measure(lambda: verify_on_loop(items)))
+
+    for workers in sorted({0, 1, args.workers}):
+        verifier = SignatureVerifier(max_workers=workers, batch_size=args.batch_size)
+        await verifier.verify_many(items[:workers * 2 or 1])  # start the pool processes
+        report(f"verifier, {workers} workers", *await measure(lambda: verifier.verify_many(items)))
+        verifier.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,7 +16,9 @@ from src.subnet.validator.database.models.challenge_money_flow import ChallengeM
 from src.subnet.validator.database.models.miner_discovery import MinerDiscoveryManager
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
 from src.subnet.validator.database.session_manager import DatabaseSessionManager, run_migrations
+from src.subnet.validator.miner_client import MinerClientRegistry
 from src.subnet.validator.receipt_sync import ReceiptSyncWorker
+from src.subnet.validator.signature_verifier import SignatureVerifier
 from src.subnet.validator.receipt_sync_thread import ReceiptSyncThread
 from src.subnet.validator.receipt_worker import ReceiptConsumerThread
 from src.subnet.validator.weights_storage import WeightsStorage
@@ -82,9 +84,17 @@ if __name__ == "__main__":
     challenge_money_flow_manager = ChallengeMoneyFlowManager(session_manager)
     challenge_balance_tracking_manager = ChallengeBalanceTrackingManager(session_manager)
 
-    receipt_sync_worker = ReceiptSyncWorker(keypair, settings.NET_UID, c_client, miner_receipt_manager)
+    signature_verifier = SignatureVerifier.get_instance(max_workers=settings.SIGNATURE_VERIFICATION_WORKERS)
+
+    receipt_sync_worker = ReceiptSyncWorker(keypair, settings.NET_UID, c_client, miner_receipt_manager, signature_verifier)
     redis_client = Redis.from_url(settings.REDIS_URL)
 
+    miner_clients = MinerClientRegistry(
+        keypair,
+        max_in_flight_per_miner=settings.MINER_CLIENT_MAX_IN_FLIGHT,
+        keepalive_timeout=settings.MINER_CLIENT_KEEPALIVE_TIMEOUT,
+    )
+
     validator = Validator(
         keypair,
         settings.NET_UID,
@@ -96,7 +106,9 @@ if __name__ == "__main__":
         miner_receipt_manager,
         redis_client=redis_client,
         query_timeout=settings.QUERY_TIMEOUT,
-        challenge_timeout=settings.CHALLENGE_TIMEOUT
+        challenge_timeout=settings.CHALLENGE_TIMEOUT,
+        signature_verifier=signature_verifier,
+        miner_clients=miner_clients,
     )
 
     def shutdown_handler(signal_num, frame):
@@ -112,7 +124,9 @@ if __name__ == "__main__":
     receipt_consumer_thread = ReceiptConsumerThread(
         keypair=keypair,
         settings=settings,
-        terminate_event=validator.terminate_event
+        terminate_event=validator.terminate_event,
+        batch_size=settings.RECEIPT_CONSUMER_BATCH_SIZE,
+        flush_interval=settings.RECEIPT_CONSUMER_FLUSH_INTERVAL,
     )
 
     receipt_consumer_thread.start()
@@ -131,7 +145,9 @@ if __name__ == "__main__":
         environment=environment,
         frequency=settings.CHALLENGE_FREQUENCY,
         threshold=settings.CHALLENGE_THRESHOLD,
-        terminate_event=validator.terminate_event)
+        terminate_event=validator.terminate_event,
+        concurrency=settings.CHALLENGE_GENERATION_CONCURRENCY,
+        batch_size=settings.CHALLENGE_GENERATION_BATCH_SIZE)
     challenge_generator_thread.start()
 
     try:
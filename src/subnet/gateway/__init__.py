@@ -17,7 +17,13 @@ from src.subnet.validator.database.models.miner_receipt import MinerReceiptManag
 from src.subnet.validator._config import load_environment, SettingsManager
 from src.subnet.validator.database.session_manager import DatabaseSessionManager
 from src.subnet.gateway.rate_limiter import RateLimiterMiddleware
+from src.subnet.protocol import NETWORK_BITCOIN
+from src.subnet.validator.nodes.factory import NodeFactory
+from src.subnet.validator.miner_client import MinerClientRegistry
+from src.subnet.validator.query_cache import QueryResultCache
 from src.subnet.validator.receipt_sync import ReceiptSyncWorker
+from src.subnet.validator.signature_verifier import SignatureVerifier
+from src.subnet.validator.single_flight import SingleFlight
 from src.subnet.validator.receipt_sync_fetch_thread import ReceiptSyncFetchThread
 from src.subnet.validator.validator import Validator
 from src.subnet.validator.weights_storage import WeightsStorage
@@ -59,8 +65,35 @@ miner_discovery_manager = MinerDiscoveryManager(session_manager)
 miner_receipt_manager = MinerReceiptManager(session_manager)
 challenge_money_flow_manager = ChallengeMoneyFlowManager(session_manager)
 challenge_balance_tracking_manager = ChallengeBalanceTrackingManager(session_manager)
-receipt_sync_worker = ReceiptSyncWorker(keypair, settings.NET_UID, c_client, miner_receipt_manager)
+signature_verifier = SignatureVerifier.get_instance(max_workers=settings.SIGNATURE_VERIFICATION_WORKERS)
+receipt_sync_worker = ReceiptSyncWorker(keypair, settings.NET_UID, c_client, miner_receipt_manager, signature_verifier)
 redis_client = Redis.from_url(settings.REDIS_URL)
+single_flight = SingleFlight(
+    redis_client if settings.QUERY_COALESCING_REDIS_LOCK else None,
+    lock_ttl=settings.QUERY_TIMEOUT,
+)
+miner_clients = MinerClientRegistry(
+    keypair,
+    max_in_flight_per_miner=settings.MINER_CLIENT_MAX_IN_FLIGHT,
+    keepalive_timeout=settings.MINER_CLIENT_KEEPALIVE_TIMEOUT,
+)
+chain_nodes = {NETWORK_BITCOIN: NodeFactory.create_node(NETWORK_BITCOIN)}
+
+
+def chain_height(network: str):
+    node = chain_nodes.get(network)
+    return node.get_current_block_height() if node is not None else None
+
+
+query_cache = QueryResultCache(
+    redis_client,
+    finalized_ttl=settings.QUERY_CACHE_FINALIZED_TTL,
+    tip_ttl=settings.QUERY_CACHE_TIP_TTL,
+    finality_depth=settings.QUERY_CACHE_FINALITY_DEPTH,
+    single_flight=single_flight,
+    chain_height=chain_height,
+    tip_refresh_interval=settings.QUERY_CACHE_TIP_REFRESH_INTERVAL,
+) if settings.QUERY_CACHE_ENABLED else None
 
 global api_key_manager, validator, receipt_sync_fetch_thread
 
@@ -78,6 +111,10 @@ validator = Validator(
     redis_client=redis_client,
     query_timeout=settings.QUERY_TIMEOUT,
     challenge_timeout=settings.CHALLENGE_TIMEOUT,
+    signature_verifier=signature_verifier,
+    query_cache=query_cache,
+    single_flight=single_flight,
+    miner_clients=miner_clients,
 )
 
 receipt_sync_fetch_thread = ReceiptSyncFetchThread(
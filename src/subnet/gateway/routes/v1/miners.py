@@ -1,7 +1,9 @@
 from typing import Optional
 from fastapi import Depends, APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from substrateinterface import Keypair
+from src.subnet.validator.receipt_stream import encode_receipt_stream, supported_encodings, NDJSON_MEDIA_TYPE
 from src.subnet.validator.validator import Validator
 from src.subnet.gateway import get_validator, api_key_auth, get_receipt_sync_worker
 
@@ -31,6 +33,7 @@ async def get_receipts(miner_key: Optional[str] = None,
 
 @miner_router.get("/receipts/sync")
 async def sync_receipts(validator_key: str, validator_signature: str, timestamp: str, page: int = 1, page_size: int = 1000,
+                       after_id: Optional[int] = None,
                        validator: Validator = Depends(get_validator),
                        receipt_sync_worker = Depends(get_receipt_sync_worker)):
 
@@ -43,10 +46,37 @@ async def sync_receipts(validator_key: str, validator_signature: str, timestamp:
     if not receipt_sync_worker.key_to_gateway_urls.get(validator_key):
         raise HTTPException(status_code=400, detail="No gateways available")
 
+    # cursor mode: (timestamp, after_id) is the last receipt the caller has already seen
+    if after_id is not None:
+        return await validator.miner_receipt_manager.get_receipts_after_cursor(validator.key.ss58_address, timestamp, after_id, page_size)
+
     results = await validator.miner_receipt_manager.get_receipts_by_to_sync(validator.key.ss58_address, timestamp, page, page_size)
     return results
 
 
+@miner_router.get("/receipts/stream")
+async def stream_receipts(validator_key: str, validator_signature: str, timestamp: str, after_id: int = 0,
+                          encoding: str = "gzip", chunk_size: int = 1000,
+                          validator: Validator = Depends(get_validator),
+                          receipt_sync_worker = Depends(get_receipt_sync_worker)):
+
+    keypair = Keypair(ss58_address=validator_key)
+    signature_bytes = bytes.fromhex(validator_signature)
+
+    if not keypair.verify(timestamp.encode('utf-8'), signature_bytes):
+        raise HTTPException(status_code=400, detail="Invalid validator signature")
+
+    if not receipt_sync_worker.key_to_gateway_urls.get(validator_key):
+        raise HTTPException(status_code=400, detail="No gateways available")
+
+    if encoding not in supported_encodings():
+        raise HTTPException(status_code=400, detail=f"Unsupported encoding, use one of {supported_encodings()}")
+
+    chunks = validator.miner_receipt_manager.stream_receipts_after_cursor(validator.key.ss58_address, timestamp, after_id, chunk_size)
+    headers = {"Content-Encoding": encoding} if encoding != "identity" else {}
+    return StreamingResponse(encode_receipt_stream(chunks, encoding), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
 @miner_router.get("/miner/multiplier")
 async def get_receipt_multiplier(miner_key: Optional[str] = None, network: Optional[str] = None,
                                        validator: Validator = Depends(get_validator),
@@ -55,6 +85,21 @@ async def get_receipt_multiplier(miner_key: Optional[str] = None, network: Optio
     return results
 
 
+@miner_router.get("/query_cache/metrics")
+async def get_query_cache_metrics(validator: Validator = Depends(get_validator),
+                                  api_key: str = Depends(api_key_auth)):
+    if validator.query_cache is None:
+        raise HTTPException(status_code=404, detail="Query cache is disabled")
+    return await validator.query_cache.metrics()
+
+
+@miner_router.get("/selector/stats")
+async def get_miner_selector_stats(validator: Validator = Depends(get_validator),
+                                   api_key: str = Depends(api_key_auth)):
+    """Per-miner latency and success estimates of this gateway worker."""
+    return validator.miner_selector.stats()
+
+
 @miner_router.get("/miner/ranks")
 async def get_ranks(network: Optional[str] = None,
                           validator: Validator = Depends(get_validator),
@@ -9,9 +9,9 @@ class BitcoinMoneyFlowQueryApi(MoneyFlowQueryApi):
         super().__init__()
         self.validator = validator
 
-    async def _execute_query(self, query: str, model_kind=MODEL_KIND_MONEY_FLOW) -> dict:
+    async def _execute_query(self, query: str, model_kind=MODEL_KIND_MONEY_FLOW, block_height: Optional[int] = None) -> dict:
         try:
-            data = await self.validator.query_miner(NETWORK_BITCOIN, model_kind, query, miner_key=None)
+            data = await self.validator.query_miner(NETWORK_BITCOIN, model_kind, query, miner_key=None, block_height=block_height)
             return data
         except Exception as e:
             raise Exception(f"Error executing query: {str(e)}")
@@ -142,7 +142,7 @@ class BitcoinMoneyFlowQueryApi(MoneyFlowQueryApi):
                 element.btc_value AS btc_value
                 """ % block_height
 
-        data = await self._execute_query(query)
+        data = await self._execute_query(query, block_height=block_height)
         return data if data else []
 
     async def get_transaction_by_tx_id(self, tx_id: str) -> dict:
@@ -1,3 +1,4 @@
+from typing import Optional
 from src.subnet.protocol import NETWORK_COMMUNE, MODEL_KIND_MONEY_FLOW
 from src.subnet.validator.validator import Validator
 from src.subnet.gateway.services import MoneyFlowQueryApi
@@ -8,9 +9,9 @@ class CommuneMoneyFlowQueryApi(MoneyFlowQueryApi):
         super().__init__()
         self.validator = validator
 
-    async def _execute_query(self, query: str, model_kind=MODEL_KIND_MONEY_FLOW) -> dict:
+    async def _execute_query(self, query: str, model_kind=MODEL_KIND_MONEY_FLOW, block_height: Optional[int] = None) -> dict:
         try:
-            data = await self.validator.query_miner(NETWORK_COMMUNE, model_kind, query, miner_key=None)
+            data = await self.validator.query_miner(NETWORK_COMMUNE, model_kind, query, miner_key=None, block_height=block_height)
             return data
         except Exception as e:
             raise Exception(f"Error executing query: {str(e)}")
@@ -65,7 +66,7 @@ class CommuneMoneyFlowQueryApi(MoneyFlowQueryApi):
 
         """ % block_height
 
-        data = await self._execute_query(query)
+        data = await self._execute_query(query, block_height=block_height)
         return data
 
     async def get_transaction_by_tx_id(self, tx_id: str) -> dict:
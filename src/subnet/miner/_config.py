@@ -30,6 +30,27 @@ class MinerSettings(BaseSettings):
     GRAPH_DATABASE_USER: str
     GRAPH_DATABASE_PASSWORD: str
     GRAPH_DATABASE_URL: str
+    GRAPH_DATABASE_MAX_POOL_SIZE: int = 128
+    GRAPH_DATABASE_MAX_CONNECTION_LIFETIME: float = 3600.0
+    GRAPH_DATABASE_WARM_CONNECTIONS: int = 8  # opened at startup, so the first requests don't pay connection setup
+    GRAPH_DATABASE_LIVENESS_CHECK_TIMEOUT: float = 30.0  # pooled connections idle for longer are checked before reuse
+    GRAPH_DATABASE_HEALTH_CHECK_INTERVAL: float = 30.0  # 0 disables the background health check
+    GRAPH_QUERY_TIMEOUT: float = 50.0  # transaction timeout of organic queries, below the validator query timeout
+    GRAPH_CHALLENGE_TIMEOUT: float = 20.0  # transaction timeout of challenge queries
+    GRAPH_QUERY_CANCEL_GRACE: float = 1.0  # queries still running this long after their timeout are cancelled client side
+    GRAPH_INDEX_BOOTSTRAP: bool = True  # check and create the challenge indexes at startup
+
+    # admission control, each kind of request has its own pool and queue, challenges are admitted first
+    CHALLENGE_CONCURRENCY: int = 32
+    CHALLENGE_QUEUE_SIZE: int = 512
+    DISCOVERY_CONCURRENCY: int = 16
+    DISCOVERY_QUEUE_SIZE: int = 256
+    QUERY_CONCURRENCY: int = 16
+    QUERY_QUEUE_SIZE: int = 32  # queries beyond this are rejected right away
+    QUERY_MAX_QUEUE_WAIT: float = 10.0  # queries queued for longer are rejected
+    ADMISSION_STATS_LOG_INTERVAL: float = 60.0  # 0 disables the periodic queue-wait metrics log
+
+    BALANCE_SUMS_SYNC_INTERVAL: float = 30.0  # seconds between block_balance_sums updates, 0 disables the sums
 
     class Config:
         extra = 'ignore'
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional
+
+from loguru import logger
+
+ADMISSION_CHALLENGE = "challenge"
+ADMISSION_DISCOVERY = "discovery"
+ADMISSION_QUERY = "query"
+
+
+class AdmissionRejected(Exception):
+    pass
+
+
+class AdmissionLane:
+    """Concurrency pool and wait queue of one kind of request, with its queue-wait metrics."""
+
+    __slots__ = ("name", "concurrency", "max_queue", "max_queue_wait", "active", "waiters", "admitted", "rejected",
+                 "timed_out", "waits")
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_queue_wait: Optional[float] = None,
+                 window: int = 1024):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waits: Deque[float] = deque(maxlen=window)
+
+    def stats(self) -> dict:
+        waits = sorted(self.waits)
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0.0
+
+        return {
+            "active": self.active,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait_p50_ms": percentile(0.5),
+            "queue_wait_p95_ms": percentile(0.95),
+            "queue_wait_max_ms": round(waits[-1] * 1000, 2) if waits else 0.0,
+        }
+
+
+class AdmissionController:
+    """
+    Admits miner requests through one lane per kind of request, in strict priority order.
+
+    Each lane runs at most `concurrency` requests and queues at most `max_queue` more, requests beyond that are
+    rejected right away instead of piling up behind the database. A lane only starts requests while no lane before it
+    in `priority` has requests waiting, so when challenges queue up, organic queries stop taking database connections
+    until the challenges are admitted.
+    """
+
+    def __init__(self, lanes: List[AdmissionLane]):
+        self.lanes: Dict[str, AdmissionLane] = {lane.name: lane for lane in lanes}
+        self.priority = lanes
+
+    def _can_start(self, lane: AdmissionLane) -> bool:
+        if lane.active >= lane.concurrency:
+            return False
+        for other in self.priority:
+            if other is lane:
+                return True
+            if other.waiters:
+                return False
+        return True
+
+    def _dispatch(self):
+        for lane in self.priority:
+            while lane.waiters and self._can_start(lane):
+                waiter = lane.waiters.popleft()
+                lane.active += 1
+                waiter.set_result(None)
+
+    def _release(self, lane: AdmissionLane):
+        lane.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, kind: str):
+        lane = self.lanes[kind]
+        start = time.monotonic()
+
+        if not lane.waiters and self._can_start(lane):
+            lane.active += 1
+        else:
+            if len(lane.waiters) >= lane.max_queue:
+                lane.rejected += 1
+                raise AdmissionRejected(f"Miner is overloaded, too many {kind} requests queued")
+
+            waiter = asyncio.get_running_loop().create_future()
+            lane.waiters.append(waiter)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), lane.max_queue_wait)
+            except BaseException as e:
+                if waiter.done():
+                    # the slot was handed over while this request gave up
+                    self._release(lane)
+                else:
+                    waiter.cancel()
+                    lane.waiters.remove(waiter)
+                    # a lane below may have been held back by this waiter
+                    self._dispatch()
+                if isinstance(e, asyncio.TimeoutError):
+                    lane.timed_out += 1
+                    raise AdmissionRejected(f"Miner is overloaded, {kind} request waited {lane.max_queue_wait}s") from e
+                raise
+
+        lane.admitted += 1
+        lane.waits.append(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    async def log_stats(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            logger.info("Admission stats", **self.stats())
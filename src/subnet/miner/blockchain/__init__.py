@@ -1,39 +1,103 @@
+import asyncio
 import time
+from typing import Optional
 from src.subnet.validator.database import db_manager
 from src.subnet.miner._config import MinerSettings
+from src.subnet.miner.blockchain.balance_sums import block_balance_sums
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
-from neo4j import READ_ACCESS, GraphDatabase, WRITE_ACCESS
+from neo4j import READ_ACCESS, AsyncGraphDatabase, Query, WRITE_ACCESS
 from neo4j.exceptions import Neo4jError
 
 
 class GraphSearch:
+    """
+    Graph database access of the miner. One instance is created per process at startup and shared by all requests,
+    so its driver keeps a warm connection pool instead of connecting for every query.
+    """
 
     def __init__(self, settings: MinerSettings):
-        self.driver = GraphDatabase.driver(
+        self.settings = settings
+        self.driver = AsyncGraphDatabase.driver(
             settings.GRAPH_DATABASE_URL,
             auth=(settings.GRAPH_DATABASE_USER, settings.GRAPH_DATABASE_PASSWORD),
             connection_timeout=60,
-            max_connection_lifetime=60,
-            max_connection_pool_size=128,
+            max_connection_lifetime=settings.GRAPH_DATABASE_MAX_CONNECTION_LIFETIME,
+            max_connection_pool_size=settings.GRAPH_DATABASE_MAX_POOL_SIZE,
+            liveness_check_timeout=settings.GRAPH_DATABASE_LIVENESS_CHECK_TIMEOUT,
             fetch_size=1000,
             encrypted=False,
         )
-
-    def execute_query(self, query: str):
-        with self.driver.session(default_access_mode=WRITE_ACCESS) as session:
+        self.healthy = False
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Verifies connectivity, opens the warm connections and starts the background health check."""
+        await self.driver.verify_connectivity()
+        # concurrent pings each hold their own connection, which then stays idle in the pool
+        await asyncio.gather(*[self._ping() for _ in range(self.settings.GRAPH_DATABASE_WARM_CONNECTIONS)])
+        self.healthy = True
+        logger.info("Graph database connection pool ready", warm_connections=self.settings.GRAPH_DATABASE_WARM_CONNECTIONS)
+
+        if self.settings.GRAPH_INDEX_BOOTSTRAP:
             try:
-                result = session.run(query)
+                await self.bootstrap()
+            except Exception as e:
+                logger.warning("Graph index bootstrap failed, challenges fall back to existing indexes", error=str(e))
+
+        interval = self.settings.GRAPH_DATABASE_HEALTH_CHECK_INTERVAL
+        if interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop(interval))
 
-                # If no results are found, return an empty list
-                if not result:
-                    return []
+    async def bootstrap(self):
+        """Checks the indexes challenges are answered from and creates the missing ones."""
+
+    async def _ping(self):
+        async with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            result = await session.run("RETURN 1")
+            await result.consume()
+
+    async def health_check(self, timeout: float = 10.0) -> bool:
+        try:
+            await asyncio.wait_for(self._ping(), timeout)
+            healthy = True
+        except Exception as e:
+            logger.warning("Graph database health check failed", error=str(e))
+            healthy = False
+
+        if healthy and not self.healthy:
+            logger.info("Graph database is reachable again")
+        self.healthy = healthy
+        return healthy
+
+    async def _health_check_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.health_check()
+
+    async def execute_query(self, query: str, timeout: Optional[float] = None):
+        """
+        Runs an organic query. Neo4j aborts its transaction after `timeout` seconds (GRAPH_QUERY_TIMEOUT by default),
+        and the query is cancelled client side if it is still running after the cancel grace period, which releases
+        its connection even when the database doesn't answer.
+        """
+        timeout = timeout or self.settings.GRAPH_QUERY_TIMEOUT
+        try:
+            return await asyncio.wait_for(self._execute_query(query, timeout), timeout + self.settings.GRAPH_QUERY_CANCEL_GRACE)
+        except asyncio.TimeoutError as e:
+            logger.warning("Cancelled query after timeout", timeout=timeout, query=query)
+            raise ValueError(f"Query timed out after {timeout} seconds") from e
+
+    async def _execute_query(self, query: str, timeout: float):
+        async with self.driver.session(default_access_mode=WRITE_ACCESS) as session:
+            try:
+                result = await session.run(Query(query, timeout=timeout))
 
                 results_data = []
 
                 # Iterate through the query result
-                for record in result:
+                async for record in result:
                     processed_record = {}
 
                     # Iterate over the key-value pairs in each record
@@ -74,11 +138,25 @@ class GraphSearch:
                 logger.error("Failed to execute query", error=e, query=query)
                 raise ValueError("Failed to execute query") from e
 
-    def solve_challenge(self, in_total_amount: int, out_total_amount: int, tx_id_last_6_chars: str) -> str:
+    async def fetch_value(self, query: str, timeout: float, **parameters):
+        """Returns the first value of the first record of a read query, with the same timeouts as execute_query."""
+
+        async def fetch():
+            async with self.driver.session(default_access_mode=READ_ACCESS) as session:
+                result = await session.run(Query(query, timeout=timeout), parameters)
+                record = await result.single()
+                return None if record is None else record[0]
+
+        return await asyncio.wait_for(fetch(), timeout + self.settings.GRAPH_QUERY_CANCEL_GRACE)
+
+    async def solve_challenge(self, in_total_amount: int, out_total_amount: int, tx_id_last_6_chars: str) -> str:
         """Solve a challenge and return the result."""
 
-    def close(self):
-        self.driver.close()
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await self.driver.close()
 
 
 class BalanceSearch:
@@ -103,18 +181,27 @@ class BalanceSearch:
         start_time = time.time()
         try:
             logger.info(f"Executing balance sum query for block heights: {block_heights}")
-            async with db_manager.session() as session:
-                query = text("SELECT SUM(balance_delta) FROM balance_changes WHERE block_height = ANY(:block_heights)")
-                query = await session.execute(query, {'block_heights': block_heights})
-                result = query.scalar()
-                if result:
-                    sum_balance_delta = int(result)
+            sum_balance_delta = 0
+            missing_heights = []
+            for block_height in dict.fromkeys(block_heights):
+                block_sum = block_balance_sums.get(block_height)
+                if block_sum is None:
+                    missing_heights.append(block_height)
                 else:
-                    sum_balance_delta = 0
+                    sum_balance_delta += block_sum
+
+            # heights not summed yet are aggregated from the raw table
+            if missing_heights:
+                async with db_manager.session() as session:
+                    query = text("SELECT SUM(balance_delta) FROM balance_changes WHERE block_height = ANY(:block_heights)")
+                    query = await session.execute(query, {'block_heights': missing_heights})
+                    result = query.scalar()
+                    if result:
+                        sum_balance_delta += int(result)
 
-                logger.info(f"Balance changes sum for block heights {block_heights}: {sum_balance_delta}")
+            logger.info(f"Balance changes sum for block heights {block_heights}: {sum_balance_delta}")
 
-                return sum_balance_delta
+            return sum_balance_delta
 
         except SQLAlchemyError as e:
             logger.error(f"An error occurred: {str(e)}")
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+
+from src.subnet.miner._config import MinerSettings, load_environment
+from src.subnet.validator.database import db_manager
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS block_balance_sums (
+    block_height BIGINT PRIMARY KEY,
+    sum_delta BIGINT NOT NULL,
+    change_count BIGINT NOT NULL
+)
+"""
+
+SUMMARIZE_SQL = """
+INSERT INTO block_balance_sums (block_height, sum_delta, change_count)
+SELECT block_height, SUM(balance_delta)::bigint, COUNT(*)
+FROM balance_changes
+WHERE block_height BETWEEN :start AND :end
+GROUP BY block_height
+ON CONFLICT (block_height) DO UPDATE SET sum_delta = EXCLUDED.sum_delta, change_count = EXCLUDED.change_count
+RETURNING block_height, sum_delta
+"""
+
+CHECK_SQL = """
+WITH raw AS (
+    SELECT block_height, SUM(balance_delta)::bigint AS sum_delta, COUNT(*) AS change_count
+    FROM balance_changes
+    WHERE block_height BETWEEN :start AND :end
+    GROUP BY block_height
+), summed AS (
+    SELECT block_height, sum_delta, change_count
+    FROM block_balance_sums
+    WHERE block_height BETWEEN :start AND :end
+)
+SELECT block_height, raw.sum_delta, summed.sum_delta, raw.change_count, summed.change_count
+FROM raw FULL OUTER JOIN summed USING (block_height)
+WHERE raw.sum_delta IS DISTINCT FROM summed.sum_delta OR raw.change_count IS DISTINCT FROM summed.change_count
+ORDER BY block_height
+"""
+
+
+class BlockBalanceSums:
+    """
+    Per-block sums of balance_changes, so balance tracking challenges don't aggregate the raw table.
+
+    The sums are kept in the compact block_balance_sums table, filled by the backfill command of this module, and
+    mirrored in an array indexed by block height that is loaded at startup. While the miner runs, `sync` summarizes
+    new blocks and re-summarizes the last `reorg_depth` ones, in case the indexer rewrote them.
+    """
+
+    def __init__(self, reorg_depth: int = 6, sync_batch_size: int = 1000):
+        self.reorg_depth = reorg_depth
+        self.sync_batch_size = sync_batch_size
+        self.sums = array("q")
+        self.present = bytearray()
+        self.max_height = -1
+        self.loaded = False
+
+    def get(self, block_height: int) -> Optional[int]:
+        if 0 <= block_height < len(self.present) and self.present[block_height]:
+            return self.sums[block_height]
+        return None
+
+    def _apply(self, rows: Iterable[Tuple[int, int]]):
+        for block_height, sum_delta in rows:
+            if block_height >= len(self.present):
+                grow = block_height + 1 - len(self.present) + 10_000
+                self.sums.frombytes(bytes(8 * grow))
+                self.present.extend(bytes(grow))
+            self.sums[block_height] = sum_delta
+            self.present[block_height] = 1
+            self.max_height = max(self.max_height, block_height)
+
+    def _clear(self, start: int, end: int):
+        for block_height in range(max(start, 0), min(end + 1, len(self.present))):
+            self.present[block_height] = 0
+
+    async def load(self):
+        async with db_manager.session() as session:
+            result = await session.stream(text("SELECT block_height, sum_delta FROM block_balance_sums"))
+            async for partition in result.partitions(10_000):
+                self._apply(partition)
+        self.loaded = True
+        logger.info("Loaded block balance sums", max_height=self.max_height)
+
+    async def start(self) -> bool:
+        """Loads the sums, returns False and leaves lookups to the raw table if the table isn't there (yet)."""
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning("Block balance sums unavailable, challenges use balance_changes", error=str(e))
+            return False
+        if self.max_height < 0:
+            logger.warning("block_balance_sums is empty, run the backfill command of src/subnet/miner/blockchain/balance_sums.py")
+        return True
+
+    async def summarize(self, start: int, end: int, replace: bool = False) -> int:
+        """Summarizes blocks start..end into the table, `replace` also drops sums of heights without balance changes."""
+        async with db_manager.session() as session:
+            async with session.begin():
+                if replace:
+                    await session.execute(
+                        text("DELETE FROM block_balance_sums WHERE block_height BETWEEN :start AND :end"),
+                        {"start": start, "end": end},
+                    )
+                rows = (await session.execute(text(SUMMARIZE_SQL), {"start": start, "end": end})).fetchall()
+
+        if replace:
+            self._clear(start, end)
+            if self.max_height >= start:
+                self.max_height = start - 1
+        self._apply(rows)
+        return len(rows)
+
+    async def sync(self):
+        if self.max_height < 0:
+            return
+        end = await get_max_balance_changes_height()
+        if end is None:
+            return
+        start = max(self.max_height - self.reorg_depth + 1, 0)
+        # a miner that was down for a while catches up over several syncs
+        end = min(end, self.max_height + self.sync_batch_size)
+        summarized = await self.summarize(start, max(end, self.max_height), replace=True)
+        logger.debug("Synced block balance sums", start=start, end=end, blocks=summarized)
+
+    async def sync_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error("Failed to sync block balance sums", error=str(e))
+
+
+block_balance_sums = BlockBalanceSums()
+
+
+async def ensure_table():
+    async with db_manager.session() as session:
+        async with session.begin():
+            await session.execute(text(CREATE_TABLE_SQL))
+
+
+async def get_max_balance_changes_height() -> Optional[int]:
+    async with db_manager.session() as session:
+        return (await session.execute(text("SELECT MAX(block_height) FROM balance_changes"))).scalar()
+
+
+async def get_max_summed_height() -> Optional[int]:
+    async with db_manager.session() as session:
+        return (await session.execute(text("SELECT MAX(block_height) FROM block_balance_sums"))).scalar()
+
+
+async def backfill(from_height: Optional[int], to_height: Optional[int], batch_size: int):
+    """Summarizes blocks in batches of `batch_size`, by default resuming after the highest height already summed."""
+    await ensure_table()
+    if from_height is None:
+        max_summed_height = await get_max_summed_height()
+        from_height = 0 if max_summed_height is None else max_summed_height + 1
+    if to_height is None:
+        to_height = await get_max_balance_changes_height()
+    if to_height is None or from_height > to_height:
+        logger.info("Nothing to backfill", from_height=from_height, to_height=to_height)
+        return
+
+    sums = BlockBalanceSums()
+    for start in range(from_height, to_height + 1, batch_size):
+        end = min(start + batch_size - 1, to_height)
+        blocks = await sums.summarize(start, end)
+        logger.info("Backfilled block balance sums", start=start, end=end, blocks=blocks)
+
+
+async def check(from_height: int, to_height: Optional[int], batch_size: int, repair: bool) -> List[tuple]:
+    """Compares block_balance_sums with balance_changes, returns the mismatching heights and optionally repairs them."""
+    if to_height is None:
+        to_height = await get_max_balance_changes_height() or 0
+
+    sums = BlockBalanceSums()
+    mismatches = []
+    for start in range(from_height, to_height + 1, batch_size):
+        end = min(start + batch_size - 1, to_height)
+        async with db_manager.session() as session:
+            rows = (await session.execute(text(CHECK_SQL), {"start": start, "end": end})).fetchall()
+        for block_height, raw_sum, summed_sum, raw_count, summed_count in rows:
+            logger.warning("Block balance sum mismatch", block_height=block_height, raw_sum=raw_sum, summed_sum=summed_sum,
+                           raw_count=raw_count, summed_count=summed_count)
+        mismatches.extend(rows)
+        if rows and repair:
+            await sums.summarize(start, end, replace=True)
+
+    logger.info("Checked block balance sums", from_height=from_height, to_height=to_height, mismatches=len(mismatches),
+                repaired=repair)
+    return mismatches
+
+
+async def main(args):
+    try:
+        if args.command == "backfill":
+            await backfill(args.from_height, args.to_height, args.batch_size)
+        else:
+            await check(args.from_height or 0, args.to_height, args.batch_size, args.repair)
+    finally:
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintains the block_balance_sums table of the miner")
+    parser.add_argument("environment", choices=["testnet", "mainnet"])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("backfill", "check"):
+        subparser = subparsers.add_parser(command)
+        subparser.add_argument("--from-height", type=int)
+        subparser.add_argument("--to-height", type=int)
+        subparser.add_argument("--batch-size", type=int, default=1000)
+        if command == "check":
+            subparser.add_argument("--repair", action="store_true", help="re-summarize batches with mismatches")
+    args = parser.parse_args()
+
+    load_environment(args.environment)
+    db_manager.init(MinerSettings().DATABASE_URL)
+    asyncio.run(main(args))
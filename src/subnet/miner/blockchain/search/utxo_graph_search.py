@@ -1,29 +1,48 @@
 import time
 from loguru import logger
 from src.subnet.miner.blockchain import GraphSearch
+from src.subnet.miner.blockchain.search.utxo_indexes import ensure_challenge_indexes
 
 
 class UtxoGraphSearch(GraphSearch):
 
-    def solve_challenge(self, in_total_amount: int, out_total_amount: int, tx_id_last_6_chars: str) -> str | None:
+    async def bootstrap(self):
+        if self.settings.GRAPH_DB_TYPE != "neo4j":
+            logger.info("Skipping challenge index bootstrap", graph_db=self.settings.GRAPH_DB_TYPE)
+            return
+        await ensure_challenge_indexes(self.driver)
+
+    async def solve_challenge(self, in_total_amount: int, out_total_amount: int, tx_id_last_6_chars: str) -> str | None:
         start_time = time.time()
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (t:Transaction {out_total_amount: $out_total_amount})
-                    WHERE t.in_total_amount = $in_total_amount AND t.tx_id ENDS WITH $tx_id_last_6_chars
-                    RETURN t.tx_id
-                    LIMIT 1;
-                    """,
-                    in_total_amount=in_total_amount,
-                    out_total_amount=out_total_amount,
-                    tx_id_last_6_chars=tx_id_last_6_chars
-                )
-                single_result = result.single()
-                if single_result is None or single_result[0] is None:
-                    return None
-                return single_result[0]
+            # seek on the (out_total_amount, in_total_amount, tx_id_suffix) index
+            tx_id = await self.fetch_value(
+                """
+                MATCH (t:Transaction {out_total_amount: $out_total_amount, in_total_amount: $in_total_amount, tx_id_suffix: $tx_id_last_6_chars})
+                RETURN t.tx_id
+                LIMIT 1;
+                """,
+                self.settings.GRAPH_CHALLENGE_TIMEOUT,
+                in_total_amount=in_total_amount,
+                out_total_amount=out_total_amount,
+                tx_id_last_6_chars=tx_id_last_6_chars
+            )
+            if tx_id is not None:
+                return tx_id
+
+            # transactions indexed after the last tx_id_suffix backfill, seek on (out_total_amount, in_total_amount)
+            return await self.fetch_value(
+                """
+                MATCH (t:Transaction {out_total_amount: $out_total_amount, in_total_amount: $in_total_amount})
+                WHERE t.tx_id_suffix IS NULL AND t.tx_id ENDS WITH $tx_id_last_6_chars
+                RETURN t.tx_id
+                LIMIT 1;
+                """,
+                self.settings.GRAPH_CHALLENGE_TIMEOUT,
+                in_total_amount=in_total_amount,
+                out_total_amount=out_total_amount,
+                tx_id_last_6_chars=tx_id_last_6_chars
+            )
 
         except Exception as e:
             return None
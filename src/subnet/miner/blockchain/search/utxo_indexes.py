@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+from typing import List
+
+from loguru import logger
+from neo4j import AsyncDriver, AsyncGraphDatabase
+
+from src.subnet.miner._config import MinerSettings, load_environment
+
+TX_ID_SUFFIX_LENGTH = 6
+
+# (name, properties) of the :Transaction indexes money flow challenges are answered from
+CHALLENGE_INDEXES = [
+    ("transaction_challenge_amounts", ("out_total_amount", "in_total_amount")),
+    ("transaction_challenge_amounts_suffix", ("out_total_amount", "in_total_amount", "tx_id_suffix")),
+]
+
+BACKFILL_TX_ID_SUFFIX_QUERY = """
+MATCH (t:Transaction) WHERE t.tx_id_suffix IS NULL
+CALL {{
+    WITH t
+    SET t.tx_id_suffix = right(t.tx_id, {suffix_length})
+}} IN TRANSACTIONS OF {batch_size} ROWS
+"""
+
+
+async def get_transaction_indexes(driver: AsyncDriver) -> dict:
+    """Returns {properties: (name, state, population percent)} of the indexes on :Transaction."""
+    async with driver.session() as session:
+        result = await session.run(
+            "SHOW INDEXES YIELD name, state, populationPercent, labelsOrTypes, properties "
+            "WHERE 'Transaction' IN labelsOrTypes RETURN name, state, populationPercent, properties"
+        )
+        return {tuple(record["properties"]): (record["name"], record["state"], record["populationPercent"])
+                async for record in result}
+
+
+async def ensure_challenge_indexes(driver: AsyncDriver) -> List[str]:
+    """
+    Creates the challenge indexes that are missing, an equivalent index under another name counts as present.
+    Returns the names of the indexes that aren't online yet, new indexes populate in the background.
+    """
+    indexes = await get_transaction_indexes(driver)
+    for name, properties in CHALLENGE_INDEXES:
+        if properties in indexes:
+            continue
+        on = ", ".join(f"t.{prop}" for prop in properties)
+        async with driver.session() as session:
+            result = await session.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (t:Transaction) ON ({on})")
+            await result.consume()
+        logger.info("Created challenge index", name=name, properties=properties)
+
+    indexes = await get_transaction_indexes(driver)
+    pending = []
+    for name, properties in CHALLENGE_INDEXES:
+        index_name, state, population_percent = indexes.get(properties, (name, "MISSING", 0.0))
+        if state != "ONLINE":
+            logger.warning("Challenge index not online, challenges are slower until it is", name=index_name,
+                           state=state, population_percent=population_percent)
+            pending.append(index_name)
+    return pending
+
+
+async def backfill_tx_id_suffix(driver: AsyncDriver, batch_size: int = 10_000):
+    """Stores tx_id_suffix on every :Transaction without one, in transactions of `batch_size` nodes."""
+    async with driver.session() as session:
+        result = await session.run(BACKFILL_TX_ID_SUFFIX_QUERY.format(suffix_length=TX_ID_SUFFIX_LENGTH, batch_size=int(batch_size)))
+        summary = await result.consume()
+    logger.info("Backfilled tx_id_suffix", properties_set=summary.counters.properties_set)
+
+
+async def main(args):
+    settings = MinerSettings()
+    driver = AsyncGraphDatabase.driver(
+        settings.GRAPH_DATABASE_URL,
+        auth=(settings.GRAPH_DATABASE_USER, settings.GRAPH_DATABASE_PASSWORD),
+        encrypted=False,
+    )
+    try:
+        await ensure_challenge_indexes(driver)
+        if args.command == "backfill-suffix":
+            await backfill_tx_id_suffix(driver, args.batch_size)
+    finally:
+        await driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Creates the money flow challenge indexes of a bitcoin miner")
+    parser.add_argument("environment", choices=["testnet", "mainnet"])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("ensure-indexes")
+    backfill = subparsers.add_parser("backfill-suffix", help="store tx_id_suffix on transactions without it")
+    backfill.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    load_environment(args.environment)
+    asyncio.run(main(args))
@@ -1,4 +1,6 @@
+import asyncio
 from datetime import datetime
+from typing import Optional
 from communex._common import get_node_url
 from communex.balance import to_nano
 from communex.client import CommuneClient
@@ -11,6 +13,10 @@ from substrateinterface import Keypair
 from src.subnet import VERSION
 from src.subnet.encryption import generate_hash
 from src.subnet.miner._config import MinerSettings, load_environment
+from src.subnet.miner.admission import AdmissionController, AdmissionLane, AdmissionRejected, ADMISSION_CHALLENGE, \
+    ADMISSION_DISCOVERY, ADMISSION_QUERY
+from src.subnet.miner.blockchain import GraphSearch
+from src.subnet.miner.blockchain.balance_sums import block_balance_sums
 from src.subnet.miner.blockchain.search import GraphSearchFactory, BalanceSearchFactory
 from src.subnet.protocol import Challenge, MODEL_KIND_MONEY_FLOW, MODEL_KIND_BALANCE_TRACKING
 from src.subnet.validator.database import db_manager
@@ -24,6 +30,46 @@ class Miner(Module):
         self.settings = settings
         self.graph_search_factory = GraphSearchFactory()
         self.balance_search_factory = BalanceSearchFactory()
+        self.graph_search: Optional[GraphSearch] = None
+        self.graph_search_lock = asyncio.Lock()
+        # lanes in priority order, challenges first
+        self.admission = AdmissionController([
+            AdmissionLane(ADMISSION_CHALLENGE, settings.CHALLENGE_CONCURRENCY, settings.CHALLENGE_QUEUE_SIZE),
+            AdmissionLane(ADMISSION_DISCOVERY, settings.DISCOVERY_CONCURRENCY, settings.DISCOVERY_QUEUE_SIZE),
+            AdmissionLane(ADMISSION_QUERY, settings.QUERY_CONCURRENCY, settings.QUERY_QUEUE_SIZE, settings.QUERY_MAX_QUEUE_WAIT),
+        ])
+        self.admission_stats_task: Optional[asyncio.Task] = None
+        self.balance_sums_task: Optional[asyncio.Task] = None
+
+    async def get_graph_search(self) -> GraphSearch:
+        """Returns the GraphSearch shared by all requests of this process, creating and warming it up on first use."""
+        if self.graph_search is None:
+            async with self.graph_search_lock:
+                if self.graph_search is None:
+                    graph_search = self.graph_search_factory.create_graph_search(self.settings)
+                    try:
+                        await graph_search.start()
+                    except Exception:
+                        await graph_search.close()
+                        raise
+                    self.graph_search = graph_search
+        return self.graph_search
+
+    async def startup(self):
+        await self.get_graph_search()
+        if self.settings.ADMISSION_STATS_LOG_INTERVAL > 0:
+            self.admission_stats_task = asyncio.create_task(self.admission.log_stats(self.settings.ADMISSION_STATS_LOG_INTERVAL))
+        if self.settings.BALANCE_SUMS_SYNC_INTERVAL > 0 and await block_balance_sums.start():
+            self.balance_sums_task = asyncio.create_task(block_balance_sums.sync_loop(self.settings.BALANCE_SUMS_SYNC_INTERVAL))
+
+    async def shutdown(self):
+        for task in (self.admission_stats_task, self.balance_sums_task):
+            if task is not None:
+                task.cancel()
+        self.admission_stats_task = self.balance_sums_task = None
+        if self.graph_search is not None:
+            await self.graph_search.close()
+            self.graph_search = None
 
     @endpoint
     async def discovery(self, validator_version: str, validator_key: str) -> dict:
@@ -40,15 +86,16 @@ class Miner(Module):
 
         logger.debug(f"Received discovery request from {validator_key}", validator_key=validator_key)
 
-        if float(validator_version) != VERSION:
-            logger.error(f"Invalid validator version: {validator_version}, expected: {VERSION}")
-            raise ValueError(f"Invalid validator version: {validator_version}, expected: {VERSION}")
+        async with self.admission.admit(ADMISSION_DISCOVERY):
+            if float(validator_version) != VERSION:
+                logger.error(f"Invalid validator version: {validator_version}, expected: {VERSION}")
+                raise ValueError(f"Invalid validator version: {validator_version}, expected: {VERSION}")
 
-        return {
-            "network": self.settings.NETWORK,
-            "version": VERSION,
-            "graph_db": self.settings.GRAPH_DB_TYPE
-        }
+            return {
+                "network": self.settings.NETWORK,
+                "version": VERSION,
+                "graph_db": self.settings.GRAPH_DB_TYPE
+            }
 
     @endpoint
     async def query(self, model_kind: str, query: str, validator_key: str) -> dict:
@@ -56,31 +103,32 @@ class Miner(Module):
         logger.debug(f"Received query request from {validator_key}", validator_key=validator_key)
 
         try:
-            if model_kind == MODEL_KIND_MONEY_FLOW:
-                search = GraphSearchFactory().create_graph_search(self.settings)
-                result = search.execute_query(query)
-                response_hash = generate_hash(str(result))
-                result_hash_signature = self.keypair.sign(response_hash).hex()
-
-                return {
-                    "result": result,
-                    "result_hash_signature": result_hash_signature,
-                    "result_hash": response_hash
-                }
-
-            elif model_kind == MODEL_KIND_BALANCE_TRACKING:
-                search = BalanceSearchFactory().create_balance_search(self.settings.NETWORK)
-                result = await search.execute_query(query)
-                response_hash = generate_hash(str(result))
-                result_hash_signature = self.keypair.sign(response_hash).hex()
-
-                return {
-                    "result": result,
-                    "result_hash_signature": result_hash_signature,
-                    "result_hash": response_hash
-                }
-            else:
-                raise ValueError(f"Invalid model type: {model_kind}")
+            async with self.admission.admit(ADMISSION_QUERY):
+                if model_kind == MODEL_KIND_MONEY_FLOW:
+                    search = await self.get_graph_search()
+                    result = await search.execute_query(query)
+                    response_hash = generate_hash(str(result))
+                    result_hash_signature = self.keypair.sign(response_hash).hex()
+
+                    return {
+                        "result": result,
+                        "result_hash_signature": result_hash_signature,
+                        "result_hash": response_hash
+                    }
+
+                elif model_kind == MODEL_KIND_BALANCE_TRACKING:
+                    search = BalanceSearchFactory().create_balance_search(self.settings.NETWORK)
+                    result = await search.execute_query(query)
+                    response_hash = generate_hash(str(result))
+                    result_hash_signature = self.keypair.sign(response_hash).hex()
+
+                    return {
+                        "result": result,
+                        "result_hash_signature": result_hash_signature,
+                        "result_hash": response_hash
+                    }
+                else:
+                    raise ValueError(f"Invalid model type: {model_kind}")
         except Exception as e:
             logger.error(f"Error executing query: {e}")
             return {"error": str(e)}
@@ -110,24 +158,30 @@ class Miner(Module):
 
         logger.debug(f"Received challenge request from {validator_key}", validator_key=validator_key)
 
-        challenge = Challenge(**challenge)
-
-        if challenge.model_kind == MODEL_KIND_MONEY_FLOW:
-            search = GraphSearchFactory().create_graph_search(self.settings)
-            tx_id = search.solve_challenge(
-                in_total_amount=challenge.in_total_amount,
-                out_total_amount=challenge.out_total_amount,
-                tx_id_last_6_chars=challenge.tx_id_last_6_chars
-            )
-
-            challenge.output = {'tx_id': tx_id}
-            return challenge
-        else:
-            search = BalanceSearchFactory().create_balance_search(self.settings.NETWORK)
-            challenge.output = {
-                'balance': await search.solve_challenge([challenge.block_height])
-            }
-            return challenge
+        try:
+            async with self.admission.admit(ADMISSION_CHALLENGE):
+                challenge = Challenge(**challenge)
+
+                if challenge.model_kind == MODEL_KIND_MONEY_FLOW:
+                    search = await self.get_graph_search()
+                    tx_id = await search.solve_challenge(
+                        in_total_amount=challenge.in_total_amount,
+                        out_total_amount=challenge.out_total_amount,
+                        tx_id_last_6_chars=challenge.tx_id_last_6_chars
+                    )
+
+                    challenge.output = {'tx_id': tx_id}
+                    return challenge
+                else:
+                    search = BalanceSearchFactory().create_balance_search(self.settings.NETWORK)
+                    challenge.output = {
+                        'balance': await search.solve_challenge([challenge.block_height])
+                    }
+                    return challenge
+        except AdmissionRejected as e:
+            # shed like a rejected query, instead of surfacing as a server error
+            logger.warning(f"Challenge rejected: {e}", validator_key=validator_key)
+            return {"error": str(e)}
 
 
 def stake_to_ratio(stake: int, multiplier: int = 1) -> float:
@@ -208,6 +262,8 @@ if __name__ == "__main__":
                           limiter=stake_limiter)
 
     app = server.get_fastapi_app()
+    app.add_event_handler("startup", miner.startup)
+    app.add_event_handler("shutdown", miner.shutdown)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -0,0 +1,32 @@
+import os
+
+import base58
+
+from src.subnet.validator.nodes.bitcoin.address import (
+    address_stats, b58encode, derive_address, derive_addresses, pubkey_to_address
+)
+
+GENESIS_PUBKEY = "04678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c702b6bf11d5f"
+
+
+def test_b58encode_matches_reference():
+    for data in [b"", b"\0", b"\0\0\x01", os.urandom(25), b"\0" + os.urandom(24), b"\xff" * 32]:
+        assert b58encode(data) == base58.b58encode(data).decode()
+
+
+def test_derives_legacy_script_types():
+    assert pubkey_to_address(GENESIS_PUBKEY) == "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+    assert derive_address({"type": "pubkey"}, f"{GENESIS_PUBKEY} OP_CHECKSIG") == "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+    assert derive_address(
+        {"type": "pubkeyhash", "hex": "76a91462e907b15cbf27d5425399ebf6f0fb50ebb88f1888ac"}, ""
+    ) == "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+    assert derive_address({"type": "witness_v0_keyhash", "address": "bc1qexample"}, "") == "bc1qexample"
+
+
+def test_unknown_scripts_are_counted_not_printed(capsys):
+    asm = f"zz{os.urandom(4).hex()} OP_CHECKSIG"
+    before = address_stats.stats().get("unknown:pubkey", 0)
+    addresses = derive_addresses([{"type": "pubkey", "asm": asm}] * 3)
+    assert addresses == [f"UNKNOWN_{asm[:30]}"] * 3
+    assert address_stats.stats()["unknown:pubkey"] == before + 1
+    assert capsys.readouterr().out == ""
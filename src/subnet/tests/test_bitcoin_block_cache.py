@@ -0,0 +1,98 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from src.subnet.validator.nodes.bitcoin.block_cache import BlockCache
+from src.subnet.validator.nodes.bitcoin.node import ChallengeBitcoinNode
+from src.subnet.validator.nodes.bitcoin.node_utils import TxOutCache, parse_block_data
+
+
+def make_block(height):
+    return {
+        "height": height, "hash": f"hash{height}", "time": 1231006505, "nonce": 7, "difficulty": 1,
+        "tx": [
+            {"txid": f"coinbase{height}", "vin": [{"coinbase": "04ff", "sequence": 0}],
+             "vout": [{"n": 0, "value": Decimal("50"), "scriptPubKey": {"type": "pubkeyhash", "address": "miner", "asm": ""}}]},
+            {"txid": f"spend{height}", "vin": [{"txid": "prev", "vout": 1, "sequence": 1}, {"txid": f"coinbase{height}", "vout": 0, "sequence": 2}],
+             "vout": [{"n": 0, "value": Decimal("0.5"), "scriptPubKey": {"type": "pubkeyhash", "address": "alice", "asm": ""}},
+                      {"n": 1, "value": Decimal("0"), "scriptPubKey": {"type": "nulldata", "asm": "OP_RETURN 00"}}]},
+        ],
+    }
+
+
+def test_block_cache_round_trips_and_evicts_oldest(tmp_path):
+    cache = BlockCache(str(tmp_path), max_blocks=2)
+    block = parse_block_data(make_block(1))
+    cache.put(block, [("prev", 1, "bob", 60000000)])
+
+    cached_block, prevouts = cache.get(1)
+    assert cached_block == block
+    assert prevouts == [("prev", 1, "bob", 60000000)]
+
+    cache.put(parse_block_data(make_block(2)))
+    cache.put(parse_block_data(make_block(3)))
+    assert cache.get(1) is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["2.blk", "3.blk"]
+
+
+def test_cached_blocks_need_no_bitcoind_calls(tmp_path, mocker):
+    mocker.patch.object(ChallengeBitcoinNode, "tx_out_cache", TxOutCache())
+    mocker.patch.dict("os.environ", {"BITCOIN_BLOCK_CACHE_DIR": str(tmp_path)})
+    node = ChallengeBitcoinNode()
+    get_block = mocker.patch.object(node, "get_block_by_height", side_effect=make_block)
+    get_transactions = mocker.patch.object(node, "get_transactions_by_ids", return_value=[
+        {"txid": "prev", "vout": [{"n": 1, "value": Decimal("0.6"), "scriptPubKey": {"address": "bob"}}]}
+    ])
+
+    first = node.create_balance_tracking_challenge(5, threading.Event())
+    assert get_block.call_count == 1
+    assert get_transactions.call_count == 1
+
+    mocker.patch.object(ChallengeBitcoinNode, "tx_out_cache", TxOutCache())
+    assert node.create_balance_tracking_challenge(5, threading.Event()) == first
+    assert get_block.call_count == 1
+    assert get_transactions.call_count == 1
+
+
+def test_block_cache_needs_an_absolute_directory_and_only_spent_outputs_are_seeded(mocker):
+    tx_out_cache = TxOutCache()
+    mocker.patch.object(ChallengeBitcoinNode, "tx_out_cache", tx_out_cache)
+    mocker.patch.dict("os.environ", {"BITCOIN_BLOCK_CACHE_DIR": "bitcoin_block_cache"})
+    node = ChallengeBitcoinNode()
+    assert node.block_cache is None
+
+    mocker.patch.object(node, "get_block_by_height", side_effect=make_block)
+    node.get_parsed_block(5)
+    assert tx_out_cache.peek("coinbase5", 0) == ("miner", 5000000000)
+    assert tx_out_cache.peek("spend5", 0) is None
+    assert len(tx_out_cache) == 1
+
+
+def test_money_flow_txn_matches_create_in_memory_txn():
+    pk1, pk2 = "02" + "11" * 32, "03" + "22" * 32
+    tx_data = {
+        "txid": "mixed", "vin": [{"txid": "prev", "vout": 0, "sequence": 1}],
+        "vout": [
+            {"n": 0, "value": Decimal("0.1"), "scriptPubKey": {
+                "type": "multisig", "asm": f"1 {pk1} {pk2} 2 OP_CHECKMULTISIG", "hex": f"5121{pk1}21{pk2}52ae"}},
+            {"n": 1, "value": Decimal("0.2"), "scriptPubKey": {"type": "pubkey", "asm": f"{pk1} OP_CHECKSIG", "hex": f"21{pk1}ac"}},
+            {"n": 2, "value": Decimal("0.3"), "scriptPubKey": {"type": "nonstandard", "asm": "OP_TRUE", "hex": "51"}},
+            {"n": 3, "value": Decimal("0.4"), "scriptPubKey": {"type": "pubkeyhash", "address": "alice", "asm": "", "hex": ""}},
+        ],
+    }
+    unresolvable = {
+        "txid": "unresolvable", "vin": [{"txid": "prev", "vout": 1, "sequence": 1}],
+        "vout": [{"n": 0, "value": Decimal("0.1"), "scriptPubKey": {"type": "witness_unknown", "asm": "1 abcd", "hex": "5102abcd"}}],
+    }
+    block = parse_block_data({"height": 7, "hash": "hash7", "time": 1231006505, "tx": [tx_data, unresolvable]})
+
+    expected = ChallengeBitcoinNode.create_in_memory_txn(tx_data)
+    actual = ChallengeBitcoinNode.money_flow_txn(block.transactions[0])
+    assert [(vout.vout_id, vout.address, vout.value_satoshi) for vout in actual.vouts] == \
+           [(vout.vout_id, vout.address, vout.value_satoshi) for vout in expected.vouts]
+
+    with pytest.raises(Exception):
+        ChallengeBitcoinNode.create_in_memory_txn(unresolvable)
+    with pytest.raises(Exception):
+        ChallengeBitcoinNode.money_flow_txn(block.transactions[1])
@@ -0,0 +1,106 @@
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.subnet.validator.nodes.bitcoin.rpc import BitcoinRpcClient, RpcError
+
+
+class FakeBitcoindHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 65536
+
+    def do_POST(self):
+        server = self.server
+        server.requests += 1
+        server.connections.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        if server.drop_next:
+            server.drop_next = False
+            self.close_connection = True
+            return
+
+        def answer(request):
+            if request["method"] == "getblockcount":
+                return {"result": 850000, "error": None, "id": request["id"]}
+            if request["method"] == "echo":
+                return {"result": request["params"][0], "error": None, "id": request["id"]}
+            return {"result": None, "error": {"code": -32601, "message": "Method not found"}, "id": request["id"]}
+
+        if isinstance(payload, list):
+            server.batch_sizes.append(len(payload))
+            body = [answer(r) for r in reversed(payload)]
+        else:
+            body = answer(payload)
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_bitcoind():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBitcoindHandler)
+    server.requests = 0
+    server.connections = set()
+    server.batch_sizes = []
+    server.drop_next = False
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    host, port = server.server_address
+    return BitcoinRpcClient(f"http://user:pass@{host}:{port}", **kwargs)
+
+
+def test_connections_are_reused(fake_bitcoind):
+    client = make_client(fake_bitcoind, pool_size=2)
+    for _ in range(10):
+        assert client.call("getblockcount") == 850000
+    assert fake_bitcoind.requests == 10
+    assert len(fake_bitcoind.connections) == 1
+    client.close()
+
+
+def test_batch_is_chunked_and_ordered(fake_bitcoind):
+    client = make_client(fake_bitcoind, batch_size=4)
+    commands = [["echo", i] for i in range(10)]
+    assert client.batch_request(commands) == list(range(10))
+    assert fake_bitcoind.batch_sizes == [4, 4, 2]
+    client.close()
+
+
+def test_decimal_values_are_preserved(fake_bitcoind):
+    client = make_client(fake_bitcoind)
+    assert client.call("echo", 0.29) == Decimal("0.29")
+    client.close()
+
+
+def test_retry_on_broken_socket(fake_bitcoind):
+    client = make_client(fake_bitcoind)
+    assert client.call("getblockcount") == 850000
+    fake_bitcoind.drop_next = True
+    assert client.call("getblockcount") == 850000
+    client.close()
+
+
+def test_rpc_error_is_raised(fake_bitcoind):
+    client = make_client(fake_bitcoind)
+    with pytest.raises(RpcError):
+        client.call("unknown")
+    with pytest.raises(Exception):
+        client.batch_request([["echo", 1], ["unknown"]])
+    client.close()
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from src.subnet.validator.nodes.bitcoin.node import ChallengeBitcoinNode
+from src.subnet.validator.nodes.bitcoin.node_utils import TxOutCache, Transaction, VIN
+
+
+def test_tx_out_cache_counts_hits_and_misses():
+    cache = TxOutCache()
+    assert cache.get("abc123", 0) is None
+    cache.put("abc123", 0, "address", 100)
+    assert cache.get("abc123", "0") == ("address", 100)
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_tx_out_cache_evicts_least_recently_used():
+    cache = TxOutCache(max_size=2)
+    cache.put("abc1", 0, "a", 1)
+    cache.put("def2", 0, "b", 2)
+    cache.get("abc1", 0)
+    cache.put("789a", 0, "c", 3)
+    assert len(cache) == 2
+    assert cache.get("def2", 0) is None
+    assert cache.get("abc1", 0) == ("a", 1)
+    assert cache.get("789a", 0) == ("c", 3)
+
+
+def test_block_inputs_are_resolved_in_one_batch(mocker):
+    mocker.patch.object(ChallengeBitcoinNode, "tx_out_cache", TxOutCache())
+    node = ChallengeBitcoinNode()
+
+    def get_transactions_by_ids(tx_ids):
+        return [
+            {"txid": tx_id, "vout": [
+                {"n": n, "value": Decimal("0.29"), "scriptPubKey": {"address": f"{tx_id}-{n}"}} for n in range(2)
+            ]}
+            for tx_id in tx_ids
+        ]
+
+    fetch = mocker.patch.object(node, "get_transactions_by_ids", side_effect=get_transactions_by_ids)
+
+    transactions = []
+    for i in range(3):
+        tx = Transaction(tx_id=f"tx{i}", block_height=1, timestamp=0, fee_satoshi=0)
+        tx.vins = [VIN(tx_id="aaa", vin_id=0, vout_id=i % 2, script_sig="", sequence=0),
+                   VIN(tx_id=f"bb{i}", vin_id=0, vout_id=0, script_sig="", sequence=0)]
+        transactions.append(tx)
+
+    node.prefetch_txouts(transactions)
+    assert fetch.call_count == 1
+    assert sorted(fetch.call_args[0][0]) == ["aaa", "bb0", "bb1", "bb2"]
+
+    input_amounts, *_ = node.process_in_memory_txn_for_indexing(transactions[1])
+    assert fetch.call_count == 1
+    assert input_amounts == {"aaa-1": 29000000, "bb1-0": 29000000}
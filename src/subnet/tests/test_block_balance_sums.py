@@ -0,0 +1,42 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.subnet.miner.blockchain import BalanceSearch
+from src.subnet.miner.blockchain.balance_sums import BlockBalanceSums
+
+
+def test_sums_are_looked_up_by_height():
+    sums = BlockBalanceSums()
+    sums._apply([(0, 5000000000), (840000, -12345)])
+    assert sums.get(0) == 5000000000
+    assert sums.get(840000) == -12345
+    assert sums.get(839999) is None
+    assert sums.get(10 ** 9) is None
+    assert sums.max_height == 840000
+
+    sums._clear(840000, 840010)
+    assert sums.get(840000) is None
+
+
+@pytest.mark.asyncio
+async def test_solve_challenge_only_aggregates_heights_not_summed(mocker):
+    sums = BlockBalanceSums()
+    sums._apply([(100, 7), (101, -2)])
+    mocker.patch("src.subnet.miner.blockchain.block_balance_sums", sums)
+
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=40)))
+
+    @asynccontextmanager
+    async def fake_session():
+        yield session
+
+    mocker.patch("src.subnet.miner.blockchain.db_manager.session", fake_session)
+
+    assert await BalanceSearch().solve_challenge([100, 101, 100]) == 5
+    session.execute.assert_not_called()
+
+    assert await BalanceSearch().solve_challenge([100, 102]) == 47
+    assert session.execute.call_args.args[1] == {"block_heights": [102]}
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.subnet.validator.challenges import ChallengeGenerator
+
+
+class SleepingChallengeGenerator(ChallengeGenerator):
+    async def money_flow_generate(self):
+        return await self.run_node_io(time.sleep, 0.2)
+
+    async def balance_tracking_generate(self):
+        return await self.run_node_io(time.sleep, 0.2)
+
+
+@pytest.mark.asyncio
+async def test_node_io_does_not_block_event_loop():
+    generator = SleepingChallengeGenerator(settings=None, terminate_event=threading.Event())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[generator.money_flow_generate() for _ in range(4)])
+    assert time.perf_counter() - start < 0.6
+
+
+@pytest.mark.asyncio
+async def test_node_executor_serializes_node_io_off_the_default_executor():
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+    generator = SleepingChallengeGenerator(settings=None, terminate_event=threading.Event())
+    generator.node_executor = ThreadPoolExecutor(max_workers=1)
+    other = SleepingChallengeGenerator(settings=None, terminate_event=threading.Event())
+
+    start = time.perf_counter()
+    serialized = asyncio.gather(*[generator.balance_tracking_generate() for _ in range(3)])
+    await other.money_flow_generate()
+    # queued calls of the serialized generator don't hold the default executor's only thread
+    assert time.perf_counter() - start < 0.4
+    await serialized
+    assert time.perf_counter() - start >= 0.6
+    generator.close()
@@ -0,0 +1,17 @@
+from src.subnet.validator.challenges.challenge_pool import ChallengePool
+
+
+def test_draws_are_distinct_until_the_pool_is_exhausted():
+    rows = [(f"challenge-{i}", f"tx-{i}") for i in range(50)]
+    pool = ChallengePool(rows)
+
+    first_round = [pool.draw() for _ in range(50)]
+    assert sorted(first_round) == sorted(rows)
+    assert pool.rounds == 1
+
+    assert pool.draw() in rows
+    assert pool.rounds == 2
+
+
+def test_empty_pool_draws_nothing():
+    assert ChallengePool([]).draw() == (None, None)
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from substrateinterface import Keypair
+
+from src.subnet.miner._config import MinerSettings
+from src.subnet.miner.miner import Miner
+
+
+class FakeResult:
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+    async def single(self):
+        return list(self.rows[0].values()) if self.rows else None
+
+    async def consume(self):
+        pass
+
+
+class FakeDriver:
+    """Async driver stand-in that counts sessions and how many are open at once."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.open_sessions = 0
+        self.max_open_sessions = 0
+        self.closed = False
+        self.timeouts = []
+
+    def session(self, **kwargs):
+        driver = self
+
+        class Session:
+            async def __aenter__(self):
+                driver.sessions += 1
+                driver.open_sessions += 1
+                driver.max_open_sessions = max(driver.max_open_sessions, driver.open_sessions)
+                return self
+
+            async def __aexit__(self, *exc):
+                driver.open_sessions -= 1
+
+            async def run(self, query, parameters=None, **kwargs):
+                text = getattr(query, "text", query)
+                driver.timeouts.append(getattr(query, "timeout", None))
+                await asyncio.sleep(10 if "SLOW" in text else 0.01)
+                if "$out_total_amount" in text:
+                    return FakeResult([{"t.tx_id": "abcdef123456"}])
+                return FakeResult([{"n": 1}])
+
+        return Session()
+
+    async def verify_connectivity(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def miner(mocker):
+    drivers = []
+
+    def create_driver(*args, **kwargs):
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    mocker.patch("src.subnet.miner.blockchain.AsyncGraphDatabase.driver", side_effect=create_driver)
+    settings = MinerSettings(
+        NET_UID=1, MINER_KEY="test_miner_key", MINER_NAME="Test Miner", NETWORK="bitcoin",
+        DATABASE_URL="sqlite:///:memory:", GRAPH_DATABASE_USER="test_user", GRAPH_DATABASE_PASSWORD="test_password",
+        GRAPH_DATABASE_URL="bolt://localhost:7687", GRAPH_DATABASE_WARM_CONNECTIONS=4,
+        GRAPH_DATABASE_HEALTH_CHECK_INTERVAL=0, GRAPH_QUERY_TIMEOUT=0.05, GRAPH_CHALLENGE_TIMEOUT=5,
+        GRAPH_QUERY_CANCEL_GRACE=0.05,
+    )
+    return Miner(keypair=Keypair.create_from_uri("//miner"), settings=settings), drivers
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_warm_graph_search(miner):
+    miner, drivers = miner
+    await miner.startup()
+    assert len(drivers) == 1
+    assert drivers[0].max_open_sessions == 4  # warm connections are opened concurrently
+
+    challenge = {"model_kind": "money_flow", "in_total_amount": 1, "out_total_amount": 1, "tx_id_last_6_chars": "123456"}
+    results = await asyncio.gather(
+        *[miner.challenge(challenge=dict(challenge), validator_key="validator") for _ in range(5)],
+        miner.query("money_flow", "MATCH (n) RETURN 1 AS n", "validator"),
+    )
+    assert [result.output["tx_id"] for result in results[:5]] == ["abcdef123456"] * 5
+    assert results[5]["result"] == [{"n": 1}]
+    assert len(drivers) == 1
+
+    await miner.shutdown()
+    assert drivers[0].closed
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_cancelled_without_blocking_challenges(miner):
+    miner, drivers = miner
+    await miner.startup()
+    challenge = {"model_kind": "money_flow", "in_total_amount": 1, "out_total_amount": 1, "tx_id_last_6_chars": "123456"}
+
+    slow_query = asyncio.create_task(miner.query("money_flow", "MATCH (n) WHERE SLOW RETURN n", "validator"))
+    await asyncio.sleep(0)
+    result = await miner.challenge(challenge=challenge, validator_key="validator")
+    assert result.output["tx_id"] == "abcdef123456"
+    assert not slow_query.done()
+
+    assert (await asyncio.wait_for(slow_query, 1))["error"] == "Query timed out after 0.05 seconds"
+    assert drivers[0].open_sessions == 0
+    assert drivers[0].timeouts[-2:] == [0.05, 5]
+    await miner.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_missing_challenge_indexes_are_created():
+    from src.subnet.miner.blockchain.search.utxo_indexes import ensure_challenge_indexes
+
+    indexes = {("out_total_amount", "in_total_amount"): ("operator_amounts", "ONLINE", 100.0)}
+    created = []
+
+    class IndexDriver(FakeDriver):
+        def session(self, **kwargs):
+            class Session:
+                async def __aenter__(self):
+                    return self
+
+                async def __aexit__(self, *exc):
+                    pass
+
+                async def run(self, query, parameters=None, **kwargs):
+                    if query.startswith("SHOW INDEXES"):
+                        return FakeResult([{"name": name, "state": state, "populationPercent": percent, "properties": list(properties)}
+                                           for properties, (name, state, percent) in indexes.items()])
+                    created.append(query)
+                    indexes[("out_total_amount", "in_total_amount", "tx_id_suffix")] = ("new", "POPULATING", 12.5)
+                    return FakeResult([])
+
+            return Session()
+
+    # the equivalent operator index is kept, the suffix index is created and populates in the background
+    assert await ensure_challenge_indexes(IndexDriver()) == ["new"]
+    assert created == ["CREATE INDEX transaction_challenge_amounts_suffix IF NOT EXISTS FOR (t:Transaction) "
+                       "ON (t.out_total_amount, t.in_total_amount, t.tx_id_suffix)"]
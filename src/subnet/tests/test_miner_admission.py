@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from src.subnet.miner.admission import AdmissionController, AdmissionLane, AdmissionRejected
+from src.subnet.miner.miner import Miner
+
+
+def make_controller(query_queue=2, query_wait=None):
+    return AdmissionController([
+        AdmissionLane("challenge", concurrency=1, max_queue=10),
+        AdmissionLane("query", concurrency=2, max_queue=query_queue, max_queue_wait=query_wait),
+    ])
+
+
+async def hold(controller, kind, release: asyncio.Event, order: list):
+    async with controller.admit(kind):
+        order.append(kind)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_queued_challenges_are_admitted_before_queries():
+    controller = make_controller()
+    release, order = asyncio.Event(), []
+
+    tasks = [asyncio.create_task(hold(controller, "challenge", release, order))]
+    await asyncio.sleep(0)
+    # the challenge pool is full, so the second challenge queues and holds back the queries
+    tasks.append(asyncio.create_task(hold(controller, "challenge", release, order)))
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(hold(controller, "query", release, order)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert order == ["challenge"]
+    assert controller.stats()["query"]["queued"] == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["challenge", "challenge", "query", "query"]
+    assert controller.stats()["challenge"]["admitted"] == 2
+    assert controller.stats()["query"]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queries_are_shed_when_the_queue_is_full_or_waits_too_long():
+    controller = make_controller(query_queue=1, query_wait=0.05)
+    release, order = asyncio.Event(), []
+
+    running = [asyncio.create_task(hold(controller, "query", release, order)) for _ in range(2)]
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold(controller, "query", release, order))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected):
+        await hold(controller, "query", release, order)
+    with pytest.raises(AdmissionRejected):
+        await queued
+
+    release.set()
+    await asyncio.gather(*running)
+    stats = controller.stats()["query"]
+    assert (stats["admitted"], stats["rejected"], stats["timed_out"], stats["queued"]) == (2, 1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_rejected_challenge_returns_an_error_instead_of_raising():
+    # only the admission controller is needed to reach the rejection
+    miner = Miner.__new__(Miner)
+    miner.admission = AdmissionController([AdmissionLane("challenge", concurrency=1, max_queue=0)])
+    release, order = asyncio.Event(), []
+    task = asyncio.create_task(hold(miner.admission, "challenge", release, order))
+    await asyncio.sleep(0)
+
+    result = await miner.challenge(challenge={"model_kind": "money_flow"}, validator_key="validator")
+    assert "overloaded" in result["error"]
+    assert miner.admission.stats()["challenge"]["rejected"] == 1
+
+    release.set()
+    await task
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from substrateinterface import Keypair
+
+from src.subnet.validator.miner_client import MinerClientRegistry
+
+
+async def start_stub_miner(delay=0.0):
+    """Module server stand-in that records the peer port of every request and how many run at once."""
+    state = {"peers": set(), "in_flight": 0, "max_in_flight": 0}
+
+    async def query(request):
+        state["peers"].add(request.transport.get_extra_info("peername")[1])
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(delay)
+        state["in_flight"] -= 1
+        return web.json_response({"response": "ok"})
+
+    app = web.Application()
+    app.router.add_post("/method/query", query)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server, state
+
+
+@pytest.mark.asyncio
+async def test_calls_reuse_connections_and_respect_in_flight_limit():
+    server, state = await start_stub_miner(delay=0.02)
+    key = Keypair.create_from_uri("//validator")
+    registry = MinerClientRegistry(key, max_in_flight_per_miner=2)
+    try:
+        results = await asyncio.gather(*[
+            registry.get("127.0.0.1", server.port).call("query", key.ss58_address, {}) for _ in range(10)
+        ])
+        assert all(result == {"response": "ok"} for result in results)
+        assert state["max_in_flight"] == 2
+        assert len(state["peers"]) == 2
+        assert registry.stats() == {"clients": 1, "created": 1, "reused": 9, "evicted": 0}
+    finally:
+        await registry.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_retain_evicts_miners_that_left():
+    key = Keypair.create_from_uri("//validator")
+    registry = MinerClientRegistry(key)
+    first = registry.get("10.0.0.1", 9000)
+    registry.get("10.0.0.2", "9000")
+
+    await registry.retain([("10.0.0.1", "9000")])
+    assert list(registry.clients) == [("10.0.0.1", 9000)]
+    assert registry.get("10.0.0.1", 9000) is first
+    assert registry.stats()["evicted"] == 1
+    await registry.close()
+
+
+def test_clients_are_closed_with_their_event_loop():
+    async def serve():
+        return await start_stub_miner(delay=0)
+
+    server_loop = asyncio.new_event_loop()
+    server, state = server_loop.run_until_complete(serve())
+    thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+    thread.start()
+
+    key = Keypair.create_from_uri("//validator")
+    registry = MinerClientRegistry(key)
+
+    async def call():
+        client = registry.get("127.0.0.1", server.port)
+        await client.call("query", key.ss58_address, {})
+        return client
+
+    try:
+        first = asyncio.run(call())
+        # closed as asyncio.run cancelled the remaining tasks of its loop
+        assert first._session is None
+        second = asyncio.run(call())
+        assert second is not first and second._session is None
+        assert registry.stats()["created"] == 2
+    finally:
+        asyncio.run(registry.close())
+        asyncio.run_coroutine_threadsafe(server.close(), server_loop).result()
+        server_loop.call_soon_threadsafe(server_loop.stop)
+        thread.join()
@@ -0,0 +1,34 @@
+from collections import Counter
+
+from src.subnet.validator.miner_selector import MinerSelector
+
+
+def make_miners(count):
+    return [{"miner_key": f"miner-{i}", "total_challenges": 10, "failed_challenges": 0} for i in range(count)]
+
+
+def test_power_of_two_choices_prefers_fast_and_reliable_miners():
+    selector = MinerSelector()
+    miners = make_miners(6)
+    selector.seed(miners, {"miner-0": 0.1, "miner-1": 0.1})
+    for _ in range(10):
+        selector.record("bitcoin", "miner-1", 5.0, False)
+
+    picks = Counter(miner["miner_key"] for _ in range(2000) for miner in selector.select(miners, 1))
+    assert picks["miner-0"] > picks["miner-2"] > picks["miner-1"]
+    assert picks["miner-1"] > 0
+
+    selected = selector.select(miners, 3)
+    assert len({miner["miner_key"] for miner in selected}) == 3
+
+
+def test_hedge_delay_follows_p90_of_successful_queries():
+    selector = MinerSelector(min_hedge_samples=10)
+    for i in range(9):
+        selector.record("bitcoin", "miner-0", 0.1 * (i + 1), True)
+    assert selector.hedge_delay("bitcoin") is None
+
+    selector.record("bitcoin", "miner-0", 1.0, True)
+    selector.record("bitcoin", "miner-1", 30.0, False)
+    assert selector.hedge_delay("bitcoin") == 1.0
+    assert selector.hedge_delay("commune") is None
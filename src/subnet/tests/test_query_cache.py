@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.subnet.validator.query_cache import QueryResultCache
+
+
+class DictRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.hashes = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def hincrby(self, key, field, amount):
+        self.hashes.setdefault(key, {})
+        self.hashes[key][field] = self.hashes[key].get(field, 0) + amount
+
+    async def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    cache = QueryResultCache(DictRedis())
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"miner_keys": ["a", "b"], "response": {"result": 1}}
+
+    results = await asyncio.gather(*[cache.get_or_compute("bitcoin", "money_flow", "hash", compute) for _ in range(5)])
+    assert calls == 1
+    assert all(result["response"] == {"result": 1} for result in results)
+
+    assert (await cache.get_or_compute("bitcoin", "money_flow", "hash", compute))["response"] == {"result": 1}
+    assert calls == 1
+    assert await cache.metrics() == {"hits": 1, "misses": 1, "coalesced": 4, "hit_rate": 0.8333}
+
+
+@pytest.mark.asyncio
+async def test_ttl_depends_on_finality_and_empty_responses_are_not_cached():
+    redis = DictRedis()
+    cache = QueryResultCache(redis, finalized_ttl=3600, tip_ttl=10, finality_depth=6, chain_height=lambda network: 100)
+
+    async def compute():
+        return {"response": {"result": [{"tx_id": "abc"}]}}
+
+    await cache.get_or_compute("bitcoin", "money_flow", "tip", compute, block_height=100)
+    await cache.get_or_compute("bitcoin", "money_flow", "recent", compute, block_height=95)
+    await cache.get_or_compute("bitcoin", "money_flow", "old", compute, block_height=94)
+    # a height above the chain tip neither moves the tip nor gets the finalized ttl
+    await cache.get_or_compute("bitcoin", "money_flow", "future", compute, block_height=10_000_000)
+    await cache.get_or_compute("bitcoin", "money_flow", "old-after-future", compute, block_height=90)
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "tip")] == 10
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "recent")] == 10
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "old")] == 3600
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "future")] == 10
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "old-after-future")] == 3600
+    assert cache.tips == {"bitcoin": 100}
+
+    async def empty():
+        return {"response": {"result": []}}
+
+    await cache.get_or_compute("bitcoin", "money_flow", "old-empty", empty, block_height=50)
+    assert redis.ttls[cache.key("bitcoin", "money_flow", "old-empty")] == 10
+
+    async def no_response():
+        return {"response": None}
+
+    await cache.get_or_compute("bitcoin", "money_flow", "none", no_response)
+    assert cache.key("bitcoin", "money_flow", "none") not in redis.values
+
+
+@pytest.mark.asyncio
+async def test_reused_results_are_reported_to_on_reuse():
+    cache = QueryResultCache(DictRedis())
+    reused = []
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {"miner_keys": ["a", "b"], "response": {"result": 1}, "_receipt": {"miner_key": "a"}}
+
+    async def on_reuse(result):
+        reused.append(result["_receipt"]["miner_key"])
+
+    await asyncio.gather(*[cache.get_or_compute("bitcoin", "money_flow", "hash", compute, on_reuse=on_reuse) for _ in range(3)])
+    assert reused == ["a", "a"]
+
+    await cache.get_or_compute("bitcoin", "money_flow", "hash", compute, on_reuse=on_reuse)
+    assert reused == ["a", "a", "a"]
@@ -0,0 +1,92 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from substrateinterface import Keypair
+
+from src.subnet.validator.receipt_stream import encode_receipt_stream, ReceiptStreamDecoder, supported_encodings
+from src.subnet.validator.receipt_sync import ReceiptSyncWorker
+
+
+def make_chunks(count, chunk_size):
+    receipts = [{"id": i, "timestamp": f"2024-11-02T00:00:00.{i:06d}+00:00", "query": "MATCH (n) RETURN n"} for i in range(1, count + 1)]
+    return [receipts[i:i + chunk_size] for i in range(0, count, chunk_size)]
+
+
+async def aiter_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", supported_encodings())
+async def test_stream_round_trips_across_arbitrary_splits(encoding):
+    chunks = make_chunks(250, 100)
+    body = b"".join([part async for part in encode_receipt_stream(aiter_chunks(chunks), encoding)])
+
+    decoder = ReceiptStreamDecoder(encoding)
+    decoded = []
+    for i in range(0, len(body), 7):
+        decoded.extend(decoder.feed(body[i:i + 7]))
+    assert decoded == [receipt for chunk in chunks for receipt in chunk]
+
+
+@pytest.mark.asyncio
+async def test_worker_stores_stream_in_chunks(mocker):
+    encoding = supported_encodings()[0]
+
+    async def stream(request):
+        response = web.StreamResponse(headers={"Content-Encoding": encoding})
+        await response.prepare(request)
+        async for part in encode_receipt_stream(aiter_chunks(make_chunks(2500, 1000)), encoding):
+            await response.write(part)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v1/miner/receipts/stream", stream)
+
+    miner_receipt_manager = mocker.AsyncMock()
+    worker = ReceiptSyncWorker(Keypair.create_from_uri("//Alice"), 20, None, miner_receipt_manager)
+    worker.STREAM_CHUNK_SIZE = 1000
+    mocker.patch.object(worker, "validate_receipt_signatures", return_value=True)
+
+    async with TestServer(app) as server:
+        handled = await worker.stream_gateway("validator", str(server.make_url("")).rstrip("/"), ("2024-11-01T00:00:00Z", 0))
+    await worker.cleanup()
+
+    assert handled
+    assert [len(call.args[0]) for call in miner_receipt_manager.sync_miner_receipts.await_args_list] == [1000, 1000, 500]
+    assert worker.sync_cursors["validator"] == ("2024-11-02T00:00:00.002500+00:00", 2500)
+
+
+@pytest.mark.asyncio
+async def test_worker_falls_back_to_an_encoding_the_gateway_accepts(mocker):
+    requested = []
+
+    async def stream(request):
+        encoding = request.query["encoding"]
+        requested.append(encoding)
+        if encoding != "gzip":
+            return web.json_response({"detail": "Unsupported encoding"}, status=400)
+        response = web.StreamResponse(headers={"Content-Encoding": encoding})
+        await response.prepare(request)
+        async for part in encode_receipt_stream(aiter_chunks(make_chunks(10, 10)), encoding):
+            await response.write(part)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v1/miner/receipts/stream", stream)
+
+    worker = ReceiptSyncWorker(Keypair.create_from_uri("//Alice"), 20, None, mocker.AsyncMock())
+    worker.STREAM_ENCODINGS = ["zstd", "gzip", "identity"]
+    mocker.patch.object(worker, "validate_receipt_signatures", return_value=True)
+
+    async with TestServer(app) as server:
+        gateway_url = str(server.make_url("")).rstrip("/")
+        assert await worker.stream_gateway("validator", gateway_url, ("2024-11-01T00:00:00Z", 0))
+        assert await worker.stream_gateway("validator", gateway_url, ("2024-11-01T00:00:00Z", 0))
+        worker.STREAM_ENCODINGS = ["zstd"]
+        worker.stream_encodings.clear()
+        assert not await worker.stream_gateway("validator", gateway_url, ("2024-11-01T00:00:00Z", 0))
+    await worker.cleanup()
+
+    assert requested == ["zstd", "gzip", "gzip", "zstd"]
@@ -0,0 +1,115 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager, UNDATED_RECEIPT_HOUR
+from src.subnet.validator.receipt_sync import ReceiptSyncWorker
+
+
+def make_page(ids, next_cursor=True):
+    receipts = [{"id": i, "timestamp": f"2024-11-02T00:00:{i:02d}+00:00"} for i in ids]
+    return {
+        "data": receipts,
+        "next_cursor": {"timestamp": receipts[-1]["timestamp"], "id": ids[-1]} if next_cursor else None
+    }
+
+
+@pytest.fixture
+def worker(mocker):
+    miner_receipt_manager = mocker.AsyncMock()
+    miner_receipt_manager.get_last_receipt_timestamp_for_validator_key.return_value = {"timestamp": "2024-11-02T00:00:00+00:00"}
+    worker = ReceiptSyncWorker(keypair=None, netuid=20, client=None, miner_receipt_manager=miner_receipt_manager)
+    mocker.patch.object(worker, "validate_receipt_signatures", return_value=True)
+    mocker.patch.object(worker, "stream_gateway", return_value=False)
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_sync_walks_cursor_and_resumes(worker, mocker):
+    pages = {0: make_page([1, 2]), 2: make_page([3, 4]), 4: make_page([5], next_cursor=False), 5: {"data": [], "next_cursor": None}}
+
+    async def fetch_page(gateway_url, timestamp, page=1, after_id=None):
+        return pages[after_id]
+
+    fetch = mocker.patch.object(worker, "fetch_page", side_effect=fetch_page)
+
+    await worker.sync_single_gateway("validator", "http://gateway")
+    assert [call.kwargs["after_id"] for call in fetch.call_args_list] == [0, 2, 4]
+    assert worker.miner_receipt_manager.sync_miner_receipts.await_count == 3
+    assert worker.sync_cursors["validator"] == ("2024-11-02T00:00:05+00:00", 5)
+
+    await worker.sync_single_gateway("validator", "http://gateway")
+    assert fetch.call_args_list[-1].kwargs["after_id"] == 5
+    assert worker.miner_receipt_manager.sync_miner_receipts.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_cursor_does_not_advance_past_failed_page(worker, mocker):
+    pages = {0: make_page([1, 2]), 2: make_page([3, 4])}
+
+    async def fetch_page(gateway_url, timestamp, page=1, after_id=None):
+        return pages.get(after_id)
+
+    mocker.patch.object(worker, "fetch_page", side_effect=fetch_page)
+    worker.miner_receipt_manager.sync_miner_receipts.side_effect = [None, RuntimeError("db down")]
+
+    with pytest.raises(RuntimeError):
+        await worker.sync_single_gateway("validator", "http://gateway")
+    assert worker.sync_cursors["validator"] == ("2024-11-02T00:00:02+00:00", 2)
+
+
+class RecordingSessionManager:
+    """Session manager stand-in that records the rows MinerReceiptManager inserts."""
+
+    def __init__(self):
+        self.inserted = []
+
+    @asynccontextmanager
+    async def session(self):
+        manager = self
+
+        class Session:
+            @asynccontextmanager
+            async def begin(self):
+                yield
+
+            async def execute(self, stmt, params=None):
+                manager.inserted.extend(params or [])
+
+                class Result:
+                    def fetchall(self):
+                        return []
+
+                return Result()
+
+        yield Session()
+
+
+@pytest.mark.asyncio
+async def test_cursor_advances_with_real_receipt_manager(mocker):
+    session_manager = RecordingSessionManager()
+    manager = MinerReceiptManager(session_manager)
+    mocker.patch.object(manager, "get_last_receipt_timestamp_for_validator_key", return_value=None)
+    worker = ReceiptSyncWorker(keypair=None, netuid=20, client=None, miner_receipt_manager=manager)
+    mocker.patch.object(worker, "validate_receipt_signatures", return_value=True)
+    mocker.patch.object(worker, "stream_gateway", return_value=False)
+
+    pages = {0: make_page([1, 2]), 2: make_page([3], next_cursor=False)}
+
+    async def fetch_page(gateway_url, timestamp, page=1, after_id=None):
+        return pages.get(after_id)
+
+    mocker.patch.object(worker, "fetch_page", side_effect=fetch_page)
+
+    await worker.sync_single_gateway("validator", "http://gateway")
+    assert worker.sync_cursors["validator"] == ("2024-11-02T00:00:03+00:00", 3)
+    assert len(session_manager.inserted) == 3
+    assert all("id" not in row for row in session_manager.inserted)
+    # the gateway's page is left as it was received
+    assert pages[0]["data"][0] == {"id": 1, "timestamp": "2024-11-02T00:00:01+00:00"}
+
+
+def test_undated_receipts_roll_up_into_the_epoch_hour():
+    assert MinerReceiptManager._stats_hour(None) == UNDATED_RECEIPT_HOUR == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert MinerReceiptManager._stats_hour(datetime(2024, 11, 2, 10, 59, 59)) == datetime(2024, 11, 2, 10, tzinfo=timezone.utc)
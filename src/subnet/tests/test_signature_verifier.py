@@ -0,0 +1,35 @@
+import pytest
+from substrateinterface import Keypair
+
+from src.subnet.validator.signature_verifier import SignatureVerifier
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_workers", [0, 1])
+async def test_verify_many_keeps_order_and_rejects_bad_signatures(max_workers):
+    miner = Keypair.create_from_uri("//miner")
+    other = Keypair.create_from_uri("//other")
+    signature = miner.sign(b"result-hash").hex()
+
+    verifier = SignatureVerifier(max_workers=max_workers, batch_size=2)
+    try:
+        results = await verifier.verify_many([
+            (miner.ss58_address, "result-hash", signature),
+            (other.ss58_address, "result-hash", signature),
+            (miner.ss58_address, b"result-hash", signature),
+            (miner.ss58_address, "result-hash", "not-hex"),
+            ("not-an-address", "result-hash", signature),
+        ])
+        assert results == [True, False, True, False, False]
+        assert await verifier.verify(miner.ss58_address, "result-hash", signature)
+        assert verifier.stats()["verifications"] == 6
+    finally:
+        verifier.close()
+
+
+@pytest.mark.asyncio
+async def test_single_signature_is_verified_without_the_pool():
+    miner = Keypair.create_from_uri("//miner")
+    verifier = SignatureVerifier(max_workers=1)
+    assert await verifier.verify(miner.ss58_address, "result-hash", miner.sign(b"result-hash").hex())
+    assert verifier._executor is None
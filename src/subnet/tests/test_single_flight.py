@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from src.subnet.validator.single_flight import SingleFlight
+
+
+class LockRedis:
+    """Just enough of redis for SingleFlight, expiry is ignored."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token.encode():
+            del self.values[key]
+            return 1
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution_and_its_errors():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"response": calls}
+
+    results = await asyncio.gather(*[single_flight.do("key", query) for _ in range(4)])
+    assert calls == 1
+    assert [shared for _, shared in results] == [False, True, True, True]
+    assert all(result == {"response": 1} for result, _ in results)
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("miners unavailable")
+
+    results = await asyncio.gather(*[single_flight.do("key", failing) for _ in range(2)], return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert single_flight.stats() == {"executions": 2, "coalesced": 4, "coalesced_remote": 0}
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_coalesces_across_workers():
+    redis = LockRedis()
+    workers = [SingleFlight(redis, poll_interval=0.01) for _ in range(3)]
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"response": "agreed"}
+
+    results = await asyncio.gather(*[worker.do("key", query) for worker in workers])
+    assert calls == 1
+    assert all(result == {"response": "agreed"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert "single_flight:lock:key" not in redis.values
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_fail_the_others():
+    single_flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.05)
+        return {"response": "agreed"}
+
+    first = asyncio.create_task(single_flight.do("key", query))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(single_flight.do("key", query))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ({"response": "agreed"}, True)
+    assert first.cancelled()
+    assert single_flight.stats()["executions"] == 1
+    assert single_flight.in_flight == {}
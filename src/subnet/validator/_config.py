@@ -56,8 +56,23 @@ class ValidatorSettings(BaseSettings):
 
     CHALLENGE_FREQUENCY: int
     CHALLENGE_THRESHOLD: int
+    MINER_CHALLENGE_CONCURRENCY: int = 400  # miners challenged at once, each holds up to two connections
+    CHALLENGE_GENERATION_CONCURRENCY: int = 4  # node calls running at once in the challenge generator
+    CHALLENGE_GENERATION_BATCH_SIZE: int = 4  # challenges of each kind generated per network and cycle
 
     RECEIPT_SYNC_FREQUENCY: int = 3600
+    RECEIPT_CONSUMER_BATCH_SIZE: int = 500  # max receipts stored per insert
+    RECEIPT_CONSUMER_FLUSH_INTERVAL: float = 1.0  # seconds a partial batch may wait before it is stored
+    SIGNATURE_VERIFICATION_WORKERS: int = 2  # sr25519 verification processes, 0 verifies on the calling thread
+
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_FINALIZED_TTL: int = 86400  # seconds, results for blocks at least QUERY_CACHE_FINALITY_DEPTH below the tip
+    QUERY_CACHE_TIP_TTL: int = 30  # seconds, tip-adjacent blocks and address/balance queries
+    QUERY_CACHE_FINALITY_DEPTH: int = 6
+    QUERY_CACHE_TIP_REFRESH_INTERVAL: float = 30.0  # seconds between reads of the chain tip from the node
+    QUERY_COALESCING_REDIS_LOCK: bool = False  # also coalesce identical queries across gateway workers
+    MINER_CLIENT_MAX_IN_FLIGHT: int = 4  # concurrent requests, and pooled connections, per miner
+    MINER_CLIENT_KEEPALIVE_TIMEOUT: float = 60.0  # seconds an idle pooled connection to a miner is kept open
 
     BITCOIN_NODE_RPC_URL: str
     COMMUNE_NODE_RPC: str
@@ -1,26 +1,42 @@
+import asyncio
 import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Dict, Optional
 from src.subnet.validator._config import ValidatorSettings
-from src.subnet.validator.database.models.challenge_balance_tracking import ChallengeBalanceTrackingManager
-from src.subnet.validator.database.models.challenge_money_flow import ChallengeMoneyFlowManager
 
 
 class ChallengeGenerator(ABC):
     def __init__(self, settings: ValidatorSettings, terminate_event: threading.Event):
         self.settings = settings
         self.terminate_event = terminate_event
+        # set by generators whose node client can't be shared between threads, usually a single worker executor
+        self.node_executor: Optional[Executor] = None
+
+    async def run_node_io(self, fn, *args):
+        """
+        Runs a blocking node call on `node_executor`, or the event loop's default executor, so it doesn't block
+        other generators.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.node_executor, fn, *args)
+
+    def close(self):
+        if self.node_executor is not None:
+            self.node_executor.shutdown(wait=False, cancel_futures=True)
 
     @abstractmethod
-    async def money_flow_generate_and_store(self, challenge_manager: ChallengeMoneyFlowManager, threshold: int):
+    async def money_flow_generate(self) -> Optional[Dict[str, str]]:
         """
         This method should be implemented by all subclasses to generate challenges specific to a network and model type.
+        Returns a row for ChallengeMoneyFlowManager.store_challenges, or None if no challenge could be generated.
         """
         pass
 
     @abstractmethod
-    async def balance_tracking_generate_and_store(self, challenge_manager: ChallengeBalanceTrackingManager, threshold: int):
+    async def balance_tracking_generate(self) -> Optional[Dict[str, str]]:
         """
         This method should be implemented by all subclasses to generate challenges specific to a network and model type.
+        Returns a row for ChallengeBalanceTrackingManager.store_challenges, or None if no challenge could be generated.
         """
         pass
 
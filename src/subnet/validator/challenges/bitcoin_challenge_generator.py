@@ -1,10 +1,10 @@
 import json
+from typing import Dict, Optional
+
 from loguru import logger
 from src.subnet.protocol import NETWORK_BITCOIN
 from src.subnet.validator.challenges import ChallengeGenerator
-from src.subnet.validator.database.models.challenge_money_flow import ChallengeMoneyFlowManager
 from src.subnet.validator.nodes.bitcoin.node import ChallengeBitcoinNode
-from src.subnet.validator.database.models.challenge_balance_tracking import ChallengeBalanceTrackingManager
 from src.subnet.validator.nodes.random_block import select_block
 
 
@@ -14,37 +14,27 @@ class BitcoinChallengeGenerator(ChallengeGenerator):
         self.node = ChallengeBitcoinNode()
         self.network = NETWORK_BITCOIN
 
-    async def money_flow_generate_and_store(self, challenge_manager: ChallengeMoneyFlowManager, threshold: int):
-        last_block_height = self.node.get_current_block_height() - 6
+    async def money_flow_generate(self) -> Optional[Dict[str, str]]:
+        last_block_height = await self.run_node_io(self.node.get_current_block_height) - 6
 
-        money_flow_challenge, tx_id = self.node.create_money_flow_challenge(last_block_height, self.terminate_event)
+        money_flow_challenge, tx_id = await self.run_node_io(self.node.create_money_flow_challenge, last_block_height, self.terminate_event)
         if money_flow_challenge is None:
-            return
+            return None
 
-        challenge_json = json.dumps(money_flow_challenge.model_dump())
         logger.debug(f"Generated Money Flow Challenge", network=self.network, challenge=money_flow_challenge.model_dump())
+        return {"challenge": json.dumps(money_flow_challenge.model_dump()), "tx_id": tx_id}
 
-        current_challenge_count = await challenge_manager.get_challenge_count(self.network)
-        if current_challenge_count >= threshold:
-            await challenge_manager.try_delete_oldest_challenge(self.network)
-
-        await challenge_manager.store_challenge(challenge_json, tx_id, self.network)
-        logger.info(f"Challenge stored in the database successfully.", network=self.network)
-
-    async def balance_tracking_generate_and_store(self, challenge_manager: ChallengeBalanceTrackingManager, threshold: int):
-        last_block = self.node.get_current_block_height() - 6
+    async def balance_tracking_generate(self) -> Optional[Dict[str, str]]:
+        last_block = await self.run_node_io(self.node.get_current_block_height) - 6
         random_balance_tracking_block = select_block(0, last_block)
 
-        balance_tracking_challenge, balance_tracking_expected_response = self.node.create_balance_tracking_challenge(random_balance_tracking_block, self.terminate_event)
+        balance_tracking_challenge, balance_tracking_expected_response = await self.run_node_io(self.node.create_balance_tracking_challenge, random_balance_tracking_block, self.terminate_event)
         if balance_tracking_challenge is None:
-            return
+            return None
 
-        challenge_json = balance_tracking_challenge.json()
         logger.debug(f"Generated Balance Tracking Challenge", network=self.network, challenge=balance_tracking_challenge.model_dump())
-
-        current_challenge_count = await challenge_manager.get_challenge_count(self.network)
-        if current_challenge_count >= threshold:
-            await challenge_manager.try_delete_oldest_challenge(self.network)
-
-        await challenge_manager.store_challenge(challenge_json, random_balance_tracking_block, balance_tracking_expected_response, self.network)
-        logger.info(f"Challenge stored in the database successfully.", network=self.network)
+        return {
+            "challenge": balance_tracking_challenge.json(),
+            "block_height": str(random_balance_tracking_block),
+            "balance_tracking_expected_response": str(balance_tracking_expected_response),
+        }
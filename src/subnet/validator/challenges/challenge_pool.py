@@ -0,0 +1,30 @@
+import random
+from typing import List, Optional, Tuple
+
+
+class ChallengePool:
+    """
+    Challenge rows of one kind and network, loaded once per epoch and handed out without replacement.
+
+    Every draw is O(1) (swap with the last remaining index and pop), and no challenge is handed out twice before
+    all of them were, so miners of an epoch get distinct challenges as long as there are enough of them.
+    """
+
+    def __init__(self, rows: List[Tuple[str, str]]):
+        self.rows = rows
+        self.remaining: List[int] = []
+        self.rounds = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def draw(self) -> Tuple[Optional[str], Optional[str]]:
+        if not self.rows:
+            return None, None
+        if not self.remaining:
+            # more miners than challenges, start handing them out again
+            self.remaining = list(range(len(self.rows)))
+            self.rounds += 1
+        index = random.randrange(len(self.remaining))
+        self.remaining[index], self.remaining[-1] = self.remaining[-1], self.remaining[index]
+        return self.rows[self.remaining.pop()]
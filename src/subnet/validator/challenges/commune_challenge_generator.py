@@ -1,11 +1,11 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from threading import Event
+from typing import Dict, Optional
 
 from src.subnet.protocol import NETWORK_COMMUNE
 from src.subnet.validator._config import ValidatorSettings
 from src.subnet.validator.challenges import ChallengeGenerator
-from src.subnet.validator.database.models.challenge_balance_tracking import ChallengeBalanceTrackingManager
-from src.subnet.validator.database.models.challenge_money_flow import ChallengeMoneyFlowManager
 from random import randint
 from loguru import logger
 
@@ -17,50 +17,43 @@ class CommuneChallengeGenerator(ChallengeGenerator):
         super().__init__(settings, terminate_event)
         self.network = NETWORK_COMMUNE
         self.node = CommuneNode(settings)
+        # SubstrateInterface keeps a single websocket, calls must not interleave, and waiting for it must not
+        # hold threads of the default executor other networks generate on
+        self.node_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="commune-node")
 
-    async def money_flow_generate_and_store(self, challenge_manager: ChallengeMoneyFlowManager, threshold: int):
+    async def money_flow_generate(self) -> Optional[Dict[str, str]]:
         try:
-            last_block_height = self.node.get_current_block_height()
+            last_block_height = await self.run_node_io(self.node.get_current_block_height)
         except NotImplementedError as e:
             logger.error(f"Failed to fetch block height, skipping")
-            return
+            return None
 
-        money_flow_challenge, tx_id = self.node.create_money_flow_challenge(last_block_height, self.terminate_event)
+        money_flow_challenge, tx_id = await self.run_node_io(self.node.create_money_flow_challenge, last_block_height, self.terminate_event)
         if money_flow_challenge is None:
-            return
+            return None
 
-        challenge_json = json.dumps(money_flow_challenge.model_dump())
-        current_challenge_count = await challenge_manager.get_challenge_count(self.network)
         logger.debug(f"Generated Money Flow Challenge", network=self.network, challenge=money_flow_challenge.model_dump())
+        return {"challenge": json.dumps(money_flow_challenge.model_dump()), "tx_id": tx_id}
 
-        if current_challenge_count >= threshold:
-            await challenge_manager.try_delete_oldest_challenge(self.network)
-
-        await challenge_manager.store_challenge(challenge_json, tx_id, self.network)
-        logger.info(f"Money Flow Challenge stored in the database successfully.", network=self.network)
-
-    async def balance_tracking_generate_and_store(self, challenge_manager: ChallengeBalanceTrackingManager, threshold: int):
+    async def balance_tracking_generate(self) -> Optional[Dict[str, str]]:
         try:
-            last_block_height = self.node.get_current_block_height()
+            last_block_height = await self.run_node_io(self.node.get_current_block_height)
         except NotImplementedError as e:
             logger.error(f"Failed to fetch block height, skipping")
-            return
+            return None
 
         random_balance_tracking_block = randint(1, last_block_height)
 
-        balance_tracking_challenge, balance_tracking_expected_response = self.node.create_balance_tracking_challenge(random_balance_tracking_block, self.terminate_event)
+        balance_tracking_challenge, balance_tracking_expected_response = await self.run_node_io(self.node.create_balance_tracking_challenge, random_balance_tracking_block, self.terminate_event)
         if balance_tracking_challenge is None:
-            return
+            return None
 
-        challenge_json = json.dumps(balance_tracking_challenge.model_dump())
         logger.debug(f"Generated Balance Tracking Challenge", network=self.network, challenge=balance_tracking_challenge.model_dump())
-
-        current_challenge_count = await challenge_manager.get_challenge_count(self.network)
-        if current_challenge_count >= threshold:
-            await challenge_manager.try_delete_oldest_challenge(self.network)
-
-        await challenge_manager.store_challenge(challenge_json, last_block_height,  balance_tracking_expected_response, self.network)
-        logger.info(f"Challenge stored in the database successfully.", network=self.network)
+        return {
+            "challenge": json.dumps(balance_tracking_challenge.model_dump()),
+            "block_height": str(last_block_height),
+            "balance_tracking_expected_response": str(balance_tracking_expected_response),
+        }
 
 
 
@@ -1,6 +1,8 @@
 import asyncio
+import contextlib
 import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
 from src.subnet.protocol import get_networks, NETWORK_BITCOIN, NETWORK_COMMUNE
 from src.subnet.validator.challenges import ChallengeGenerator
@@ -26,40 +28,80 @@ class ChallengeGeneratorFactory:
 
 
 class ChallengeGeneratorThread(threading.Thread):
-    def __init__(self, settings, environment, frequency, threshold, terminate_event, *args, **kwargs):
+    def __init__(self, settings, environment, frequency, threshold, terminate_event, concurrency: int = 4, batch_size: int = 4, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.settings = settings
         self.environment = environment
         self.frequency = frequency
         self.threshold = threshold
         self.terminate_event = terminate_event
+        self.concurrency = concurrency
+        self.batch_size = batch_size
 
     async def main(self):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="challenge-generator")
+        )
 
         networks = get_networks()
         session_manager = DatabaseSessionManager()
         session_manager.init(self.settings.DATABASE_URL)
         money_flow_challenge_manager = ChallengeMoneyFlowManager(session_manager)
         balance_tracking_challenge_manager = ChallengeBalanceTrackingManager(session_manager)
+        semaphore = asyncio.Semaphore(self.concurrency)
 
+        async def generate(network, generator, generate_challenge):
+            # the semaphore bounds work on the default executor, a generator with its own executor queues there instead
+            async with semaphore if generator.node_executor is None else contextlib.nullcontext():
+                if self.terminate_event.is_set():
+                    return None
+                try:
+                    return await generate_challenge()
+                except asyncio.TimeoutError:
+                    logger.error("Timeout occurred while generating the challenge.", network=network)
+                except Exception as e:
+                    tb = traceback.format_exc()
+                    logger.error(f"An error occurred while generating the challenge", network=network, error=e, traceback=tb)
+                return None
+
+        async def store(network, challenge_manager, challenges):
+            challenges = [challenge for challenge in challenges if challenge is not None]
+            if not challenges:
+                return
+            try:
+                await challenge_manager.store_challenges(network, challenges, self.threshold)
+                logger.info(f"Challenges stored in the database successfully.", network=network, count=len(challenges))
+            except Exception as e:
+                tb = traceback.format_exc()
+                logger.error(f"An error occurred while storing the challenges", network=network, error=e, traceback=tb)
+
+        generators = {}
         try:
+            factory = ChallengeGeneratorFactory()
+            generators = {
+                network: factory.create_challenge_generator(network, self.settings, self.terminate_event)
+                for network in networks
+            }
+
             while not self.terminate_event.is_set():
                 next_send_time = asyncio.get_event_loop().time() + (self.frequency * 60)
 
-                for network in networks:
-                    try:
-                        factory = ChallengeGeneratorFactory()
-                        generator = factory.create_challenge_generator(network, self.settings, self.terminate_event)
-                        if self.terminate_event.is_set():
-                            break
-                        await generator.money_flow_generate_and_store(money_flow_challenge_manager, self.threshold)
-                        if self.terminate_event.is_set():
-                            break
-                        await generator.balance_tracking_generate_and_store(balance_tracking_challenge_manager, self.threshold)
-                        if self.terminate_event.is_set():
-                            break
-                    except asyncio.TimeoutError:
-                        logger.error("Timeout occurred while generating or storing the challenge.")
+                # every network produces batch_size challenges of each kind per cycle, all of them run concurrently,
+                # and each batch is stored and the pool trimmed with one statement per network and kind
+                async def generate_batch(network, generator, generate_challenge):
+                    return await asyncio.gather(*[generate(network, generator, generate_challenge) for _ in range(self.batch_size)])
+
+                async def generate_and_store(network, generator):
+                    money_flow, balance_tracking = await asyncio.gather(
+                        generate_batch(network, generator, generator.money_flow_generate),
+                        generate_batch(network, generator, generator.balance_tracking_generate),
+                    )
+                    await asyncio.gather(
+                        store(network, money_flow_challenge_manager, money_flow),
+                        store(network, balance_tracking_challenge_manager, balance_tracking),
+                    )
+
+                await asyncio.gather(*[generate_and_store(network, generator) for network, generator in generators.items()])
 
                 while not self.terminate_event.is_set():
                     now = asyncio.get_event_loop().time()
@@ -70,6 +112,10 @@ class ChallengeGeneratorThread(threading.Thread):
         except Exception as e:
             tb = traceback.format_exc()
             logger.error(f"An error occurred while generating or storing the challenge", error=e, traceback=tb)
+        finally:
+            for generator in generators.values():
+                generator.close()
+            await session_manager.close()
 
     def run(self):
         loop = asyncio.new_event_loop()
@@ -77,4 +123,5 @@ class ChallengeGeneratorThread(threading.Thread):
         try:
             loop.run_until_complete(self.main())
         finally:
-            loop.close()
\ No newline at end of file
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
@@ -9,11 +9,11 @@ in staff/alembic/versions folder.
 """
 from .base_model import OrmBase
 from .models.miner_discovery import MinerDiscovery
-from .models.miner_receipt import MinerReceipt
+from .models.miner_receipt import MinerReceipt, MinerReceiptStats
 from .session_manager import db_manager, get_session
 from .models.api_key import ApiKey
 from .models.challenge_money_flow import ChallengeMoneyFlow
 from .models.challenge_balance_tracking import ChallengeBalanceTracking
 
-__all__ = ["OrmBase", "get_session", "db_manager", "MinerDiscovery", "MinerReceipt", "ApiKey",
+__all__ = ["OrmBase", "get_session", "db_manager", "MinerDiscovery", "MinerReceipt", "MinerReceiptStats", "ApiKey",
            "ChallengeMoneyFlow", "ChallengeBalanceTracking"]
\ No newline at end of file
@@ -1,9 +1,8 @@
-from typing import Optional, Tuple
-from sqlalchemy import Column, Integer, String, DateTime, insert, delete
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, DateTime, Index, insert, delete
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.future import select
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import func
 from sqlalchemy import text
 from datetime import datetime
 
@@ -22,72 +21,65 @@ class ChallengeBalanceTracking(OrmBase):
     network = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index('idx_challenges_balance_tracking_network_created_at', 'network', 'created_at', postgresql_using='btree'),
+    )
+
 
 class ChallengeBalanceTrackingManager:
     def __init__(self, session_manager: DatabaseSessionManager):
         self.session_manager = session_manager
 
-    async def store_challenge(self, challenge: str, block_height: int, expected_response: str, network: str):
+    async def store_challenges(self, network: str, challenges: List[Dict[str, str]], threshold: int) -> int:
+        """
+        Upserts a batch of challenges ({"challenge", "block_height", "balance_tracking_expected_response"}) and trims
+        the network's pool to the `threshold` newest, in one statement. Returns the number of trimmed challenges.
+        """
+        # one row per key, an upsert can't touch the same row twice
+        rows = {}
+        for challenge in challenges[max(0, len(challenges) - threshold):]:
+            rows[str(challenge['block_height'])] = {**challenge, 'block_height': str(challenge['block_height']), 'network': network, 'created_at': datetime.utcnow()}
+        if not rows:
+            return 0
+
+        upsert = insert(ChallengeBalanceTracking).values(list(rows.values()))
+        upsert = upsert.on_conflict_do_update(
+            index_elements=['block_height'],
+            set_={column: upsert.excluded[column] for column in rows[next(iter(rows))] if column != 'block_height'}
+        ).returning(ChallengeBalanceTracking.id).cte('upserted')
+
+        # both parts see the same snapshot, so the new rows aren't visible to the trim: keep threshold - len(rows)
+        # of the existing ones, never touching rows the upsert just updated
+        oldest = (
+            select(ChallengeBalanceTracking.id)
+            .where(ChallengeBalanceTracking.network == network, ChallengeBalanceTracking.block_height.notin_(list(rows.keys())))
+            .order_by(ChallengeBalanceTracking.created_at.desc())
+            .offset(max(0, threshold - len(rows)))
+        )
+        stmt = (
+            delete(ChallengeBalanceTracking)
+            .where(ChallengeBalanceTracking.id.in_(oldest))
+            .returning(ChallengeBalanceTracking.id)
+            .add_cte(upsert)
+        )
+
         async with self.session_manager.session() as session:
             async with session.begin():
-                stmt = insert(ChallengeBalanceTracking).values(
-                    challenge=challenge,
-                    block_height=str(block_height),
-                    balance_tracking_expected_response=str(expected_response),
-                    network=network,
-                    created_at=datetime.utcnow()  # Automatically set the created_at field
-                ).on_conflict_do_update(
-                    index_elements=['block_height'],  # Conflict on block_height
-                    set_=dict(
-                        challenge=challenge,
-                        balance_tracking_expected_response=str(expected_response),
-                        network=network,
-                        created_at=datetime.utcnow()  # Update these fields on conflict
-                    )
-                )
-                await session.execute(stmt)
+                result = await session.execute(stmt)
+                trimmed = len(result.fetchall())
+
+        if trimmed:
+            logger.info(f"Trimmed oldest challenges", network=network, trimmed=trimmed)
+        return trimmed
 
-    async def get_random_challenge(self, network: str) -> Tuple[str, str]:
+    async def get_challenges(self, network: str) -> List[Tuple[str, str]]:
+        """All challenges of the network, the table is trimmed to the challenge threshold so this stays small."""
         async with self.session_manager.session() as session:
             query = text("""
                 SELECT challenge, balance_tracking_expected_response 
                 FROM challenges_balance_tracking 
-                WHERE network = :network 
-                ORDER BY RANDOM() 
-                LIMIT 1
+                WHERE network = :network
             """)
             result = await session.execute(query, {"network": network})
-            row = result.fetchone()
-
-            if row:
-                # Access tuple values by index
-                return row[0], row[1]
-            return None, None
-
-    async def get_challenge_count(self, network: str):
-        async with self.session_manager.session() as session:
-            result = await session.execute(
-                select(func.count(ChallengeBalanceTracking.id)).where(ChallengeBalanceTracking.network == network)
-            )
-            return result.scalar()
-
-    async def try_delete_oldest_challenge(self, network: str):
-        async with self.session_manager.session() as session:
-            async with session.begin():
-                # Raw SQL query to delete the oldest challenge and return the deleted ID
-                query = text("""
-                       DELETE FROM challenges_balance_tracking
-                       WHERE id = (
-                           SELECT id FROM challenges_balance_tracking
-                           WHERE network = :network
-                           ORDER BY created_at ASC
-                           LIMIT 1
-                       )
-                       RETURNING id
-                   """)
-                result = await session.execute(query, {"network": network})
-                deleted_id = result.fetchone()
-
-                if deleted_id:
-                    logger.info(f"Deleted oldest challenge with ID: {deleted_id[0]}")
+            return [(row[0], row[1]) for row in result.fetchall()]
 
@@ -1,7 +1,7 @@
 import random
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, update, insert, func, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, update, insert, func, text, values, column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.future import select
 from sqlalchemy.dialects.postgresql import insert
@@ -61,6 +61,34 @@ class MinerDiscoveryManager:
                 )
                 await session.execute(stmt)
 
+    async def store_miners_metadata(self, miners: list[dict]):
+        """
+        Upserts metadata of many miners with a single multi-row INSERT ... ON CONFLICT statement.
+        Each item holds uid, miner_key, miner_address, miner_ip_port, network, version and graph_db.
+        """
+        if not miners:
+            return
+
+        timestamp = datetime.utcnow()
+        rows = list({miner['miner_key']: {**miner, 'timestamp': timestamp} for miner in miners}.values())
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                stmt = insert(MinerDiscovery).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['miner_key'],
+                    set_={
+                        'uid': stmt.excluded.uid,
+                        'miner_address': stmt.excluded.miner_address,
+                        'miner_ip_port': stmt.excluded.miner_ip_port,
+                        'network': stmt.excluded.network,
+                        'version': stmt.excluded.version,
+                        'graph_db': stmt.excluded.graph_db,
+                        'timestamp': stmt.excluded.timestamp,
+                    }
+                )
+                await session.execute(stmt)
+
     async def get_miner_by_key(self, miner_key: str, network: str):
         async with self.session_manager.session() as session:
             result = await session.execute(
@@ -123,6 +151,41 @@ class MinerDiscoveryManager:
                 )
                 await session.execute(stmt)
 
+    async def update_miner_ranks(self, ranks: dict[str, float]):
+        """Updates ranks of many miners with a single UPDATE ... FROM (VALUES ...) statement."""
+        if not ranks:
+            return
+
+        new_ranks = values(
+            column('miner_key', String), column('rank', Float), name='new_ranks'
+        ).data([(miner_key, float(rank)) for miner_key, rank in ranks.items()])
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                stmt = update(MinerDiscovery).where(
+                    MinerDiscovery.miner_key == new_ranks.c.miner_key
+                ).values(rank=new_ranks.c.rank)
+                await session.execute(stmt)
+
+    async def update_miners_challenges(self, failed_challenges: dict[str, int], total_challenges_inc: int = 2):
+        """Increments challenge counters of many miners with a single UPDATE ... FROM (VALUES ...) statement."""
+        if not failed_challenges:
+            return
+
+        increments = values(
+            column('miner_key', String), column('failed_challenges_inc', Integer), name='increments'
+        ).data([(miner_key, failed) for miner_key, failed in failed_challenges.items()])
+
+        async with self.session_manager.session() as session:
+            async with session.begin():
+                stmt = update(MinerDiscovery).where(
+                    MinerDiscovery.miner_key == increments.c.miner_key
+                ).values(
+                    failed_challenges=MinerDiscovery.failed_challenges + increments.c.failed_challenges_inc,
+                    total_challenges=MinerDiscovery.total_challenges + total_challenges_inc
+                )
+                await session.execute(stmt)
+
     async def remove_all_records(self):
         async with self.session_manager.session() as session:
             async with session.begin():
@@ -145,16 +208,15 @@ class MinerDiscoveryManager:
                     md.miner_key,
                     CAST(md.timestamp AS VARCHAR) AS timestamp,
                     md.rank,
-                    COALESCE(COUNT(mr.id), 0) AS total_receipts
+                    COALESCE(mr.total_receipts, 0) AS total_receipts
                 FROM 
                     miner_discoveries AS md
                 LEFT JOIN 
-                    miner_receipts AS mr ON md.miner_key = mr.miner_key
-                GROUP BY 
-                    md.network, 
-                    md.miner_key, 
-                    md.timestamp, 
-                    md.rank
+                    (
+                        SELECT miner_key, SUM(count)::BIGINT AS total_receipts
+                        FROM miner_receipt_stats
+                        GROUP BY miner_key
+                    ) AS mr ON md.miner_key = mr.miner_key
                 ORDER BY 
                     md.timestamp DESC, 
                     md.rank DESC;
@@ -167,18 +229,17 @@ class MinerDiscoveryManager:
                     md.network,
                     CAST(md.timestamp AS VARCHAR) AS timestamp,
                     md.rank,
-                    COALESCE(COUNT(mr.id), 0) AS total_receipts
+                    COALESCE(mr.total_receipts, 0) AS total_receipts
                 FROM 
                     miner_discoveries AS md
                 LEFT JOIN 
-                    miner_receipts AS mr ON md.miner_key = mr.miner_key
+                    (
+                        SELECT miner_key, SUM(count)::BIGINT AS total_receipts
+                        FROM miner_receipt_stats
+                        GROUP BY miner_key
+                    ) AS mr ON md.miner_key = mr.miner_key
                 WHERE 
                     md.network = :network
-                GROUP BY 
-                    md.id,
-                    md.network, 
-                    md.timestamp, 
-                    md.rank
                 ORDER BY 
                     md.timestamp DESC, 
                     md.rank DESC;
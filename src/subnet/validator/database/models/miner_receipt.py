@@ -1,21 +1,24 @@
-from typing import List, Optional, Dict, Union
+from typing import AsyncIterator, List, Optional, Dict, Union
 
 from dateutil import parser
 from pydantic import BaseModel
 from sqlalchemy import Column, String, DateTime, update, insert, BigInteger, Boolean, UniqueConstraint, Text, select, \
-    func, text, Index, Float
+    func, text, Index, Float, Integer, tuple_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import insert, TIMESTAMP
-from datetime import datetime
+from datetime import datetime, timezone
 from src.subnet.validator.database import OrmBase
 from src.subnet.validator.database.session_manager import DatabaseSessionManager
 
 Base = declarative_base()
 
+# rollup hour of receipts stored without a timestamp, outside every time window but still in the totals
+UNDATED_RECEIPT_HOUR = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 class MinerReceipt(OrmBase):
     __tablename__ = 'miner_receipts'
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
     validator_key = Column(String, nullable=False)
     request_id = Column(String, nullable=False)
     miner_key = Column(String, nullable=False)
@@ -37,23 +40,88 @@ class MinerReceipt(OrmBase):
         Index('idx_miner_receipts_timestamp',
               'timestamp', postgresql_using='btree'),
 
-        Index('idx_miner_receipts_validator_key_timestamp',
-              'validator_key', 'timestamp', postgresql_using='btree'),
+        Index('idx_miner_receipts_validator_key_timestamp_id',
+              'validator_key', 'timestamp', 'id', postgresql_using='btree'),
 
         Index('idx_miner_receipts_network_timestamp',
               'network', 'timestamp', postgresql_using='btree'),
     )
 
 
+class MinerReceiptStats(OrmBase):
+    """Hourly rollup of miner_receipts, kept up to date whenever receipts are stored."""
+    __tablename__ = 'miner_receipt_stats'
+    hour = Column(DateTime(timezone=True), primary_key=True)
+    network = Column(String, primary_key=True)
+    miner_key = Column(String, primary_key=True)
+    validator_key = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    sum_response_time = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index('idx_miner_receipt_stats_miner_key', 'miner_key', postgresql_using='btree'),
+    )
+
+
 class ReceiptMinerRank(BaseModel):
     miner_ratio: float
     miner_rank: int
 
 
 class MinerReceiptManager:
+    _stats_columns = (
+        MinerReceipt.timestamp,
+        MinerReceipt.network,
+        MinerReceipt.miner_key,
+        MinerReceipt.validator_key,
+        MinerReceipt.response_time,
+    )
+
     def __init__(self, session_manager: DatabaseSessionManager):
         self.session_manager = session_manager
 
+    @staticmethod
+    def _stats_hour(timestamp: Optional[datetime]) -> datetime:
+        """UTC hour a receipt is rolled up into, naive timestamps are taken as UTC."""
+        if timestamp is None:
+            return UNDATED_RECEIPT_HOUR
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    async def _update_receipt_stats(session, inserted_receipts):
+        """Adds freshly inserted receipts to the hourly rollup, within the caller's transaction."""
+        rollup = {}
+        for receipt in inserted_receipts:
+            hour = MinerReceiptManager._stats_hour(receipt.timestamp)
+            key = (hour, receipt.network, receipt.miner_key, receipt.validator_key)
+            count, sum_response_time = rollup.get(key, (0, 0.0))
+            rollup[key] = (count + 1, sum_response_time + (receipt.response_time or 0.0))
+
+        if not rollup:
+            return
+
+        stmt = insert(MinerReceiptStats).values([
+            {
+                'hour': hour,
+                'network': network,
+                'miner_key': miner_key,
+                'validator_key': validator_key,
+                'count': count,
+                'sum_response_time': sum_response_time,
+            }
+            for (hour, network, miner_key, validator_key), (count, sum_response_time) in rollup.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['hour', 'network', 'miner_key', 'validator_key'],
+            set_={
+                'count': MinerReceiptStats.count + stmt.excluded.count,
+                'sum_response_time': MinerReceiptStats.sum_response_time + stmt.excluded.sum_response_time,
+            }
+        )
+        await session.execute(stmt)
+
     async def store_miner_receipt(self, validator_key: str, request_id: str, miner_key: str, model_kind: str, network: str, query: str, query_hash: str, response_time: float, timestamp: str, result_hash: str, result_hash_signature: str):
         async with self.session_manager.session() as session:
             async with session.begin():
@@ -69,19 +137,30 @@ class MinerReceiptManager:
                     validator_key=validator_key,
                     query=query,
                     response_time=response_time,
-                )
-                await session.execute(stmt)
+                ).returning(*self._stats_columns)
+                result = await session.execute(stmt)
+                await self._update_receipt_stats(session, result.fetchall())
 
     async def sync_miner_receipts(self, receipts: List[Dict[str, Union[str, datetime, bool]]]):
+        if not receipts:
+            return
+
+        rows = []
         for receipt in receipts:
-            if isinstance(receipt['timestamp'], str):
-                receipt['timestamp'] = datetime.fromisoformat(receipt['timestamp'])
+            # ids are local to the gateway the receipt was synced from, the caller's dicts are left untouched
+            row = {key: value for key, value in receipt.items() if key != 'id'}
+            if isinstance(row['timestamp'], str):
+                row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+            rows.append(row)
 
         async with self.session_manager.session() as session:
             async with session.begin():
-                stmt = insert(MinerReceipt).values(receipts).on_conflict_do_nothing(
-                    index_elements=['miner_key', 'request_id'])
-                await session.execute(stmt)
+                # executemany with a single cached statement, rows are sent in insertmanyvalues batches
+                stmt = insert(MinerReceipt).on_conflict_do_nothing(
+                    index_elements=['miner_key', 'request_id']).returning(*self._stats_columns)
+                result = await session.execute(stmt, rows)
+                # only receipts that were actually inserted count towards the rollup
+                await self._update_receipt_stats(session, result.fetchall())
 
     async def get_receipts_by_miner_key(self, miner_key: Optional[str], validator_key: Optional[str], page: int = 1, page_size: int = 10):
         async with self.session_manager.session() as session:
@@ -142,6 +221,49 @@ class MinerReceiptManager:
                 "total_items": total_items
             }
 
+    async def get_receipts_after_cursor(self, validator_key: str, timestamp: str, after_id: int = 0, page_size: int = 1000):
+        """
+        Keyset page of receipts ordered by (timestamp, id), strictly after the given cursor.
+
+        `next_cursor` is None once the last page has been returned, no total count is computed.
+        """
+        timestamp_obj = parser.isoparse(timestamp)
+        async with self.session_manager.session() as session:
+            result = await session.execute(
+                select(MinerReceipt)
+                .where(MinerReceipt.validator_key == validator_key,
+                       tuple_(MinerReceipt.timestamp, MinerReceipt.id) > tuple_(timestamp_obj, after_id))
+                .order_by(MinerReceipt.timestamp.asc(), MinerReceipt.id.asc())
+                .limit(page_size)
+            )
+            receipts = result.scalars().all()
+
+            next_cursor = None
+            if len(receipts) == page_size:
+                next_cursor = {
+                    "timestamp": receipts[-1].timestamp.isoformat(),
+                    "id": receipts[-1].id
+                }
+
+            return {
+                "data": receipts,
+                "next_cursor": next_cursor
+            }
+
+    async def stream_receipts_after_cursor(self, validator_key: str, timestamp: str, after_id: int = 0, chunk_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Yields all receipts after the (timestamp, id) cursor as chunks of plain dicts, read through a server-side cursor."""
+        timestamp_obj = parser.isoparse(timestamp)
+        async with self.session_manager.session() as session:
+            result = await session.stream(
+                select(MinerReceipt.__table__)
+                .where(MinerReceipt.validator_key == validator_key,
+                       tuple_(MinerReceipt.timestamp, MinerReceipt.id) > tuple_(timestamp_obj, after_id))
+                .order_by(MinerReceipt.timestamp.asc(), MinerReceipt.id.asc())
+                .execution_options(yield_per=chunk_size)
+            )
+            async for partition in result.mappings().partitions(chunk_size):
+                yield [dict(row) for row in partition]
+
     async def get_last_receipt_timestamp_for_validator_key(self, validator_key: str) -> dict | None:
         async with self.session_manager.session() as session:
             query = select(MinerReceipt).where(
@@ -164,11 +286,11 @@ class MinerReceiptManager:
             query = text("""
                 SELECT 
                     network,
-                    COUNT(*) AS count
+                    SUM(count)::BIGINT AS count
                 FROM 
-                    miner_receipts
+                    miner_receipt_stats
                 WHERE 
-                    timestamp >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'
+                    hour >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'
                 GROUP BY 
                     network
             """)
@@ -177,16 +299,37 @@ class MinerReceiptManager:
             result = result.fetchall()
             return {row[0]: row[1] for row in result}
 
+    async def get_average_response_times(self, network: str, hours: int = 24) -> Dict[str, float]:
+        """Average receipt response time per miner of the network over the last `hours` hours."""
+        async with self.session_manager.session() as session:
+            query = text("""
+                SELECT 
+                    miner_key,
+                    SUM(sum_response_time) / SUM(count) AS response_time
+                FROM 
+                    miner_receipt_stats
+                WHERE 
+                    network = :network
+                    AND hour >= DATE_TRUNC('hour', NOW()) - make_interval(hours => :hours)
+                GROUP BY 
+                    miner_key
+                HAVING 
+                    SUM(count) > 0
+            """)
+
+            result = await session.execute(query, {"network": network, "hours": hours})
+            return {row[0]: float(row[1]) for row in result.fetchall()}
+
     async def get_receipt_miner_multiplier(self, network: Optional[str] = None, miner_key: Optional[str] = None) -> List[Dict]:
         async with self.session_manager.session() as session:
-            miner_key_filter = "AND miner_receipts.miner_key = :miner_key" if miner_key else ""
-            network_filter = "AND miner_receipts.network = :network" if network else ""
+            miner_key_filter = "AND miner_receipt_stats.miner_key = :miner_key" if miner_key else ""
+            network_filter = "AND miner_receipt_stats.network = :network" if network else ""
 
             query = text(f"""
                 WITH total_receipts AS (
-                    SELECT network, miner_key, COUNT(*) AS total_count
-                    FROM miner_receipts
-                    WHERE timestamp >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'
+                    SELECT network, miner_key, SUM(count)::BIGINT AS total_count
+                    FROM miner_receipt_stats
+                    WHERE hour >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '1 month'
                     {miner_key_filter}
                     {network_filter}
                     GROUP BY network, miner_key
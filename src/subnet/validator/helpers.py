@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 from typing import Any, cast
 
 from communex.client import CommuneClient
@@ -41,4 +42,11 @@ def get_ip_port(modules_adresses: dict[int, str]):
     ip_port = {
         id: x.group(0).split(":") for id, x in filtered_addr.items() if x is not None
     }
-    return ip_port
\ No newline at end of file
+    return ip_port
+
+
+def json_default(value):
+    """json.dumps default for payloads holding datetimes."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+from communex.errors import NetworkTimeoutError
+from communex.module._protocol import create_method_endpoint, create_request_data
+from communex.module.client import ModuleClient
+from communex.types import Ss58Address
+from loguru import logger
+from substrateinterface import Keypair
+
+
+class PooledModuleClient(ModuleClient):
+    """
+    ModuleClient that keeps its keep-alive connections to the miner between calls,
+    and allows at most `max_in_flight` concurrent requests to it.
+    """
+
+    def __init__(self, host: str, port: int, key: Keypair, max_in_flight: int = 4, keepalive_timeout: float = 60.0):
+        super().__init__(host, port, key)
+        self.max_in_flight = max_in_flight
+        self.keepalive_timeout = keepalive_timeout
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.last_used = time.monotonic()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def call(
+            self,
+            fn: str,
+            target_key: Ss58Address,
+            params: Any = {},
+            timeout: int = 16,
+    ) -> Any:
+        self.last_used = time.monotonic()
+        serialized_data, headers = create_request_data(self.key, target_key, params)
+
+        try:
+            # waiting for a free slot counts towards the call timeout
+            started_at = time.monotonic()
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=timeout)
+            remaining = max(0.0, timeout - (time.monotonic() - started_at))
+        except asyncio.TimeoutError as e:
+            raise NetworkTimeoutError(
+                f"The call took longer than the timeout of {timeout} second(s)").with_traceback(e.__traceback__)
+
+        try:
+            if remaining <= 0:
+                # a zero ClientTimeout disables the timeout instead of expiring it
+                raise asyncio.TimeoutError()
+            async with self.session.post(
+                    create_method_endpoint(self.host, self.port, fn),
+                    json=json.loads(serialized_data),
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=remaining),
+            ) as response:
+                if response.status != 200:
+                    response_j = await response.json()
+                    raise Exception(f"Unexpected status code: {response.status}, response: {response_j}")
+                if response.content_type != 'application/json':
+                    raise Exception(f"Unknown content type: {response.content_type}")
+                return await response.json()
+        except asyncio.TimeoutError as e:
+            raise NetworkTimeoutError(
+                f"The call took longer than the timeout of {timeout} second(s)").with_traceback(e.__traceback__)
+        finally:
+            self.semaphore.release()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+async def _close_all(clients: Iterable[PooledModuleClient]):
+    await asyncio.gather(*[client.close() for client in clients])
+
+
+class MinerClientRegistry:
+    """
+    PooledModuleClient per miner (ip, port), shared by discovery, challenges and queries.
+
+    Clients of miners that left `miner_discoveries` are closed by `retain`, clients idle for more than
+    `idle_timeout` seconds are closed on the next `get`. A registry belongs to the event loop that first used it,
+    its clients are closed when that loop cancels its remaining tasks on shutdown, as `asyncio.run` does.
+    """
+
+    def __init__(self, key: Keypair, max_in_flight_per_miner: int = 4, keepalive_timeout: float = 60.0, idle_timeout: float = 600.0):
+        self.key = key
+        self.max_in_flight_per_miner = max_in_flight_per_miner
+        self.keepalive_timeout = keepalive_timeout
+        self.idle_timeout = idle_timeout
+        self.clients: Dict[Tuple[str, int], PooledModuleClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._closing = set()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def get(self, ip: str, port: int) -> PooledModuleClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # sessions and semaphores can't move between event loops
+            self._close_stale(list(self.clients.values()))
+            self._loop = loop
+            self.clients = {}
+            self._watcher = loop.create_task(self._close_on_shutdown())
+
+        self._evict_idle()
+        endpoint = (ip, int(port))
+        client = self.clients.get(endpoint)
+        if client is not None:
+            self.reused += 1
+            return client
+
+        client = PooledModuleClient(ip, int(port), self.key, self.max_in_flight_per_miner, self.keepalive_timeout)
+        self.clients[endpoint] = client
+        self.created += 1
+        return client
+
+    async def _close_on_shutdown(self):
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await self.close()
+
+    def _close_stale(self, clients):
+        """Closes the clients of the previous event loop, on that loop if it still runs."""
+        if not clients:
+            return
+        stale_loop = self._loop
+        if stale_loop is not None and stale_loop.is_running():
+            for client in clients:
+                asyncio.run_coroutine_threadsafe(client.close(), stale_loop)
+        elif stale_loop is not None and not stale_loop.is_closed():
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(stale_loop.run_until_complete, _close_all(clients)))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            # the loop was closed without cancelling its tasks, the sessions can't be closed from another loop,
+            # their sockets are closed once the dropped transports are collected
+            logger.debug("Dropping miner clients of a closed event loop", clients=len(clients))
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for endpoint, client in list(self.clients.items()):
+            if now - client.last_used > self.idle_timeout and not client.semaphore.locked():
+                self._evict(endpoint)
+
+    def _evict(self, endpoint: Tuple[str, int]):
+        client = self.clients.pop(endpoint)
+        self.evicted += 1
+        task = asyncio.get_running_loop().create_task(client.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def retain(self, endpoints: Iterable[Tuple[str, int]]):
+        """Closes the clients of every endpoint not in `endpoints`."""
+        keep = {(ip, int(port)) for ip, port in endpoints}
+        closing = []
+        for endpoint in list(self.clients.keys()):
+            if endpoint not in keep:
+                closing.append(self.clients.pop(endpoint).close())
+                self.evicted += 1
+        await asyncio.gather(*closing)
+
+    async def close(self):
+        watcher, self._watcher, self._loop = self._watcher, None, None
+        if watcher is not None and watcher is not asyncio.current_task():
+            watcher.cancel()
+        clients, self.clients = list(self.clients.values()), {}
+        await asyncio.gather(*[client.close() for client in clients])
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self.clients),
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,103 @@
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class MinerStats:
+    __slots__ = ("latency", "success", "samples")
+
+    def __init__(self, latency: float, success: float):
+        self.latency = latency
+        self.success = success
+        self.samples = 0
+
+
+class MinerSelector:
+    """
+    Latency and success aware miner selection for gateway queries.
+
+    Every miner keeps an EWMA of its query latency and success rate, seeded from the average `response_time` of its
+    receipts and its challenge failure ratio in `miner_discoveries`. Miners are picked with power-of-two choices: of two
+    random candidates the one with the lower expected latency (latency / success rate) wins. A share `explore` of picks
+    is uniform, so slow or failing miners get less traffic without starving them of the samples that let them recover.
+    """
+
+    def __init__(self, alpha: float = 0.2, default_latency: float = 1.0, hedge_percentile: float = 0.9,
+                 window: int = 512, min_hedge_samples: int = 20, min_success: float = 0.05, explore: float = 0.05):
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.min_success = min_success
+        self.explore = explore
+        self.miners: Dict[str, MinerStats] = {}
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.window = window
+        self.seeded_networks = set()
+        self.hedged = 0
+
+    def seed(self, miners: List[dict], response_times: Optional[Dict[str, float]] = None):
+        """Sets the starting estimates of miners not seen yet, from receipts and challenge results."""
+        response_times = response_times or {}
+        for miner in miners:
+            miner_key = miner['miner_key']
+            if miner_key in self.miners:
+                continue
+            total_challenges = miner.get('total_challenges') or 0
+            failed_challenges = miner.get('failed_challenges') or 0
+            success = 1.0 - failed_challenges / total_challenges if total_challenges else 1.0
+            self.miners[miner_key] = MinerStats(response_times.get(miner_key, self.default_latency), max(success, self.min_success))
+
+    def record(self, network: str, miner_key: str, latency: float, success: bool):
+        stats = self.miners.get(miner_key)
+        if stats is None:
+            stats = self.miners[miner_key] = MinerStats(latency, 1.0)
+        if not success:
+            # fast failures (refused connections) must not make a miner look fast
+            latency = max(latency, stats.latency)
+        stats.latency += self.alpha * (latency - stats.latency)
+        stats.success += self.alpha * ((1.0 if success else 0.0) - stats.success)
+        stats.samples += 1
+        if success:
+            self.latencies.setdefault(network, deque(maxlen=self.window)).append(latency)
+
+    def expected_latency(self, miner_key: str) -> float:
+        stats = self.miners.get(miner_key)
+        if stats is None:
+            return self.default_latency
+        return stats.latency / max(stats.success, self.min_success)
+
+    def select(self, miners: List[dict], count: int) -> List[dict]:
+        """Picks `count` distinct miners with power-of-two choices."""
+        candidates = list(miners)
+        selected = []
+        while candidates and len(selected) < count:
+            if len(candidates) == 1:
+                index = 0
+            elif random.random() < self.explore:
+                index = random.randrange(len(candidates))
+            else:
+                first, second = random.sample(range(len(candidates)), 2)
+                first_cost = self.expected_latency(candidates[first]['miner_key'])
+                second_cost = self.expected_latency(candidates[second]['miner_key'])
+                index = first if first_cost <= second_cost else second
+            selected.append(candidates.pop(index))
+        return selected
+
+    def hedge_delay(self, network: str) -> Optional[float]:
+        """Latency percentile of successful queries on the network, None until there are enough samples."""
+        latencies = self.latencies.get(network)
+        if latencies is None or len(latencies) < self.min_hedge_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))]
+
+    def stats(self) -> dict:
+        return {
+            "miners": {
+                miner_key: {"latency": round(stats.latency, 3), "success": round(stats.success, 3), "samples": stats.samples}
+                for miner_key, stats in self.miners.items()
+            },
+            "hedge_delay": {network: self.hedge_delay(network) for network in self.latencies},
+            "hedged": self.hedged,
+        }
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+try:
+    hashlib.new("ripemd160")
+
+    def _ripemd160(data: bytes) -> bytes:
+        return hashlib.new("ripemd160", data).digest()
+except ValueError:  # OpenSSL 3 builds without the legacy provider
+    from Crypto.Hash import RIPEMD160
+
+    def _ripemd160(data: bytes) -> bytes:
+        return RIPEMD160.new(data).digest()
+
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_CHUNK = 58 ** 10
+
+
+class AddressDerivationStats:
+    """Counts how scripts without an rpc provided address were resolved, in place of printing every failure."""
+
+    def __init__(self):
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, outcome: str):
+        with self.lock:
+            self.counters[outcome] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        cache = _derive_cached.cache_info()
+        counters["cache_hits"] = cache.hits
+        counters["cache_misses"] = cache.misses
+        counters["cache_size"] = cache.currsize
+        return counters
+
+
+address_stats = AddressDerivationStats()
+
+
+def hash160(data: bytes) -> bytes:
+    return _ripemd160(hashlib.sha256(data).digest())
+
+
+def b58encode(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    digits = []
+    # peel off ten base58 digits per big int division, the rest is small int arithmetic
+    while number:
+        number, chunk = divmod(number, _B58_CHUNK)
+        for _ in range(10):
+            chunk, digit = divmod(chunk, 58)
+            digits.append(B58_ALPHABET[digit])
+    while digits and digits[-1] == "1":
+        digits.pop()
+    leading_zeros = len(data) - len(data.lstrip(b"\0"))
+    return "1" * leading_zeros + "".join(reversed(digits))
+
+
+def b58encode_check(payload: bytes) -> str:
+    checksum = hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    return b58encode(payload + checksum)
+
+
+def pubkey_to_address(pubkey: str) -> str:
+    try:
+        pubkey_bytes = bytes.fromhex(pubkey)
+    except ValueError:
+        raise ValueError(f"Invalid pubkey: {pubkey}. Contains non-hexadecimal characters.")
+    return b58encode_check(b"\x00" + hash160(pubkey_bytes))
+
+
+def script_to_p2sh_address(script: str, mainnet=True) -> str:
+    version_byte = b"\x05" if mainnet else b"\xc4"
+    return b58encode_check(version_byte + hash160(bytes.fromhex(script)))
+
+
+def script_to_p2pkh_address(script: str, mainnet=True) -> str:
+    # Normal P2PKH script is 50 characters, only the relevant part of longer ones is used
+    script = script[:50]
+    pubkey_hash = script[6:46]
+    if not script.startswith("76a914") or len(pubkey_hash) != 40:
+        address_stats.record("invalid_p2pkh")
+        return f"INVALID_P2PKH_SCRIPT_{script[:10]}"
+    try:
+        pubkey_hash = bytes.fromhex(pubkey_hash)
+    except ValueError:
+        address_stats.record("invalid_p2pkh")
+        return f"INVALID_P2PKH_SCRIPT_{script[:10]}"
+    version_byte = b"\x00" if mainnet else b"\x6f"
+    return b58encode_check(version_byte + pubkey_hash)
+
+
+def create_p2sh_address(hashed_script: bytes, mainnet=True) -> str:
+    version_byte = b"\x05" if mainnet else b"\xc4"
+    return b58encode_check(version_byte + hashed_script)
+
+
+def _derive(script_type: str, hex_script: str, script_pub_key_asm: str) -> str:
+    try:
+        if script_type == "nulldata":
+            # Handle OP_RETURN (nulldata) scripts
+            asm_parts = script_pub_key_asm.split()
+            if asm_parts[0] == "OP_RETURN":
+                data = " ".join(asm_parts[1:])
+                return f"OP_RETURN_{data[:20]}..."  # Return first 20 chars of data
+
+        if script_type == "pubkey":
+            return pubkey_to_address(script_pub_key_asm.split()[0])
+
+        if script_type == "pubkeyhash" or (script_type == "" and hex_script.startswith("76a914")):
+            return script_to_p2pkh_address(hex_script)
+
+        if script_type == "scripthash" or (script_type == "" and hex_script.startswith("a914")):
+            return script_to_p2sh_address(hex_script)
+
+        if script_type == "multisig":
+            return script_to_p2sh_address(hex_script)
+
+        if script_type in ("witness_v0_keyhash", "witness_v0_scripthash"):
+            return ""  # Bech32 address should be provided by the node
+
+        # Handle "cosmic ray" transactions with long, repeating OP_CHECKSIG
+        if script_pub_key_asm.count("OP_CHECKSIG") > 100:
+            address_stats.record("unknown")
+            return f"UNKNOWN_{script_pub_key_asm[:30]}"
+
+        if script_type == "nonstandard":
+            address_stats.record("nonstandard")
+            return f"NONSTANDARD_{hex_script[:20]}..."
+
+        # fallback
+        if "OP_CHECKSIG" in script_pub_key_asm:
+            asm_parts = script_pub_key_asm.split()
+            if len(asm_parts) == 2 and asm_parts[1] == "OP_CHECKSIG":
+                # This is likely a P2PK script
+                return pubkey_to_address(asm_parts[0])
+            elif "OP_DUP OP_HASH160" in script_pub_key_asm and "OP_EQUALVERIFY OP_CHECKSIG" in script_pub_key_asm:
+                # This is likely a P2PKH script
+                return script_to_p2pkh_address(hex_script)
+        elif "OP_CHECKMULTISIG" in script_pub_key_asm:
+            return script_to_p2sh_address(hex_script)
+
+        raise ValueError(f"Unable to derive address for script type: {script_type}")
+    except Exception:
+        address_stats.record(f"unknown:{script_type or 'untyped'}")
+        return f"UNKNOWN_{script_pub_key_asm[:30]}"
+
+
+_derive_cached = lru_cache(maxsize=int(os.getenv("BITCOIN_ADDRESS_CACHE_SIZE", 100_000)))(_derive)
+
+
+def derive_address(script_pub_key: dict, script_pub_key_asm: str) -> str:
+    if "address" in script_pub_key:
+        return script_pub_key["address"]
+
+    addresses = script_pub_key.get("addresses")
+    if addresses:
+        return addresses[0]
+
+    return _derive_cached(script_pub_key.get("type", ""), script_pub_key.get("hex", ""), script_pub_key_asm)
+
+
+def derive_addresses(script_pub_keys: List[dict]) -> List[str]:
+    """Addresses of a batch of scriptPubKeys (a block's outputs), every distinct script is derived once."""
+    derived: Dict[Tuple[str, str, str], str] = {}
+    addresses = []
+    for script_pub_key in script_pub_keys:
+        if "address" in script_pub_key:
+            addresses.append(script_pub_key["address"])
+            continue
+        key = (script_pub_key.get("type", ""), script_pub_key.get("hex", ""), script_pub_key.get("asm", ""))
+        address = derived.get(key)
+        if address is None:
+            address = derived[key] = derive_address(script_pub_key, key[2])
+        addresses.append(address)
+    return addresses
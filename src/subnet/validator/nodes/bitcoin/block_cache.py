@@ -0,0 +1,162 @@
+import marshal
+import mmap
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from .node_utils import Block, Transaction, VIN, VOUT
+
+# bump when the layout of the cached tuples changes, old entries are then ignored
+CACHE_FORMAT_VERSION = 2
+
+
+def _encode_block(block: Block, prevouts: Iterable[Tuple[str, int, str, int]]) -> bytes:
+    transactions = [
+        (
+            tx.tx_id, tx.timestamp, tx.fee_satoshi, tx.size, tx.vsize, tx.weight, tx.is_coinbase,
+            [(vin.tx_id, vin.vin_id, vin.vout_id, vin.script_sig, vin.sequence) for vin in tx.vins],
+            [(vout.vout_id, vout.value_satoshi, vout.script_pub_key, vout.address, vout.script_type, vout.address_derived)
+             for vout in tx.vouts],
+        )
+        for tx in block.transactions
+    ]
+    header = (block.block_height, block.block_hash, block.timestamp, block.previous_block_hash, block.nonce, block.difficulty)
+    return marshal.dumps((CACHE_FORMAT_VERSION, header, transactions, list(prevouts)))
+
+
+def _decode_block(data) -> Tuple[Block, List[Tuple[str, int, str, int]]]:
+    version, header, transactions, prevouts = marshal.loads(data)
+    if version != CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported block cache format: {version}")
+
+    block_height, block_hash, timestamp, previous_block_hash, nonce, difficulty = header
+    block = Block(
+        block_height=block_height,
+        block_hash=block_hash,
+        timestamp=timestamp,
+        previous_block_hash=previous_block_hash,
+        nonce=nonce,
+        difficulty=difficulty,
+    )
+    for tx_id, tx_timestamp, fee_satoshi, size, vsize, weight, is_coinbase, vins, vouts in transactions:
+        tx = Transaction(
+            tx_id=tx_id,
+            block_height=block_height,
+            timestamp=tx_timestamp,
+            fee_satoshi=fee_satoshi,
+            size=size,
+            vsize=vsize,
+            weight=weight,
+            is_coinbase=is_coinbase,
+        )
+        tx.vins = [VIN(*vin) for vin in vins]
+        tx.vouts = [VOUT(vout_id, value_satoshi, script_pub_key, False, address, script_type, address_derived)
+                    for vout_id, value_satoshi, script_pub_key, address, script_type, address_derived in vouts]
+        block.transactions.append(tx)
+    return block, prevouts
+
+
+class BlockCache:
+    """
+    Parsed bitcoin blocks on local disk, one marshal file per height, read through mmap.
+
+    Next to the block, an entry keeps the prevouts (tx_id, vout_id, address, amount) resolved for its inputs, so a
+    cached block can be processed again without any bitcoind call. At most `max_blocks` entries are kept, the least
+    recently written ones are removed first.
+    """
+
+    _caches: Dict[str, "BlockCache"] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, directory: str, max_blocks: int = 1000):
+        self.directory = directory
+        self.max_blocks = max_blocks
+        self.lock = threading.Lock()
+        self.heights: Optional[Dict[int, None]] = None  # write order, loaded lazily from the directory
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_directory(cls, directory: str, **kwargs) -> "BlockCache":
+        """Returns the cache shared by all nodes using `directory`."""
+        directory = os.path.abspath(directory)
+        with cls._caches_lock:
+            cache = cls._caches.get(directory)
+            if cache is None:
+                cache = cls._caches[directory] = cls(directory, **kwargs)
+            return cache
+
+    def _path(self, block_height: int) -> str:
+        return os.path.join(self.directory, f"{block_height}.blk")
+
+    def _load_index(self):
+        if self.heights is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".blk"):
+                path = os.path.join(self.directory, name)
+                entries.append((os.path.getmtime(path), int(name[:-4])))
+        self.heights = {block_height: None for _, block_height in sorted(entries)}
+
+    def get(self, block_height: int) -> Optional[Tuple[Block, List[Tuple[str, int, str, int]]]]:
+        """Returns (block, prevouts) or None if the height isn't cached."""
+        path = self._path(block_height)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                cached = _decode_block(data)
+        except FileNotFoundError:
+            cached = None
+        except Exception as e:
+            logger.warning("Dropping unreadable block cache entry", block_height=block_height, error=str(e))
+            self._remove(block_height)
+            cached = None
+
+        with self.lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, block: Block, prevouts: Iterable[Tuple[str, int, str, int]] = ()):
+        data = _encode_block(block, prevouts)
+        with self.lock:
+            self._load_index()
+            path = self._path(block.block_height)
+            # write then rename, so concurrent readers never see a partial entry
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self.heights.pop(block.block_height, None)
+            self.heights[block.block_height] = None
+            while len(self.heights) > self.max_blocks:
+                oldest = next(iter(self.heights))
+                del self.heights[oldest]
+                self._unlink(oldest)
+
+    def _remove(self, block_height: int):
+        with self.lock:
+            if self.heights is not None:
+                self.heights.pop(block_height, None)
+            self._unlink(block_height)
+
+    def _unlink(self, block_height: int):
+        try:
+            os.remove(self._path(block_height))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "blocks": len(self.heights) if self.heights is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
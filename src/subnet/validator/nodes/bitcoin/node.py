@@ -1,138 +1,59 @@
 import os
-import json
-import http.client
-import base64
 import random
 from threading import Event
+from typing import Tuple
 from src.subnet.protocol import Challenge, MODEL_KIND_MONEY_FLOW, MODEL_KIND_BALANCE_TRACKING
 from .node_utils import  check_if_block_is_valid_for_challenge, parse_block_data
-from bitcoin.rpc import Proxy, InvalidAddressOrKeyError
 from ..abstract_node import Node
 from ..random_block import select_block
-from decimal import Decimal
-from bitcoin.core import b2lx
+from .block_cache import BlockCache
+from .rpc import BitcoinRpcClient
 from loguru import logger
 from .node_utils import (
     pubkey_to_address,
     construct_redeem_script,
     hash_redeem_script,
     create_p2sh_address,
-    Transaction, SATOSHI, VOUT, VIN, derive_address
+    Block, Transaction, VOUT, VIN, TxOutCache, derive_address, to_satoshi
 )
 
 
-class ExtendedProxy(Proxy):
-    def getblock(self, block_hash, verbosity=2):
-        try:
-            block_hash = b2lx(block_hash)
-        except TypeError:
-            raise TypeError('%s.getblock(): block_hash must be bytes; got %r instance' %
-                            (self.__class__.__name__, block_hash.__class__))
-        try:
-            r = self._call('getblock', block_hash, verbosity)
-            return r
-        except InvalidAddressOrKeyError as ex:
-            raise IndexError('%s.getblock(): %s (%d)' %
-                             (self.__class__.__name__, ex.error['message'], ex.error['code']))
-
-    def batch_request(self, commands):
-        try:
-            # Build authorization header
-            auth = base64.b64encode(
-                f"{self._BaseProxy__url.username}:{self._BaseProxy__url.password}".encode()
-            ).decode()
-
-            # Prepare batch request
-            batch = []
-            for i, cmd in enumerate(commands):
-                method, *params = cmd
-                batch.append({
-                    "method": method,
-                    "params": params,
-                    "jsonrpc": "2.0",
-                    "id": i,
-                })
-
-            # Create HTTP connection
-            conn = http.client.HTTPConnection(
-                self._BaseProxy__url.hostname,
-                self._BaseProxy__url.port
-            )
-
-            headers = {
-                "Authorization": f"Basic {auth}",
-                "Content-Type": "application/json",
-            }
-
-            # Make the request
-            conn.request(
-                "POST",
-                "/",
-                json.dumps(batch),
-                headers
-            )
-
-            # Get and parse response
-            response = conn.getresponse()
-            result = json.loads(response.read().decode())
-            conn.close()
-
-            # Handle response
-            if isinstance(result, list):
-                for r in result:
-                    if "error" in r and r["error"] is not None:
-                        raise Exception(f"Error in command {r['id']}: {r['error']}")
-                return [r["result"] for r in result]
-            else:
-                if result.get("error"):
-                    raise Exception(f"Error in batch request: {result['error']}")
-                return [result.get("result")]
-
-        except Exception as e:
-            logger.error(f"Batch request failed: {str(e)}")
-            raise
-
-
 class BitcoinNode(Node):
+    # shared by all node instances, so resolved prevouts survive across challenges
+    tx_out_cache = TxOutCache(max_size=int(os.getenv("BITCOIN_TX_OUT_CACHE_SIZE", 100_000)))
+
     def __init__(self):
         self.node_rpc_url = os.getenv("BITCOIN_NODE_RPC_URL")
+        self.rpc = BitcoinRpcClient.for_url(
+            self.node_rpc_url,
+            pool_size=int(os.getenv("BITCOIN_NODE_RPC_POOL_SIZE", 8)),
+            batch_size=int(os.getenv("BITCOIN_NODE_RPC_BATCH_SIZE", 1000)),
+        )
         super().__init__()
 
     def get_current_block_height(self):
-        proxy = Proxy(service_url=self.node_rpc_url)
         try:
-            result = proxy.getblockcount()
-            return result
+            return self.rpc.call("getblockcount")
         except Exception as e:
             logger.error(f"RPC Provider with Error", error=str(e))
-        finally:
-            proxy.close()
 
     def get_block_by_height(self, block_height):
-        proxy = ExtendedProxy(service_url=self.node_rpc_url)
         try:
-            block_hash = proxy.getblockhash(block_height)
-            result = proxy.getblock(block_hash)
-            return result
+            block_hash = self.rpc.call("getblockhash", block_height)
+            return self.rpc.call("getblock", block_hash, 2)
         except Exception as e:
             logger.error(f"RPC Provider with Error", error=str(e))
-        finally:
-            proxy.close()
 
     def get_address_and_amount_by_txn_id_and_vout_id(self, txn_id: str, vout_id: str):
         result = self.get_addresses_and_amounts_by_txouts([(txn_id, vout_id)])
-        return result.get((txn_id, vout_id), (f"unknown-{txn_id}", 0))
+        return result.get((txn_id, int(vout_id)), (f"unknown-{txn_id}", 0))
 
     def get_txn_data_by_id(self, txn_id: str):
-        proxy = Proxy(service_url=self.node_rpc_url)
         try:
-            result = proxy.getrawtransaction(txn_id, 1)
-            return result
+            return self.rpc.call("getrawtransaction", txn_id, 1)
         except Exception as e:
             logger.error(f"RPC Provider with Error", error=str(e))
             return None
-        finally:
-            proxy.close()
 
     @staticmethod
     def create_in_memory_txn(tx_data):
@@ -159,28 +80,10 @@ class BitcoinNode(Node):
             if "nonstandard" in script_type or script_type == "nulldata":
                 continue
 
-            value_satoshi = int(Decimal(vout_data["value"]) * SATOSHI)
+            value_satoshi = to_satoshi(vout_data["value"])
             n = vout_data["n"]
             script_pub_key_asm = vout_data["scriptPubKey"].get("asm", "")
-
-            address = vout_data["scriptPubKey"].get("address", "")
-            if not address:
-                addresses = vout_data["scriptPubKey"].get("addresses", [])
-                if addresses:
-                    address = addresses[0]
-                elif "OP_CHECKSIG" in script_pub_key_asm:
-                    pubkey = script_pub_key_asm.split()[0]
-                    address = pubkey_to_address(pubkey)
-                elif "OP_CHECKMULTISIG" in script_pub_key_asm:
-                    pubkeys = script_pub_key_asm.split()[1:-2]
-                    m = int(script_pub_key_asm.split()[0])
-                    redeem_script = construct_redeem_script(pubkeys, m)
-                    hashed_script = hash_redeem_script(redeem_script)
-                    address = create_p2sh_address(hashed_script)
-                else:
-                    raise Exception(
-                        f"Unknown address type: {vout_data['scriptPubKey']}"
-                    )
+            address = BitcoinNode.in_memory_address(vout_data["scriptPubKey"])
 
             vout = VOUT(
                 vout_id=n,
@@ -193,14 +96,38 @@ class BitcoinNode(Node):
 
         return tx
 
+    @staticmethod
+    def in_memory_address(script_pub_key: dict) -> str:
+        """The output address create_in_memory_txn indexes, raises for scripts it can't resolve."""
+        address = script_pub_key.get("address", "")
+        if address:
+            return address
+
+        script_pub_key_asm = script_pub_key.get("asm", "")
+        addresses = script_pub_key.get("addresses", [])
+        if addresses:
+            return addresses[0]
+        elif "OP_CHECKSIG" in script_pub_key_asm:
+            pubkey = script_pub_key_asm.split()[0]
+            return pubkey_to_address(pubkey)
+        elif "OP_CHECKMULTISIG" in script_pub_key_asm:
+            pubkeys = script_pub_key_asm.split()[1:-2]
+            m = int(script_pub_key_asm.split()[0])
+            redeem_script = construct_redeem_script(pubkeys, m)
+            hashed_script = hash_redeem_script(redeem_script)
+            return create_p2sh_address(hashed_script)
+        raise Exception(
+            f"Unknown address type: {script_pub_key}"
+        )
+
     def process_in_memory_txn_for_indexing(self, tx):
         input_amounts = {}  # input amounts by address in satoshi
         output_amounts = {}  # output amounts by address in satoshi
 
-        for vin in tx.vins:
-            if vin.tx_id == 0:
-                continue
-            address, amount = self.get_address_and_amount_by_txn_id_and_vout_id(vin.tx_id, str(vin.vout_id))
+        txouts = [(vin.tx_id, vin.vout_id) for vin in tx.vins if vin.tx_id != 0]
+        resolved_txouts = self.get_addresses_and_amounts_by_txouts(txouts)
+        for txn_id, vout_id in txouts:
+            address, amount = resolved_txouts[(txn_id, int(vout_id))]
             input_amounts[address] = input_amounts.get(address, 0) + amount
 
         for vout in tx.vouts:
@@ -230,14 +157,13 @@ class BitcoinNode(Node):
         return input_amounts, output_amounts, input_addresses, output_addresses, in_total_amount, out_total_amount
 
     def get_blocks_by_height_range(self, start_height: int, end_height: int):
-        proxy = ExtendedProxy(service_url=self.node_rpc_url)
         try:
             commands = [[
                 "getblockhash",
                 height
             ] for height in range(start_height, end_height + 1)]
 
-            block_hashes = proxy.batch_request(commands)
+            block_hashes = self.rpc.batch_request(commands)
 
             commands = [[
                 "getblock",
@@ -245,16 +171,13 @@ class BitcoinNode(Node):
                 2
             ] for block_hash in block_hashes]
 
-            result = proxy.batch_request(commands)
+            result = self.rpc.batch_request(commands)
             return result
         except Exception as e:
             logger.error(f"RPC Provider with Error", error=str(e))
             return []
-        finally:
-            proxy.close()
 
     def get_transactions_by_ids(self, tx_ids: list):
-        proxy = ExtendedProxy(service_url=self.node_rpc_url)
         try:
             commands = [[
                 "getrawtransaction",
@@ -262,60 +185,142 @@ class BitcoinNode(Node):
                 1,
             ] for tx_id in tx_ids]
 
-            result = proxy.batch_request(commands)
+            result = self.rpc.batch_request(commands)
             return result
         except Exception as e:
             logger.error(f"RPC Provider with Error", error=str(e))
             return []
-        finally:
-            proxy.close()
 
     def get_addresses_and_amounts_by_txouts(self, txouts: list):
         """
         Batch fetch addresses and amounts for multiple txouts
         txouts should be a list of (txn_id, vout_id) tuples
         :param txouts:
-        :return:
+        :return: dict of (txn_id, int(vout_id)) -> (address, amount)
         """
 
         # First check hash table for all entries
         results = {}
-        missing_txouts = []
+        missing_txouts = set()
 
         for txn_id, vout_id in txouts:
-                missing_txouts.append((txn_id, vout_id))
+            key = (txn_id, int(vout_id))
+            cached = self.tx_out_cache.get(*key)
+            if cached is None:
+                missing_txouts.add(key)
+            else:
+                results[key] = cached
 
         if missing_txouts:
             unique_tx_ids = list(set(tx_id for tx_id, _ in missing_txouts))
             tx_data_list = self.get_transactions_by_ids(unique_tx_ids)
 
-            # Create a mapping of txid to transaction data
-            tx_map = {tx['txid']: tx for tx in tx_data_list if tx}
+            # Cache every output of the fetched transactions, siblings are likely to be spent later
+            for tx_data in tx_data_list:
+                if not tx_data:
+                    continue
+                for vout in tx_data['vout']:
+                    amount = to_satoshi(vout['value'])
+                    address = derive_address(vout["scriptPubKey"],
+                                             vout["scriptPubKey"].get("asm", ""))
+                    self.tx_out_cache.put(tx_data['txid'], vout['n'], address, amount)
+                    if (tx_data['txid'], vout['n']) in missing_txouts:
+                        results[(tx_data['txid'], vout['n'])] = (address, amount)
 
             for txn_id, vout_id in missing_txouts:
-                if txn_id in tx_map:
-                    tx_data = tx_map[txn_id]
-                    vout = next((x for x in tx_data['vout'] if str(x['n']) == str(vout_id)), None)
-
-                    if vout:
-                        amount = int(vout['value'] * 100000000)
-                        address = derive_address(vout["scriptPubKey"],
-                                                 vout["scriptPubKey"].get("asm", ""))
-                    else:
-                        address = f"unknown-{txn_id}"
-                        amount = 0
-                else:
-                    address = f"unknown-{txn_id}"
-                    amount = 0
-
-                results[(txn_id, vout_id)] = (address, amount)
+                if (txn_id, vout_id) not in results:
+                    results[(txn_id, vout_id)] = (f"unknown-{txn_id}", 0)
 
         return results
 
+    def prefetch_txouts(self, transactions):
+        """Resolves the inputs of all given transactions with a single batched lookup."""
+        txouts = {(vin.tx_id, vin.vout_id) for tx in transactions for vin in tx.vins if vin.tx_id != 0}
+        self.get_addresses_and_amounts_by_txouts(list(txouts))
+        logger.debug(f"Prefetched block inputs", txouts=len(txouts), cache=self.tx_out_cache.stats())
+
 
 class ChallengeBitcoinNode(BitcoinNode):
     def __init__(self):
         super().__init__()
+        # off unless configured, an absolute path keeps the cache out of whatever the working directory is
+        block_cache_dir = os.getenv("BITCOIN_BLOCK_CACHE_DIR")
+        if block_cache_dir and not os.path.isabs(block_cache_dir):
+            logger.warning("BITCOIN_BLOCK_CACHE_DIR is not an absolute path, block cache disabled", block_cache_dir=block_cache_dir)
+            block_cache_dir = None
+        self.block_cache = BlockCache.for_directory(
+            block_cache_dir,
+            max_blocks=int(os.getenv("BITCOIN_BLOCK_CACHE_SIZE", 1000)),
+        ) if block_cache_dir else None
+
+    def get_parsed_block(self, block_height: int) -> Tuple[Block, int]:
+        """
+        Returns (block, number of cached prevouts), from the block cache if the height was seen before, calling
+        bitcoind otherwise. Cached prevouts are loaded into the tx out cache, the count is -1 for an uncached block.
+        """
+        if self.block_cache is not None:
+            cached = self.block_cache.get(block_height)
+            if cached is not None:
+                block, prevouts = cached
+                for tx_id, vout_id, address, amount in prevouts:
+                    self.tx_out_cache.put(tx_id, vout_id, address, amount)
+                return block, len(prevouts)
+
+        block = parse_block_data(self.get_block_by_height(block_height))
+        # outputs spent by later transactions of the same block are their prevouts, no other output is looked up
+        tx_ids = {tx.tx_id for tx in block.transactions}
+        spent = {(vin.tx_id, int(vin.vout_id)) for tx in block.transactions for vin in tx.vins if vin.tx_id in tx_ids}
+        for tx in block.transactions:
+            for vout in tx.vouts:
+                if (tx.tx_id, int(vout.vout_id)) in spent:
+                    self.tx_out_cache.put(tx.tx_id, vout.vout_id, vout.address, vout.value_satoshi)
+        return block, -1
+
+    def cache_block(self, block: Block, cached_prevouts: int):
+        """Stores the block with every prevout resolved so far, unless the cache already has them all."""
+        if self.block_cache is None:
+            return
+
+        prevouts = []
+        for tx in block.transactions:
+            for vin in tx.vins:
+                if vin.tx_id == 0:
+                    continue
+                resolved = self.tx_out_cache.peek(vin.tx_id, vin.vout_id)
+                if resolved is not None:
+                    prevouts.append((vin.tx_id, int(vin.vout_id), *resolved))
+
+        if len(prevouts) <= cached_prevouts:
+            return
+        try:
+            self.block_cache.put(block, prevouts)
+        except OSError as e:
+            logger.warning(f"Failed to cache block", block_height=block.block_height, error=str(e))
+
+    @staticmethod
+    def money_flow_txn(tx: Transaction) -> Transaction:
+        """
+        The block transaction as create_in_memory_txn builds it: without nonstandard and nulldata outputs, and with
+        addresses the node didn't give derived from the script asm like it does. Raises where it would.
+        """
+        vouts = []
+        for vout in tx.vouts:
+            if "nonstandard" in vout.script_type or vout.script_type == "nulldata":
+                continue
+            address = vout.address
+            if vout.address_derived:
+                address = BitcoinNode.in_memory_address({"asm": vout.script_pub_key})
+            vouts.append(VOUT(vout.vout_id, vout.value_satoshi, vout.script_pub_key, False, address, vout.script_type))
+
+        return Transaction(
+            tx_id=tx.tx_id,
+            block_height=tx.block_height,
+            timestamp=tx.timestamp,
+            fee_satoshi=tx.fee_satoshi,
+            vins=tx.vins,
+            vouts=vouts,
+            is_coinbase=tx.is_coinbase,
+        )
 
     def create_money_flow_challenge(self, last_block_height, terminate_event: Event):
         num_retries = 10  # to prevent infinite loop
@@ -334,21 +339,26 @@ class ChallengeBitcoinNode(BitcoinNode):
                 f"Failed to create a valid challenge."
             )
 
-        block_data = self.get_block_by_height(block_to_check)
-        num_transactions = len(block_data["tx"])
+        block, cached_prevouts = self.get_parsed_block(block_to_check)
+        num_transactions = len(block.transactions)
 
         out_total_amount = 0
         while out_total_amount == 0:
             if terminate_event.is_set():
                 return None, None
-            selected_txn = block_data["tx"][random.randint(0, num_transactions - 1)]
-            txn_id = selected_txn.get('txid')
-
-            txn_data = self.get_txn_data_by_id(txn_id)
-            tx = self.create_in_memory_txn(txn_data)
+            # the block already holds the transaction, no need to fetch it again
+            try:
+                tx = self.money_flow_txn(block.transactions[random.randint(0, num_transactions - 1)])
+            except Exception as e:
+                # the transaction can't be indexed, like create_in_memory_txn rejects it, pick another one
+                logger.debug(f"Skipping transaction with an unresolvable output", error=str(e))
+                continue
+            txn_id = tx.tx_id
 
             *_, in_total_amount, out_total_amount = self.process_in_memory_txn_for_indexing(tx)
 
+        self.cache_block(block, cached_prevouts)
+
         challenge = Challenge(model_kind=MODEL_KIND_MONEY_FLOW,
                               in_total_amount=in_total_amount,
                               out_total_amount=out_total_amount,
@@ -372,9 +382,10 @@ class ChallengeBitcoinNode(BitcoinNode):
 
         logger.info(f"Creating balance tracking challenge", block_height=block_height)
 
-        block = self.get_block_by_height(block_height)
-        block_data = parse_block_data(block)
+        block_data, cached_prevouts = self.get_parsed_block(block_height)
         transactions = block_data.transactions
+        self.prefetch_txouts(transactions)
+        self.cache_block(block_data, cached_prevouts)
 
         balance_changes_by_address = {}
         changed_addresses = []
@@ -0,0 +1,155 @@
+import base64
+import http.client
+import json
+import queue
+import threading
+from decimal import Decimal
+from urllib.parse import urlparse
+
+from loguru import logger
+
+
+class RpcError(Exception):
+    def __init__(self, error: dict):
+        self.error = error
+        super().__init__(f"RPC error {error.get('code')}: {error.get('message')}")
+
+
+class BitcoinRpcClient:
+    """
+    Keep-alive JSON-RPC client for bitcoind.
+
+    Connections are kept in a bounded pool and reused between calls, large batches are split into
+    chunks of `batch_size` commands, and a request that fails on a stale or broken socket is retried
+    on a fresh connection.
+    """
+
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    RETRYABLE_ERRORS = (
+        http.client.RemoteDisconnected,
+        http.client.CannotSendRequest,
+        http.client.ResponseNotReady,
+        http.client.BadStatusLine,
+        ConnectionResetError,
+        ConnectionAbortedError,
+        BrokenPipeError,
+    )
+
+    def __init__(self, service_url: str, pool_size: int = 8, batch_size: int = 1000, timeout: int = 60, max_retries: int = 2):
+        url = urlparse(service_url)
+        self.host = url.hostname
+        self.port = url.port or 8332
+        self.path = url.path or "/"
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.headers = {
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        if url.username is not None:
+            auth = base64.b64encode(f"{url.username}:{url.password or ''}".encode()).decode()
+            self.headers["Authorization"] = f"Basic {auth}"
+
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    @classmethod
+    def for_url(cls, service_url: str, **kwargs) -> "BitcoinRpcClient":
+        """Returns the process wide client for `service_url`, creating it on first use."""
+        with cls._clients_lock:
+            client = cls._clients.get(service_url)
+            if client is None:
+                client = cls(service_url, **kwargs)
+                cls._clients[service_url] = client
+            return client
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        self._slots.acquire()
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection, reuse: bool = True):
+        if reuse:
+            self._pool.put_nowait(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def _post(self, payload):
+        body = json.dumps(payload)
+        for attempt in range(self.max_retries + 1):
+            conn = self._acquire()
+            try:
+                conn.request("POST", self.path, body, self.headers)
+                response = conn.getresponse()
+                data = response.read()
+            except self.RETRYABLE_ERRORS as e:
+                self._release(conn, reuse=False)
+                if attempt == self.max_retries:
+                    raise
+                logger.debug("Retrying RPC request on a new connection", error=str(e), attempt=attempt + 1)
+                continue
+            except Exception:
+                self._release(conn, reuse=False)
+                raise
+
+            self._release(conn, reuse=not response.will_close)
+
+            if response.status == 401:
+                raise RpcError({"code": 401, "message": "Authorization failed: incorrect rpcuser or rpcpassword"})
+            if not data:
+                raise RpcError({"code": response.status, "message": f"Empty response, HTTP status {response.status}"})
+            return json.loads(data.decode(), parse_float=Decimal)
+
+    def call(self, method: str, *params):
+        result = self._post({
+            "method": method,
+            "params": list(params),
+            "jsonrpc": "2.0",
+            "id": 0,
+        })
+        if result.get("error") is not None:
+            raise RpcError(result["error"])
+        return result["result"]
+
+    def batch_request(self, commands):
+        results = []
+        for start in range(0, len(commands), self.batch_size):
+            chunk = commands[start:start + self.batch_size]
+            batch = []
+            for i, cmd in enumerate(chunk):
+                method, *params = cmd
+                batch.append({
+                    "method": method,
+                    "params": params,
+                    "jsonrpc": "2.0",
+                    "id": i,
+                })
+
+            response = self._post(batch)
+            if not isinstance(response, list):
+                if response.get("error"):
+                    raise Exception(f"Error in batch request: {response['error']}")
+                results.append(response.get("result"))
+                continue
+
+            # bitcoind does not guarantee the order of batch responses
+            response.sort(key=lambda r: r["id"])
+            for r in response:
+                if r.get("error") is not None:
+                    raise Exception(f"Error in command {start + r['id']}: {r['error']}")
+                results.append(r["result"])
+
+        return results
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from src.subnet.validator.single_flight import SingleFlight
+from src.subnet.validator.helpers import json_default
+
+QUERY_CACHE_PREFIX = 'query_cache'
+QUERY_CACHE_METRICS = 'query_cache:metrics'
+
+
+class QueryResultCache:
+    """
+    Redis cache of agreed miner query results, keyed by (network, model_kind, query_hash).
+
+    Non-empty results for blocks at least `finality_depth` below the chain tip are kept for `finalized_ttl` seconds,
+    everything else (tip-adjacent blocks, address and balance queries, empty results) for `tip_ttl` seconds.
+    The tip is the node's block count, read through `chain_height(network)` at most every `tip_refresh_interval`
+    seconds, queried block heights never move it. Without `chain_height` every result gets `tip_ttl`.
+    Concurrent misses for the same key share a single computation through `single_flight`.
+    """
+
+    def __init__(self, redis_client, finalized_ttl: int = 86400, tip_ttl: int = 30, finality_depth: int = 6,
+                 single_flight: Optional[SingleFlight] = None,
+                 chain_height: Optional[Callable[[str], Optional[int]]] = None, tip_refresh_interval: float = 30.0):
+        self.redis_client = redis_client
+        self.finalized_ttl = finalized_ttl
+        self.tip_ttl = tip_ttl
+        self.finality_depth = finality_depth
+        self.chain_height = chain_height
+        self.tip_refresh_interval = tip_refresh_interval
+        self.tips: Dict[str, int] = {}
+        self.tips_refreshed_at: Dict[str, float] = {}
+        self.single_flight = single_flight or SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(network: str, model_kind: str, query_hash: str) -> str:
+        return f"{QUERY_CACHE_PREFIX}:{network}:{model_kind}:{query_hash}"
+
+    def observe_chain_height(self, network: str, chain_height: int):
+        self.tips[network] = chain_height
+        self.tips_refreshed_at[network] = time.monotonic()
+
+    async def refresh_tip(self, network: str):
+        """Reads the chain tip of `network` if it is older than `tip_refresh_interval`, on a worker thread as node calls block."""
+        if self.chain_height is None:
+            return
+        refreshed_at = self.tips_refreshed_at.get(network)
+        if refreshed_at is not None and time.monotonic() - refreshed_at < self.tip_refresh_interval:
+            return
+        self.tips_refreshed_at[network] = time.monotonic()
+        try:
+            chain_height = await asyncio.to_thread(self.chain_height, network)
+        except Exception as e:
+            logger.warning("Query cache chain height read failed", error=e, network=network)
+            return
+        if chain_height is not None:
+            self.observe_chain_height(network, chain_height)
+
+    @staticmethod
+    def is_empty(response: Any) -> bool:
+        if isinstance(response, dict):
+            return all(not value for value in response.values())
+        return not response
+
+    def ttl_for(self, network: str, block_height: Optional[int], response: Any = None) -> int:
+        if block_height is None or network not in self.tips or self.is_empty(response):
+            return self.tip_ttl
+        # heights above the tip aren't mined yet, their results change once they are
+        if block_height <= self.tips[network] - self.finality_depth:
+            return self.finalized_ttl
+        return self.tip_ttl
+
+    async def get(self, network: str, model_kind: str, query_hash: str) -> Optional[dict]:
+        try:
+            cached = await self.redis_client.get(self.key(network, model_kind, query_hash))
+        except Exception as e:
+            logger.warning("Query cache read failed", error=e, network=network, model_kind=model_kind)
+            return None
+        return json.loads(cached) if cached else None
+
+    async def set(self, network: str, model_kind: str, query_hash: str, result: dict, block_height: Optional[int] = None):
+        if block_height is not None:
+            await self.refresh_tip(network)
+        try:
+            await self.redis_client.set(
+                self.key(network, model_kind, query_hash),
+                json.dumps(result, default=json_default),
+                ex=self.ttl_for(network, block_height, result.get("response"))
+            )
+        except Exception as e:
+            logger.warning("Query cache write failed", error=e, network=network, model_kind=model_kind)
+
+    async def get_or_compute(self, network: str, model_kind: str, query_hash: str,
+                             compute: Callable[[], Awaitable[dict]], block_height: Optional[int] = None,
+                             on_reuse: Optional[Callable[[dict], Awaitable[None]]] = None) -> dict:
+        """
+        Returns the cached result or computes it, only results with a response are stored.
+        `on_reuse(result)` is awaited for results this call did not compute, cache hits and coalesced results.
+        """
+        cached = await self.get(network, model_kind, query_hash)
+        if cached is not None:
+            self.hits += 1
+            await self._record("hits")
+            if on_reuse is not None:
+                await on_reuse(cached)
+            return cached
+
+        async def compute_and_store():
+            result = await compute()
+            if result and result.get("response") is not None:
+                await self.set(network, model_kind, query_hash, result, block_height)
+            return result
+
+        result, shared = await self.single_flight.do(self.key(network, model_kind, query_hash), compute_and_store)
+        if shared:
+            self.coalesced += 1
+            await self._record("coalesced")
+            if on_reuse is not None:
+                await on_reuse(result)
+        else:
+            self.misses += 1
+            await self._record("misses")
+        return result
+
+    async def _record(self, field: str):
+        try:
+            await self.redis_client.hincrby(QUERY_CACHE_METRICS, field, 1)
+        except Exception as e:
+            logger.warning("Query cache metrics update failed", error=e)
+
+    @staticmethod
+    def _stats(hits: int, misses: int, coalesced: int) -> dict:
+        lookups = hits + misses + coalesced
+        return {
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_rate": round((hits + coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+    def stats(self) -> dict:
+        """Lookups served by this process."""
+        return self._stats(self.hits, self.misses, self.coalesced)
+
+    async def metrics(self) -> dict:
+        """Lookups served by every gateway worker sharing the redis instance."""
+        counters = await self.redis_client.hgetall(QUERY_CACHE_METRICS)
+        counters = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in counters.items()}
+        return self._stats(counters.get("hits", 0), counters.get("misses", 0), counters.get("coalesced", 0))
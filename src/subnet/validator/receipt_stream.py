@@ -0,0 +1,82 @@
+import json
+import zlib
+from typing import AsyncIterator, Dict, Iterator, List
+from src.subnet.validator.helpers import json_default
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def supported_encodings() -> List[str]:
+    encodings = ["gzip", "identity"]
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    return encodings
+
+
+class _IdentityCodec:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+def _compressor(encoding: str):
+    if encoding == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    if encoding == "identity":
+        return _IdentityCodec()
+    raise ValueError(f"Unsupported receipt stream encoding: {encoding}")
+
+
+def _decompressor(encoding: str):
+    if encoding == "gzip":
+        return zlib.decompressobj(31)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    if encoding == "identity":
+        return _IdentityCodec()
+    raise ValueError(f"Unsupported receipt stream encoding: {encoding}")
+
+
+async def encode_receipt_stream(chunks: AsyncIterator[List[Dict]], encoding: str = "gzip") -> AsyncIterator[bytes]:
+    """
+    Encodes chunks of receipt rows as compressed NDJSON, one receipt per line.
+
+    The compressor is flushed after every chunk so the receiving side can decode and store it before the next one arrives.
+    """
+    compressor = _compressor(encoding)
+    async for chunk in chunks:
+        lines = b"".join(json.dumps(row, default=json_default, separators=(",", ":")).encode() + b"\n" for row in chunk)
+        if encoding == "gzip":
+            yield compressor.compress(lines) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        elif encoding == "zstd":
+            yield compressor.compress(lines) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        else:
+            yield lines
+    yield compressor.flush()
+
+
+class ReceiptStreamDecoder:
+    """Incrementally decodes a compressed NDJSON receipt stream, keeping only the unfinished trailing line buffered."""
+
+    def __init__(self, encoding: str = "gzip"):
+        self.decompressor = _decompressor(encoding)
+        self.pending = b""
+
+    def feed(self, data: bytes) -> Iterator[Dict]:
+        self.pending += self.decompressor.decompress(data)
+        *lines, self.pending = self.pending.split(b"\n")
+        for line in lines:
+            if line:
+                yield json.loads(line)
@@ -8,6 +8,8 @@ from loguru import logger
 from substrateinterface import Keypair
 from communex.client import CommuneClient
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
+from src.subnet.validator.signature_verifier import SignatureVerifier
+from src.subnet.validator.receipt_stream import ReceiptStreamDecoder, supported_encodings
 
 
 class ReceiptSyncWorker:
@@ -16,17 +18,26 @@ class ReceiptSyncWorker:
             keypair: Keypair,
             netuid: int,
             client: CommuneClient,
-            miner_receipt_manager: MinerReceiptManager
+            miner_receipt_manager: MinerReceiptManager,
+            signature_verifier: Optional[SignatureVerifier] = None
     ):
         self.keypair = keypair
         self.netuid = netuid
         self.client = client
         self.miner_receipt_manager = miner_receipt_manager
+        self.signature_verifier = signature_verifier or SignatureVerifier.get_instance()
         self.key_to_gateway_urls: Dict[str, str] = {}
         self.DEFAULT_TIMESTAMP = "2024-11-01T00:00:00Z"
         self.REQUEST_TIMEOUT = 30  # seconds
         self.MAX_CONCURRENT_REQUESTS = 10  # Limit concurrent requests
+        self.PAGE_SIZE = 1000
+        self.STREAM_ENCODINGS = supported_encodings()  # preferred first
+        self.STREAM_CHUNK_SIZE = 1000
+        self.STREAM_READ_SIZE = 64 * 1024
+        self.sync_cursors: Dict[str, Tuple[str, int]] = {}  # validator_key -> last committed (timestamp, id)
+        self.stream_encodings: Dict[str, str] = {}  # gateway_url -> encoding the gateway accepted
         self._session: Optional[aiohttp.ClientSession] = None
+        self._stream_session: Optional[aiohttp.ClientSession] = None
 
     @property
     async def session(self) -> aiohttp.ClientSession:
@@ -35,11 +46,21 @@ class ReceiptSyncWorker:
             self._session = aiohttp.ClientSession()
         return self._session
 
+    @property
+    async def stream_session(self) -> aiohttp.ClientSession:
+        """Session for the receipt stream, the body is decompressed incrementally by ReceiptStreamDecoder."""
+        if self._stream_session is None or self._stream_session.closed:
+            self._stream_session = aiohttp.ClientSession(auto_decompress=False)
+        return self._stream_session
+
     async def cleanup(self):
         """Cleanup resources - should be called when done with the worker."""
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
+        if self._stream_session and not self._stream_session.closed:
+            await self._stream_session.close()
+            self._stream_session = None
 
     @staticmethod
     def _get_uid_gateway_url_pairs(
@@ -88,8 +109,9 @@ class ReceiptSyncWorker:
             ss58_to_metadata, uid_to_key, uid_to_incentive, uid_to_dividend
         ))
 
-    def validate_receipt_signatures(self, receipts: List[dict]) -> bool:
+    async def validate_receipt_signatures(self, receipts: List[dict]) -> bool:
         """Validate signatures for a batch of receipts."""
+        signed_receipts = []
         for receipt in receipts:
             missing_fields = []
             for field in ["result_hash_signature", "result_hash", "miner_key"]:
@@ -97,19 +119,16 @@ class ReceiptSyncWorker:
                     logger.warning(f"{field} is missing in receipt: {receipt}")
                     missing_fields.append(field)
 
-            if missing_fields:
-                continue
+            if not missing_fields:
+                signed_receipts.append(receipt)
 
-            try:
-                keypair = Keypair(ss58_address=receipt["miner_key"])
-                if not keypair.verify(
-                        receipt["result_hash"].encode('utf-8'),
-                        bytes.fromhex(receipt["result_hash_signature"])
-                ):
-                    logger.warning(f"Invalid signature in receipt: {receipt}")
-                    return False
-            except Exception as e:
-                logger.error(f"Error validating receipt signature: {e}")
+        results = await self.signature_verifier.verify_many([
+            (receipt["miner_key"], receipt["result_hash"], receipt["result_hash_signature"])
+            for receipt in signed_receipts
+        ])
+        for receipt, valid in zip(signed_receipts, results):
+            if not valid:
+                logger.warning(f"Invalid signature in receipt: {receipt}")
                 return False
         return True
 
@@ -120,7 +139,7 @@ class ReceiptSyncWorker:
             if receipts is None or receipts == []:
                 logger.info(f"No receipts found in response from {gateway_url}")
                 return False
-            if not self.validate_receipt_signatures(receipts):
+            if not await self.validate_receipt_signatures(receipts):
                 return False
             await self.miner_receipt_manager.sync_miner_receipts(receipts)
             return True
@@ -132,7 +151,8 @@ class ReceiptSyncWorker:
             self,
             gateway_url: str,
             timestamp: str,
-            page: int = 1
+            page: int = 1,
+            after_id: Optional[int] = None
     ) -> Optional[dict]:
         """Fetch a single page of receipts with error handling."""
 
@@ -148,6 +168,9 @@ class ReceiptSyncWorker:
         }
         if page > 1:
             params["page"] = page
+        if after_id is not None:
+            params["after_id"] = after_id
+            params["page_size"] = self.PAGE_SIZE
 
         try:
             session = await self.session
@@ -172,40 +195,134 @@ class ReceiptSyncWorker:
             logger.error(f"Error fetching from {gateway_url}: {e}")
             return None
 
-    async def sync_single_gateway(self, validator_key: str, gateway_url: str):
-        """Synchronize receipts from a single gateway."""
-        timestamp_result = await self.miner_receipt_manager.get_last_receipt_timestamp_for_validator_key(validator_key)
-        if not timestamp_result:
-            logger.warning(f"Failed to get timestamp for {validator_key}")
-            return
+    async def store_receipt_chunk(self, validator_key: str, receipts: List[dict]) -> bool:
+        """Verifies and stores one chunk of streamed receipts, then advances the gateway cursor past it."""
+        last_receipt = receipts[-1]
+        cursor = (last_receipt["timestamp"], last_receipt["id"])
+        if not await self.validate_receipt_signatures(receipts):
+            return False
+        await self.miner_receipt_manager.sync_miner_receipts(receipts)
+        self.sync_cursors[validator_key] = cursor
+        return True
 
-        timestamp = timestamp_result['timestamp'] or self.DEFAULT_TIMESTAMP
-        first_page_result = await self.fetch_page(gateway_url, timestamp)
+    async def stream_gateway(self, validator_key: str, gateway_url: str, cursor: Tuple[str, int]) -> bool:
+        """
+        Reads every receipt after `cursor` from the gateway's compressed NDJSON stream.
 
-        if not first_page_result:
-            return
+        At most one chunk is decoded while the previous one is being stored, so memory stays flat whatever the backlog.
+        Encodings the gateway rejects are skipped in order of preference.
+        Returns False if the gateway does not serve the stream endpoint or none of the encodings.
+        """
+        timestamp, after_id = cursor
+        params = {
+            "validator_key": self.keypair.ss58_address,
+            "validator_signature": self.keypair.sign(timestamp.encode('utf-8')).hex(),
+            "timestamp": timestamp,
+            "after_id": after_id,
+            "chunk_size": self.STREAM_CHUNK_SIZE,
+        }
 
-        if not await self.process_page_receipts(first_page_result, gateway_url):
-            return
+        accepted = self.stream_encodings.get(gateway_url)
+        encodings = [accepted] if accepted else self.STREAM_ENCODINGS
+        session = await self.stream_session
+        for encoding in encodings:
+            async with session.get(
+                    f"{gateway_url}/v1/miner/receipts/stream",
+                    params={**params, "encoding": encoding},
+                    timeout=aiohttp.ClientTimeout(total=None, sock_read=self.REQUEST_TIMEOUT)
+            ) as response:
+                if response.status in (404, 405):
+                    return False
+                if response.status == 400:
+                    logger.debug(f"Gateway {gateway_url} rejected receipt stream encoding {encoding}")
+                    self.stream_encodings.pop(gateway_url, None)
+                    continue
+                if response.status != 200:
+                    logger.warning(f"Failed to stream receipts from {gateway_url}, status: {response.status}")
+                    return True
 
-        # Process remaining pages concurrently with rate limiting
-        total_pages = first_page_result.get("total_pages", 1)
-        if total_pages > 1:
-            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+                self.stream_encodings[gateway_url] = encoding
+                await self.read_stream(validator_key, response)
+                return True
+        return False
 
-            async def fetch_and_process_page(page: int):
-                async with semaphore:
-                    result = await self.fetch_page(
-                        gateway_url, timestamp, page
-                    )
-                    if result:
-                        await self.process_page_receipts(result, gateway_url)
+    async def read_stream(self, validator_key: str, response: aiohttp.ClientResponse):
+        """Decodes the receipt stream and stores it chunk by chunk, stopping at the first chunk that isn't stored."""
+        decoder = ReceiptStreamDecoder(response.headers.get("Content-Encoding", "identity"))
+        chunk = []
+        pending_store = None
+        try:
+            async for data in response.content.iter_chunked(self.STREAM_READ_SIZE):
+                for receipt in decoder.feed(data):
+                    chunk.append(receipt)
+                    if len(chunk) < self.STREAM_CHUNK_SIZE:
+                        continue
+                    if pending_store is not None and not await pending_store:
+                        return
+                    pending_store = asyncio.create_task(self.store_receipt_chunk(validator_key, chunk))
+                    chunk = []
 
-            tasks = [
-                fetch_and_process_page(page)
-                for page in range(2, total_pages + 1)
-            ]
-            await asyncio.gather(*tasks)
+            if pending_store is not None and not await pending_store:
+                return
+            pending_store = None
+            if chunk:
+                await self.store_receipt_chunk(validator_key, chunk)
+        finally:
+            if pending_store is not None and not pending_store.done():
+                pending_store.cancel()
+
+    async def sync_gateway_pages(self, validator_key: str, gateway_url: str, cursor: Tuple[str, int]):
+        """
+        Walks the gateway's paged (timestamp, id) cursor, for gateways without the receipt stream.
+
+        Pages are read one after another, the next page is fetched while the current one is being stored,
+        and the cursor only advances once a page has been committed.
+        """
+        next_page = asyncio.create_task(self.fetch_page(gateway_url, cursor[0], after_id=cursor[1]))
+        try:
+            while next_page is not None:
+                page_result = await next_page
+                next_page = None
+                if not page_result:
+                    return
+
+                next_cursor = page_result.get("next_cursor")
+                if next_cursor:
+                    next_page = asyncio.create_task(self.fetch_page(gateway_url, next_cursor["timestamp"], after_id=next_cursor["id"]))
+
+                receipts = page_result.get("data") or []
+                last_receipt = receipts[-1] if receipts else {}
+                page_cursor = (last_receipt.get("timestamp"), last_receipt.get("id"))
+                if not await self.process_page_receipts(page_result, gateway_url):
+                    return
+
+                if "next_cursor" not in page_result:
+                    # gateway without cursor support, the rest is picked up on the next run from the last stored timestamp
+                    return
+
+                if page_cursor[1] is not None:
+                    self.sync_cursors[validator_key] = page_cursor
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def sync_single_gateway(self, validator_key: str, gateway_url: str):
+        """Synchronize receipts from a single gateway, resuming from the last committed (timestamp, id) cursor."""
+        cursor = self.sync_cursors.get(validator_key)
+        if cursor is None:
+            timestamp_result = await self.miner_receipt_manager.get_last_receipt_timestamp_for_validator_key(validator_key)
+            timestamp = (timestamp_result or {}).get('timestamp') or self.DEFAULT_TIMESTAMP
+            # id 0 sorts before every receipt, so receipts sharing the last timestamp are read again and deduplicated on insert
+            cursor = (timestamp, 0)
+
+        try:
+            if await self.stream_gateway(validator_key, gateway_url, cursor):
+                return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error streaming receipts from {gateway_url}: {e}")
+            return
+
+        await self.sync_gateway_pages(validator_key, gateway_url, self.sync_cursors.get(validator_key, cursor))
 
     async def sync_key_to_gateway_urls(self):
         try:
@@ -224,6 +341,7 @@ class ReceiptSyncWorker:
                 for validator_key, gateway_url in self.key_to_gateway_urls.items()
             ]
             await asyncio.gather(*tasks)
+            logger.info("Receipt signatures verified", validator_key=self.keypair.ss58_address, **self.signature_verifier.stats())
 
         except Exception as e:
             logger.error(f"Error during receipt synchronization", error=e, tb=traceback.format_exc(), validator_key=self.keypair.ss58_address)
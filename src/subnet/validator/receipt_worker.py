@@ -1,19 +1,153 @@
 import json
+import time
 from aioredis import Redis
 import asyncio
 import threading
 import traceback
 from loguru import logger
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
 from src.subnet.validator.database.session_manager import DatabaseSessionManager
 
+RECEIPTS_QUEUE = 'receipts'
+RECEIPTS_CONSUMER_METRICS = 'receipts:consumer_metrics'
+RECEIPTS_DEAD_LETTER = 'receipts:dead_letter'
+
+# the database can't be reached, as opposed to a receipt the database rejects
+CONNECTION_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+
+def is_connection_error(error: Exception) -> bool:
+    return isinstance(error, CONNECTION_ERRORS) or (isinstance(error, DBAPIError) and error.connection_invalidated)
+
+
+class ReceiptBatchConsumer:
+    """
+    Drains the redis receipt queue in batches and stores each batch with one multi-row insert.
+
+    A batch is flushed once it holds `batch_size` receipts or its oldest receipt has waited `flush_interval` seconds.
+    A batch the database rejects is bisected down to the rejected receipts, which go to the dead-letter list,
+    a batch that fails because the database can't be reached goes back to the queue.
+    """
+
+    def __init__(self, redis_client: Redis, miner_receipt_manager: MinerReceiptManager, batch_size: int = 500, flush_interval: float = 1.0):
+        self.redis_client = redis_client
+        self.miner_receipt_manager = miner_receipt_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.buffer_started_at = None
+
+        self.started_at = time.monotonic()
+        self.inserted_total = 0
+        self.flushes_total = 0
+        self.dead_lettered_total = 0
+        self.queue_depth = 0
+        self.last_insert_rate = 0.0
+
+    async def poll(self, timeout: int = 1):
+        """Moves up to the free buffer space from the queue into the buffer, blocking for at most `timeout` seconds when idle."""
+        if not self.buffer:
+            message = await self.redis_client.brpop(RECEIPTS_QUEUE, timeout=timeout)
+            if not message:
+                return
+            self.buffer.append(message[1])
+            self.buffer_started_at = time.monotonic()
+
+        free = self.batch_size - len(self.buffer)
+        if free <= 0:
+            return
+
+        items = await self.redis_client.rpop(RECEIPTS_QUEUE, free)
+        if items:
+            self.buffer.extend(items)
+        elif not self.should_flush():
+            # queue is drained, wait a bit for more receipts before flushing a partial batch
+            await asyncio.sleep(min(0.05, self.flush_interval))
+
+    def should_flush(self) -> bool:
+        if not self.buffer:
+            return False
+        if len(self.buffer) >= self.batch_size:
+            return True
+        return time.monotonic() - self.buffer_started_at >= self.flush_interval
+
+    async def flush(self):
+        if not self.buffer:
+            return
+
+        raw_receipts, self.buffer, self.buffer_started_at = self.buffer, [], None
+
+        parsed = []
+        for raw_receipt in raw_receipts:
+            try:
+                parsed.append((raw_receipt, json.loads(raw_receipt)))
+            except (json.JSONDecodeError, TypeError) as e:
+                await self.dead_letter(raw_receipt, e)
+
+        start_time = time.monotonic()
+        try:
+            stored = await self.store(parsed)
+        except Exception:
+            # put the parsed receipts back at the consuming end of the queue, oldest receipt last,
+            # receipts stored before the failure are skipped on the next insert by the (miner_key, request_id) constraint
+            if parsed:
+                await self.redis_client.rpush(RECEIPTS_QUEUE, *reversed([raw_receipt for raw_receipt, _ in parsed]))
+            raise
+
+        elapsed = time.monotonic() - start_time
+        self.inserted_total += stored
+        self.flushes_total += 1
+        self.last_insert_rate = stored / elapsed if elapsed > 0 else 0.0
+        await self.publish_metrics()
+
+    async def store(self, parsed) -> int:
+        """Stores (raw, receipt) pairs, bisecting a rejected batch to dead-letter the rejected receipts. Returns the stored count."""
+        if not parsed:
+            return 0
+        try:
+            await self.miner_receipt_manager.sync_miner_receipts([receipt for _, receipt in parsed])
+            return len(parsed)
+        except Exception as e:
+            if is_connection_error(e):
+                raise
+            if len(parsed) == 1:
+                await self.dead_letter(parsed[0][0], e)
+                return 0
+        middle = len(parsed) // 2
+        return await self.store(parsed[:middle]) + await self.store(parsed[middle:])
+
+    async def dead_letter(self, raw_receipt, error: Exception):
+        logger.error("Moving rejected receipt to the dead-letter list", error=error, receipt=raw_receipt)
+        await self.redis_client.lpush(RECEIPTS_DEAD_LETTER, raw_receipt)
+        self.dead_lettered_total += 1
+
+    async def publish_metrics(self):
+        self.queue_depth = await self.redis_client.llen(RECEIPTS_QUEUE)
+        metrics = self.metrics()
+        await self.redis_client.hset(RECEIPTS_CONSUMER_METRICS, mapping={k: str(v) for k, v in metrics.items()})
+        logger.debug("Receipt batch stored", **metrics)
+
+    def metrics(self) -> dict:
+        uptime = time.monotonic() - self.started_at
+        return {
+            "queue_depth": self.queue_depth,
+            "inserted_total": self.inserted_total,
+            "flushes_total": self.flushes_total,
+            "dead_lettered_total": self.dead_lettered_total,
+            "last_insert_rate": round(self.last_insert_rate, 2),
+            "avg_insert_rate": round(self.inserted_total / uptime, 2) if uptime > 0 else 0.0,
+        }
+
 
 class ReceiptConsumerThread(threading.Thread):
-    def __init__(self, keypair, settings, terminate_event, *args, **kwargs):
+    def __init__(self, keypair, settings, terminate_event, batch_size: int = 500, flush_interval: float = 1.0, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.keypair = keypair
         self.settings = settings
         self.terminate_event = terminate_event
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
 
     async def main(self):
 
@@ -22,23 +156,29 @@ class ReceiptConsumerThread(threading.Thread):
         miner_receipt_manager = MinerReceiptManager(session_manager)
 
         redis_client = Redis.from_url(self.settings.REDIS_URL)
+        consumer = ReceiptBatchConsumer(redis_client, miner_receipt_manager, self.batch_size, self.flush_interval)
 
         try:
             logger.info("Starting receipt consumer", validator_key=self.keypair.ss58_address)
 
             while not self.terminate_event.is_set():
-                message = await redis_client.brpop('receipts', timeout=5)
-                if message:
-                    _, receipt_json = message
-                    receipt = json.loads(receipt_json)
-                    await miner_receipt_manager.store_miner_receipt(**receipt)
-                    logger.info("Receipt processed", validator_key=self.keypair.ss58_address)
+                try:
+                    await consumer.poll(timeout=1)
+                    if consumer.should_flush():
+                        await consumer.flush()
+                except Exception as e:
+                    tb = traceback.format_exc()
+                    logger.error("Error occurred while processing receipts.", error=e, traceback=tb, validator_key=self.keypair.ss58_address)
+                    await asyncio.sleep(1)
+
+            await consumer.flush()
 
         except Exception as e:
             tb = traceback.format_exc()
             logger.error("Error occurred while processing receipt.", error=e, traceback=tb, validator_key=self.keypair.ss58_address)
         finally:
             await redis_client.close()
+            await session_manager.close()
 
     def run(self):
         loop = asyncio.new_event_loop()
@@ -46,4 +186,4 @@ class ReceiptConsumerThread(threading.Thread):
         try:
             loop.run_until_complete(self.main())
         finally:
-            loop.close()
\ No newline at end of file
+            loop.close()
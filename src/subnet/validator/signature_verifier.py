@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+from substrateinterface import Keypair
+
+# (ss58_address, message, signature hex)
+SignatureItem = Tuple[str, Union[str, bytes], str]
+
+
+@lru_cache(maxsize=8192)
+def _keypair(ss58_address: str) -> Keypair:
+    return Keypair(ss58_address=ss58_address)
+
+
+def _verify_batch(items: List[SignatureItem]) -> List[bool]:
+    """Runs in the pool workers, each worker process keeps its own keypair cache."""
+    results = []
+    for ss58_address, message, signature in items:
+        try:
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            results.append(bool(_keypair(ss58_address).verify(message, bytes.fromhex(signature))))
+        except Exception:
+            results.append(False)
+    return results
+
+
+class SignatureVerifier:
+    """
+    Verifies sr25519 signatures in batches on a process pool, so large receipt syncs don't block the event loop.
+    A single signature is verified inline, a round trip to the pool costs more than the verification.
+    With `max_workers=0` batches are verified inline too.
+
+    Workers are spawned rather than forked, a forked worker would inherit the gateway's and validator's threads,
+    event loop and open connections.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: Optional[int] = None, batch_size: int = 256):
+        self.max_workers = max(1, os.cpu_count() or 1) if max_workers is None else max_workers
+        self.batch_size = batch_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.verifications = 0
+        self.busy_time = 0.0
+
+    @classmethod
+    def get_instance(cls, max_workers: Optional[int] = None, batch_size: int = 256) -> "SignatureVerifier":
+        """Process-wide verifier, the arguments only apply to the first call."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(max_workers, batch_size)
+        return cls._instance
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def verify(self, ss58_address: str, message: Union[str, bytes], signature: str) -> bool:
+        return (await self.verify_many([(ss58_address, message, signature)]))[0]
+
+    async def verify_many(self, items: List[SignatureItem]) -> List[bool]:
+        if not items:
+            return []
+
+        start_time = time.monotonic()
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        if self.max_workers == 0 or len(items) == 1:
+            results = [_verify_batch(batch) for batch in batches]
+        else:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*[loop.run_in_executor(self.executor, _verify_batch, batch) for batch in batches])
+
+        with self._stats_lock:
+            self.verifications += len(items)
+            self.busy_time += time.monotonic() - start_time
+        return [result for batch in results for result in batch]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "verifications": self.verifications,
+                "verifications_per_second": round(self.verifications / self.busy_time, 2) if self.busy_time > 0 else 0.0,
+            }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
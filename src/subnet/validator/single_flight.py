@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from loguru import logger
+from src.subnet.validator.helpers import json_default
+
+SINGLE_FLIGHT_PREFIX = 'single_flight'
+
+# compare-and-delete, so a leader never releases a lock that expired and was taken by someone else
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    Within a process, the first caller starts the execution in a task no caller owns, and every caller awaits it
+    through `asyncio.shield`, so a cancelled caller leaves the execution running for the others. With a redis client,
+    the first process to take `single_flight:lock:{key}` executes, the others wait for the result it publishes under
+    `single_flight:result:{key}` for `result_ttl` seconds, and execute themselves if the leader disappears.
+    """
+
+    def __init__(self, redis_client=None, lock_ttl: float = 60.0, result_ttl: float = 2.0, poll_interval: float = 0.05):
+        self.redis_client = redis_client
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_remote = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, shared), `shared` is True if the result came from another caller's execution."""
+        in_flight = self.in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            result, _ = await asyncio.shield(in_flight)
+            return result, True
+
+        if self.redis_client is None:
+            execution = self._execute_local(fn)
+        else:
+            execution = self._do_with_lock(key, fn)
+        task = asyncio.get_running_loop().create_task(execution)
+        self.in_flight[key] = task
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _execute_local(self, fn) -> Tuple[Any, bool]:
+        return await self._execute(fn), False
+
+    async def _execute(self, fn):
+        self.executions += 1
+        return await fn()
+
+    async def _do_with_lock(self, key: str, fn) -> Tuple[Any, bool]:
+        lock_key = f"{SINGLE_FLIGHT_PREFIX}:lock:{key}"
+        result_key = f"{SINGLE_FLIGHT_PREFIX}:result:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.warning("Single flight lock failed, executing locally", error=e, key=key)
+            return await self._execute(fn), False
+
+        if acquired:
+            try:
+                result = await self._execute(fn)
+                try:
+                    await self.redis_client.set(result_key, json.dumps(result, default=json_default), px=int(self.result_ttl * 1000))
+                except Exception as e:
+                    logger.warning("Single flight result publish failed", error=e, key=key)
+                return result, False
+            finally:
+                try:
+                    await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning("Single flight unlock failed", error=e, key=key)
+
+        deadline = time.monotonic() + self.lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                published = await self.redis_client.get(result_key)
+                if published is not None:
+                    self.coalesced_remote += 1
+                    return json.loads(published), True
+                if not await self.redis_client.exists(lock_key):
+                    published = await self.redis_client.get(result_key)
+                    if published is not None:
+                        self.coalesced_remote += 1
+                        return json.loads(published), True
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.warning("Single flight wait failed, executing locally", error=e, key=key)
+
+        # the leader failed or timed out without publishing a result
+        return await self._execute(fn), False
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_remote": self.coalesced_remote,
+        }
@@ -5,14 +5,12 @@ import time
 import traceback
 import uuid
 from datetime import datetime
-from random import sample
 from typing import cast, Dict, Optional
 
 from aioredis import Redis
 from communex.client import CommuneClient  # type: ignore
 from communex.errors import NetworkTimeoutError
 from communex.misc import get_map_modules
-from communex.module.client import ModuleClient  # type: ignore
 from communex.module.module import Module  # type: ignore
 from communex.types import Ss58Address  # type: ignore
 from loguru import logger
@@ -22,14 +20,22 @@ from ._config import ValidatorSettings, load_base_weights
 from .database.models.challenge_balance_tracking import ChallengeBalanceTrackingManager
 from .database.models.challenge_money_flow import ChallengeMoneyFlowManager
 from src.subnet.encryption import generate_hash
+from .challenges.challenge_pool import ChallengePool
 from .helpers import raise_exception_if_not_registered, get_ip_port, cut_to_max_allowed_weights
+from .miner_client import MinerClientRegistry
+from .miner_selector import MinerSelector
+from .query_cache import QueryResultCache
+from .signature_verifier import SignatureVerifier
+from .single_flight import SingleFlight
 from .weights_storage import WeightsStorage
 from src.subnet.validator.database.models.miner_discovery import MinerDiscoveryManager
 from src.subnet.validator.database.models.miner_receipt import MinerReceiptManager
 from src.subnet.protocol import Challenge, ChallengesResponse, ChallengeMinerResponse, Discovery, \
-    MODEL_KIND_BALANCE_TRACKING
+    MODEL_KIND_BALANCE_TRACKING, get_networks
 from .. import VERSION
 
+# the receipt a fan-out pushed, kept with its result so cached and coalesced results can be receipted again
+REUSED_RECEIPT_KEY = "_receipt"
 
 class Validator(Module):
 
@@ -46,6 +52,11 @@ class Validator(Module):
             redis_client: Redis,
             query_timeout: int = 60,
             challenge_timeout: int = 60,
+            signature_verifier: Optional[SignatureVerifier] = None,
+            query_cache: Optional[QueryResultCache] = None,
+            single_flight: Optional[SingleFlight] = None,
+            miner_clients: Optional[MinerClientRegistry] = None,
+            miner_selector: Optional[MinerSelector] = None,
 
     ) -> None:
         super().__init__()
@@ -62,6 +73,11 @@ class Validator(Module):
         self.challenge_money_flow_manager = challenge_money_flow_manager
         self.challenge_balance_tracking_manager = challenge_balance_tracking_manager
         self.redis_client = redis_client
+        self.signature_verifier = signature_verifier or SignatureVerifier.get_instance()
+        self.query_cache = query_cache
+        self.miner_clients = miner_clients or MinerClientRegistry(key)
+        self.miner_selector = miner_selector or MinerSelector()
+        self.single_flight = query_cache.single_flight if query_cache is not None else single_flight or SingleFlight()
 
     @staticmethod
     def get_addresses(client: CommuneClient, netuid: int) -> dict[int, str]:
@@ -73,13 +89,33 @@ class Validator(Module):
         logger.debug(f"Got modules addresses", modules_adresses=modules_adresses)
         return modules_adresses
 
-    async def _challenge_miner(self, miner_info):
+    async def _fetch_epoch_challenges(self) -> Dict[str, Dict[str, ChallengePool]]:
+        """Money flow and balance tracking challenge pools per network, loaded once per epoch."""
+        networks = get_networks()
+        fetched = await asyncio.gather(*[
+            asyncio.gather(
+                self.challenge_money_flow_manager.get_challenges(network),
+                self.challenge_balance_tracking_manager.get_challenges(network),
+            )
+            for network in networks
+        ], return_exceptions=True)
+
+        challenges = {}
+        for network, result in zip(networks, fetched):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fetch challenges", error=result, network=network)
+                continue
+            money_flow, balance_tracking = result
+            challenges[network] = {"money_flow": ChallengePool(money_flow), "balance_tracking": ChallengePool(balance_tracking)}
+        return challenges
+
+    async def _challenge_miner(self, miner_info, epoch_challenges: Dict[str, Dict[str, ChallengePool]]):
         start_time = time.time()
         try:
             connection, miner_metadata = miner_info
             module_ip, module_port = connection
             miner_key = miner_metadata['key']
-            client = ModuleClient(module_ip, int(module_port), self.key)
+            client = self.miner_clients.get(module_ip, int(module_port))
 
             logger.info(f"Challenging miner", miner_key=miner_key)
 
@@ -91,7 +127,15 @@ class Validator(Module):
             logger.debug(f"Got discovery for miner", miner_key=miner_key)
 
             # Challenge Phase
-            challenge_response = await self._perform_challenges(client, miner_key, discovery)
+            pools = epoch_challenges.get(discovery.network)
+            if pools is None:
+                logger.warning(f"No challenges for miner network", miner_key=miner_key, network=discovery.network)
+                return None
+
+            # drawn without replacement, so miners of the epoch get different challenges
+            challenges = {kind: pool.draw() for kind, pool in pools.items()}
+
+            challenge_response = await self._perform_challenges(client, miner_key, challenges)
             if not challenge_response:
                 return None
 
@@ -126,7 +170,7 @@ class Validator(Module):
             logger.info(f"Miner failed to get discovery", miner_key=miner_key, error=e)
             return None
 
-    async def _perform_challenges(self, client, miner_key, discovery) -> ChallengesResponse | None:
+    async def _perform_challenges(self, client, miner_key, challenges: dict) -> ChallengesResponse | None:
 
         async def execute_money_flow_challenge(money_flow_challenge):
             money_flow_challenge_actual = "0x"
@@ -139,7 +183,9 @@ class Validator(Module):
                     timeout=self.challenge_timeout,
                 )
 
-                if money_flow_challenge is not None:
+                if money_flow_challenge is not None and "error" in money_flow_challenge:
+                    logger.warning(f"Miner rejected challenge", error=money_flow_challenge["error"], miner_key=miner_key)
+                elif money_flow_challenge is not None:
                     money_flow_challenge = Challenge(**money_flow_challenge)
                     money_flow_challenge_actual = money_flow_challenge.output['tx_id']
                     logger.debug(f"Money flow challenge result", money_flow_challenge_output=money_flow_challenge.output, miner_key=miner_key)
@@ -163,7 +209,9 @@ class Validator(Module):
                     timeout=self.challenge_timeout,
                 )
 
-                if balance_tracking_challenge is not None:
+                if balance_tracking_challenge is not None and "error" in balance_tracking_challenge:
+                    logger.warning(f"Miner rejected challenge", error=balance_tracking_challenge["error"], miner_key=miner_key)
+                elif balance_tracking_challenge is not None:
                     balance_tracking_challenge = Challenge(**balance_tracking_challenge)
                     balance_tracking_challenge_actual = balance_tracking_challenge.output['balance']
                     logger.debug(f"Balance tracking challenge result", balance_tracking_challenge_output=balance_tracking_challenge.output, miner_key=miner_key)
@@ -175,17 +223,20 @@ class Validator(Module):
                 return balance_tracking_challenge_actual
 
         try:
-            money_flow_challenge, tx_id = await self.challenge_money_flow_manager.get_random_challenge(discovery.network)
+            money_flow_challenge, tx_id = challenges["money_flow"]
             if money_flow_challenge is None:
                 logger.warning(f"Failed to get money flow challenge", miner_key=miner_key)
                 return None
-            money_flow_challenge_actual = await execute_money_flow_challenge(money_flow_challenge)
 
-            balance_tracking_challenge, balance_tracking_expected_response = await self.challenge_balance_tracking_manager.get_random_challenge(discovery.network)
+            balance_tracking_challenge, balance_tracking_expected_response = challenges["balance_tracking"]
             if balance_tracking_challenge is None:
                 logger.warning(f"Failed to get balance tracking challenge", miner_key=miner_key)
                 return None
-            balance_tracking_challenge_actual = await execute_balance_tracking_challenge(balance_tracking_challenge)
+
+            money_flow_challenge_actual, balance_tracking_challenge_actual = await asyncio.gather(
+                execute_money_flow_challenge(money_flow_challenge),
+                execute_balance_tracking_challenge(balance_tracking_challenge),
+            )
 
             return ChallengesResponse(
                 money_flow_challenge_actual=money_flow_challenge_actual,
@@ -224,8 +275,9 @@ class Validator(Module):
         return score
 
     @staticmethod
-    def adjust_network_weights_with_min_threshold(organic_prompts, min_threshold_ratio=5):
-        base_weights = load_base_weights()
+    def adjust_network_weights_with_min_threshold(organic_prompts, min_threshold_ratio=5, base_weights=None):
+        if base_weights is None:
+            base_weights = load_base_weights()
         total_base_weight = sum(base_weights.values())
         normalized_base_weights = {k: (v / total_base_weight) * 100 for k, v in base_weights.items()}
         num_networks = len(base_weights)
@@ -283,15 +335,35 @@ class Validator(Module):
 
         logger.info(f"Found miners", miners_module_info=miners_module_info.keys())
 
-        for _, miner_metadata in miners_module_info.values():
-            await self.miner_discovery_manager.update_miner_rank(miner_metadata['key'], miner_metadata['emission'])
+        # drop pooled connections to miners that are gone or moved
+        await self.miner_clients.retain(module_addr for module_addr, _ in miners_module_info.values())
+
+        await self.miner_discovery_manager.update_miner_ranks({
+            miner_metadata['key']: miner_metadata['emission'] for _, miner_metadata in miners_module_info.values()
+        })
+
+        epoch_challenges = await self._fetch_epoch_challenges()
+
+        # bounds open connections, every miner being challenged holds up to two
+        challenge_semaphore = asyncio.Semaphore(settings.MINER_CHALLENGE_CONCURRENCY)
 
-        challenge_tasks = []
-        for uid, miner_info in miners_module_info.items():
-            challenge_tasks.append(self._challenge_miner(miner_info))
+        async def challenge_miner(miner_info):
+            async with challenge_semaphore:
+                return await self._challenge_miner(miner_info, epoch_challenges)
+
+        challenge_tasks = [challenge_miner(miner_info) for miner_info in miners_module_info.values()]
 
         responses: tuple[ChallengeMinerResponse] = await asyncio.gather(*challenge_tasks)
 
+        # scoring snapshot, computed once per epoch
+        organic_usage = await self.miner_receipt_manager.get_receipts_count_by_networks()
+        adjusted_weights = self.adjust_network_weights_with_min_threshold(organic_usage, min_threshold_ratio=5, base_weights=load_base_weights())
+        total_weight = sum(adjusted_weights.values())
+        logger.debug(f"Adjusted weights", adjusted_weights=adjusted_weights)
+
+        miners_metadata = []
+        failed_challenges = {}
+
         for uid, miner_info, response in zip(miners_module_info.keys(), miners_module_info.values(), responses):
             if not response:
                 score_dict[uid] = 0
@@ -305,20 +377,12 @@ class Validator(Module):
                 miner_address, miner_ip_port = connection
                 miner_key = miner_metadata['key']
 
-                organic_usage = await self.miner_receipt_manager.get_receipts_count_by_networks()
-                adjusted_weights = self.adjust_network_weights_with_min_threshold(organic_usage, min_threshold_ratio=5)
-                logger.debug(f"Adjusted weights", adjusted_weights=adjusted_weights, miner_key=miner_key)
-
-                receipt_miner_multiplier_result = await self.miner_receipt_manager.get_receipt_miner_multiplier(network, miner_key)
-                if not receipt_miner_multiplier_result:
-                    receipt_miner_multiplier = 1
-                else:
-                    receipt_miner_multiplier = receipt_miner_multiplier_result[0]['multiplier']
+                # the previous per-miner receipt query compared a miner with its own count, which made it 1 for every miner
+                receipt_miner_multiplier = 1
 
                 score = self._score_miner(response, receipt_miner_multiplier)
 
                 weighted_score = 0
-                total_weight = sum(adjusted_weights.values())
                 weight = adjusted_weights[response.network]
                 network_influence = weight / total_weight
                 weighted_score += score * network_influence
@@ -326,8 +390,19 @@ class Validator(Module):
                 assert weighted_score <= 1
                 score_dict[uid] = weighted_score
 
-                await self.miner_discovery_manager.store_miner_metadata(uid, miner_key, miner_address, miner_ip_port, network, version, graph_db)
-                await self.miner_discovery_manager.update_miner_challenges(miner_key, response.get_failed_challenges(), 2)
+                miners_metadata.append({
+                    'uid': uid,
+                    'miner_key': miner_key,
+                    'miner_address': miner_address,
+                    'miner_ip_port': miner_ip_port,
+                    'network': network,
+                    'version': version,
+                    'graph_db': graph_db,
+                })
+                failed_challenges[miner_key] = response.get_failed_challenges()
+
+        await self.miner_discovery_manager.store_miners_metadata(miners_metadata)
+        await self.miner_discovery_manager.update_miners_challenges(failed_challenges, 2)
 
         if not score_dict:
             logger.info("No miner managed to give a valid answer")
@@ -400,7 +475,7 @@ class Validator(Module):
         cleaned = cleaned.strip()
         return cleaned
 
-    async def query_miner(self, network: str, model_kind: str, query, miner_key: Optional[str]) -> dict:
+    async def query_miner(self, network: str, model_kind: str, query, miner_key: Optional[str], block_height: Optional[int] = None) -> dict:
         request_id = str(uuid.uuid4())
         timestamp = datetime.utcnow()
         query = self.format_query_string(query)
@@ -439,13 +514,31 @@ class Validator(Module):
                 "response": None
             }
 
-        # Multiple miners case
+        # Multiple miners case, identical queries already in flight share one fan-out
+        def fan_out():
+            return self._query_top_miners(network, model_kind, query, query_hash, request_id, timestamp)
+
+        async def push_reused_receipt(reused: dict):
+            # a served result counts as organic usage of the miner that earned it, like the query that computed it
+            receipt = reused.get(REUSED_RECEIPT_KEY)
+            if receipt is not None:
+                await self.redis_client.lpush('receipts', json.dumps({**receipt, "request_id": request_id, "timestamp": timestamp.isoformat()}))
+
+        if self.query_cache is not None:
+            result = await self.query_cache.get_or_compute(network, model_kind, query_hash, fan_out, block_height=block_height,
+                                                           on_reuse=push_reused_receipt)
+        else:
+            result, shared = await self.single_flight.do(f"{network}:{model_kind}:{query_hash}", fan_out)
+            if shared:
+                await push_reused_receipt(result)
+        # cached and shared results keep their response and miners, but belong to this request
+        result = {key: value for key, value in result.items() if key != REUSED_RECEIPT_KEY}
+        return {**result, "request_id": request_id, "timestamp": timestamp}
+
+    async def _query_top_miners(self, network: str, model_kind: str, query: str, query_hash: str, request_id: str, timestamp: datetime) -> dict:
         select_count = 3
-        sample_size = 16
 
         miners = await self.miner_discovery_manager.get_miners_by_network(network)
-        if 3 > len(miners) > 0:
-            top_miners = miners
         if len(miners) == 0:
             return {
                 "request_id": request_id,
@@ -455,8 +548,11 @@ class Validator(Module):
                 "model_kind": model_kind,
                 "response": None
             }
-        else:
-            top_miners = miners if len(miners) <= select_count else sample(miners, select_count)
+
+        await self._seed_miner_selector(network, miners)
+        top_miners = self.miner_selector.select(miners, select_count)
+        hedge_candidates = [miner for miner in miners if miner not in top_miners]
+        hedge_delay = self.miner_selector.hedge_delay(network) if hedge_candidates else None
 
         #WE KEEP IT HERE FOR DEBUGGING PURPOSES
         ## 5DvXP65LQe5SfePQ2Bge6RmxV3pWehNmv7nt1fEvMFeHifkU","5G4mWAWB8ZKo4sYfu69Fpeg6aGkWE8ZzeXXTjUT8G4TPFaTE","5HpXG24woTs38cpykk8EsjvuCFaz2hM3vu9fdnMEXLGaq3pt
@@ -475,51 +571,67 @@ class Validator(Module):
         #"""
 
         responses = {}
+        query_tasks = {}
 
-        query_tasks = {
-            asyncio.create_task(self._query_miner(miner, model_kind, query)): (miner, time.time())
-            for miner in top_miners
-        }
+        def start_query(miner):
+            task = asyncio.create_task(self._query_miner(miner, model_kind, query))
+            query_tasks[task] = (miner, time.time())
+            return task
 
         try:
-            pending = set(query_tasks.keys())
+            pending = {start_query(miner) for miner in top_miners}
             start_time = time.time()
 
             while pending:
-                if time.time() - start_time > self.query_timeout:
+                elapsed = time.time() - start_time
+                if elapsed > self.query_timeout:
                     break
 
+                wait_timeout = self.query_timeout - elapsed
+                if hedge_delay is not None:
+                    wait_timeout = min(wait_timeout, max(0.0, hedge_delay - elapsed))
+
                 # Wait for the next task to complete with timeout
                 done, pending = await asyncio.wait(
                     pending,
-                    timeout=max(0.0, self.query_timeout - (time.time() - start_time)),
+                    timeout=wait_timeout,
                     return_when=asyncio.FIRST_COMPLETED
                 )
 
-                if not done:  # Timeout reached
-                    break
+                if not done:
+                    if hedge_delay is not None and time.time() - start_time >= hedge_delay:
+                        # no agreement within the usual latency, ask one more miner
+                        hedge_miner = self.miner_selector.select(hedge_candidates, 1)[0]
+                        top_miners.append(hedge_miner)
+                        pending.add(start_query(hedge_miner))
+                        self.miner_selector.hedged += 1
+                        hedge_delay = None
+                        logger.debug("Hedging miner query", network=network, miner_key=hedge_miner['miner_key'])
+                        continue
+                    break  # Timeout reached
 
                 # Process completed tasks
                 for completed_task in done:
+                    current_miner, query_start = query_tasks[completed_task]
+                    response_time = round(time.time() - query_start, 3)
+                    miner_key = current_miner['miner_key']
                     try:
                         response = await completed_task
-                        current_miner, start_time = query_tasks[completed_task]
-                        response_time = round(time.time() - start_time, 3)
 
                         if not response:
+                            self.miner_selector.record(network, miner_key, response_time, False)
                             continue
 
                         result_hash = response['response']['result_hash']
                         result_hash_signature = response['response']["result_hash_signature"]
 
-                        miner_key = current_miner['miner_key']
-                        miner_key_pair = Keypair(ss58_address=miner_key)
-                        result_hash_signature_bytes = bytes.fromhex(result_hash_signature)
-
-                        if not miner_key_pair.verify(result_hash.encode('utf-8'), signature=result_hash_signature_bytes):
+                        if not await self.signature_verifier.verify(miner_key, result_hash, result_hash_signature):
                             logger.warning(f"Invalid result hash signature", miner_key=miner_key, validator_key=self.key.ss58_address)
+                            self.miner_selector.record(network, miner_key, response_time, False)
                             continue
 
+                        self.miner_selector.record(network, miner_key, response_time, True)
+
                         # Add to or update our response tracking
                         if result_hash in responses:
                             # We found a match!
@@ -555,15 +667,22 @@ class Validator(Module):
                                 "miner_keys": [miner['miner_key'] for miner in top_miners],
                                 "network": network,
                                 "model_kind": model_kind,
-                                **existing_response
+                                **existing_response,
+                                REUSED_RECEIPT_KEY: receipt,
                             }
                         else:
                             # First time seeing this response, store it
                             responses[result_hash] = (response, [current_miner])
                     except Exception as e:
                         logger.error(f"Error querying miner", error=e)
+                        self.miner_selector.record(network, miner_key, response_time, False)
                         continue
 
+            # miners still pending ran into the query timeout
+            for task in pending:
+                timed_out_miner, query_start = query_tasks[task]
+                self.miner_selector.record(network, timed_out_miner['miner_key'], time.time() - query_start, False)
+
             # No valid responses at all, returning empty response
             return {
                 "request_id": request_id,
@@ -579,12 +698,22 @@ class Validator(Module):
                 if not task.done():
                     task.cancel()
 
+    async def _seed_miner_selector(self, network: str, miners: list):
+        response_times = None
+        if network not in self.miner_selector.seeded_networks:
+            self.miner_selector.seeded_networks.add(network)
+            try:
+                response_times = await self.miner_receipt_manager.get_average_response_times(network)
+            except Exception as e:
+                logger.warning("Failed to load miner response times", error=e, network=network)
+        self.miner_selector.seed(miners, response_times)
+
     async def _query_miner(self, miner, model_kind, query):
         miner_key = miner['miner_key']
         miner_network = miner['network']
         module_ip = miner['miner_address']
         module_port = int(miner['miner_ip_port'])
-        module_client = ModuleClient(module_ip, module_port, self.key)
+        module_client = self.miner_clients.get(module_ip, module_port)
         try:
             query_result = await module_client.call(
                 "query",